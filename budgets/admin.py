@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Budget
+from .models import Budget, BudgetAlert
 
 class BudgetAdmin(admin.ModelAdmin):
     list_display = (
@@ -15,3 +15,16 @@ class BudgetAdmin(admin.ModelAdmin):
     )
 
 admin.site.register(Budget, BudgetAdmin)
+
+class BudgetAlertAdmin(admin.ModelAdmin):
+    list_display = (
+        'user',
+        'budget',
+        'threshold',
+        'spent',
+        'acknowledged',
+        'created_at'
+    )
+    list_filter = ('acknowledged',)
+
+admin.site.register(BudgetAlert, BudgetAlertAdmin)
@@ -0,0 +1,138 @@
+from collections import defaultdict
+from decimal import Decimal
+from django.db.models import Case, F, Value, When
+from django.db.models.functions import Now
+from django.utils import timezone
+from transactions.models import Transaction
+from .intervals import budget_index, covering_budgets
+from .models import Budget, BudgetAlert
+
+# Values of a transaction that decide which budgets it counts against
+SPENDING_FIELDS = (
+    'user_id',
+    'category_id',
+    'transaction_type',
+    'created_at',
+    'amount'
+)
+
+
+def spending_day(created_at):
+    """Return the local date a transaction counts on, as budgets'
+    start and end dates are compared with."""
+    if isinstance(created_at, str):
+        created_at = Transaction._meta.get_field('created_at').to_python(
+            created_at
+        )
+    if timezone.is_aware(created_at):
+        created_at = timezone.localtime(created_at)
+    return created_at.date()
+
+
+def spending_changes(transactions, sign):
+    """Return ``(user_id, category_id, day, amount)`` for the expenses
+    among ``transactions``, negated for ``sign=-1``."""
+    return [
+        (
+            transaction.user_id,
+            transaction.category_id,
+            spending_day(transaction.created_at),
+            sign * Decimal(str(transaction.amount))
+        )
+        for transaction in transactions
+        if transaction.transaction_type == 'expense'
+    ]
+
+
+def budget_deltas(changes):
+    """Return ``{budget_id: amount}`` for the budgets that ``changes``
+    count against, looked up in their owners' budget indexes."""
+    indexes = {}
+    deltas = defaultdict(Decimal)
+    for user_id, category_id, day, amount in changes:
+        if user_id not in indexes:
+            indexes[user_id] = budget_index(user_id)
+        for budget_id in covering_budgets(indexes[user_id], category_id, day):
+            deltas[budget_id] += amount
+    return {budget_id: amount for budget_id, amount in deltas.items() if amount}
+
+
+def apply_spending(changes):
+    """Move the running spend of the budgets that ``changes`` count
+    against with a single F() update, and queue alerts for the
+    thresholds the increases crossed. ``updated_at`` is bumped too, as
+    ``update()`` skips ``auto_now``, so sync picks up the new spend."""
+    deltas = budget_deltas(changes)
+    if not deltas:
+        return
+    amount_field = Budget._meta.get_field('running_spent')
+    Budget.objects.filter(pk__in=deltas).update(
+        running_spent=F('running_spent') + Case(
+            *[
+                When(pk=budget_id, then=Value(amount))
+                for budget_id, amount in deltas.items()
+            ],
+            output_field=amount_field
+        ),
+        updated_at=Now()
+    )
+    increased = {
+        budget_id: amount
+        for budget_id, amount in deltas.items() if amount > 0
+    }
+    if increased:
+        queue_alerts(Budget.objects.filter(pk__in=increased), increased)
+
+
+def queue_alerts(budgets, increases=None):
+    """Add an alert to the outbox for every threshold of ``budgets``
+    that their running spend has reached. With ``increases``, only
+    thresholds crossed by those last increases count, so each check
+    looks at the counter alone. A threshold alerts once per budget."""
+    alerts = []
+    for budget in budgets.only(
+        'user',
+        'amount',
+        'running_spent',
+        'alert_thresholds'
+    ):
+        spent = budget.running_spent
+        previous = spent - increases[budget.pk] if increases else None
+        for threshold in budget.alert_thresholds:
+            limit = budget.amount * threshold / 100
+            if spent >= limit and (previous is None or previous < limit):
+                alerts.append(
+                    BudgetAlert(
+                        user_id=budget.user_id,
+                        budget_id=budget.pk,
+                        threshold=threshold,
+                        spent=spent,
+                        amount=budget.amount
+                    )
+                )
+    BudgetAlert.objects.bulk_create(alerts, ignore_conflicts=True)
+
+
+def transactions_created(transactions):
+    apply_spending(spending_changes(transactions, 1))
+
+
+def transactions_deleted(transactions):
+    apply_spending(spending_changes(transactions, -1))
+
+
+def transaction_updated(transaction, old_values):
+    """Move an updated transaction's amount from the budgets of its
+    previous values (as loaded from the database) to those of its new
+    values."""
+    old = Transaction(**{field: old_values[field] for field in SPENDING_FIELDS})
+    apply_spending(
+        spending_changes([old], -1) + spending_changes([transaction], 1)
+    )
+
+
+def resync_budgets(budgets):
+    """Recount the running spend of ``budgets`` from the transactions
+    and alert on the thresholds they have reached."""
+    budgets.resync_spending()
+    queue_alerts(budgets)
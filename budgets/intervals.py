@@ -0,0 +1,120 @@
+import logging
+import threading
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict, defaultdict
+from drf_api.versions import current_versions, invalidate
+from .models import Budget
+
+logger = logging.getLogger(__name__)
+
+CATEGORY_VERSION_KEY = 'budgets:index:version:categories'
+
+# Users whose budget indexes a process keeps, least recently used first
+INDEX_CACHE_SIZE = 1000
+
+
+def user_version_key(user_id):
+    return f'budgets:index:version:user:{user_id}'
+
+
+class IntervalIndex:
+    """Answers which of a set of closed date intervals cover a day.
+
+    The interval endpoints split the calendar into segments, each
+    holding the items whose interval spans it, so a lookup is a binary
+    search over the segment boundaries. Budgets of one category rarely
+    overlap, which keeps the segments small."""
+    __slots__ = ('boundaries', 'segments')
+
+    def __init__(self, intervals):
+        """Index ``(item, start, end)`` triples, ``end`` inclusive."""
+        intervals = [
+            (item, start.toordinal(), end.toordinal() + 1)
+            for item, start, end in intervals
+        ]
+        self.boundaries = sorted(
+            {start for _, start, _ in intervals}
+            | {stop for _, _, stop in intervals}
+        )
+        segments = [[] for _ in self.boundaries]
+        for item, start, stop in intervals:
+            first = bisect_left(self.boundaries, start)
+            last = bisect_left(self.boundaries, stop)
+            for segment in segments[first:last]:
+                segment.append(item)
+        self.segments = [tuple(segment) for segment in segments]
+
+    def covering(self, day):
+        """Return the items whose interval includes ``day``."""
+        position = bisect_right(self.boundaries, day.toordinal()) - 1
+        return self.segments[position] if position >= 0 else ()
+
+
+def build_index(user_id):
+    """Return ``{category_id: IntervalIndex}`` of a user's budgets, with
+    every budget filed under its category and all subcategories."""
+    rows = Budget.objects.filter(user_id=user_id).values_list(
+        'id',
+        'category__descendant_links__descendant',
+        'start_date',
+        'end_date'
+    )
+    intervals = defaultdict(list)
+    for budget_id, category_id, start, end in rows:
+        intervals[category_id].append((budget_id, start, end))
+    return {
+        category_id: IntervalIndex(items)
+        for category_id, items in intervals.items()
+    }
+
+
+_indexes = OrderedDict()
+_indexes_lock = threading.Lock()
+
+
+def get_versions(user_id):
+    """Return the index versions of a user's budgets and of the shared
+    category tree."""
+    return tuple(
+        current_versions([user_version_key(user_id), CATEGORY_VERSION_KEY])
+    )
+
+
+def budget_index(user_id):
+    """Return a user's budget index from this process' cache, building
+    it again if the budgets or categories changed since. Without the
+    versions, e.g. while the cache is down, the index is built from the
+    database and not kept."""
+    try:
+        versions = get_versions(user_id)
+    except Exception:
+        logger.exception('Could not read budget index versions')
+        return build_index(user_id)
+    with _indexes_lock:
+        entry = _indexes.get(user_id)
+        if entry is not None and entry[0] == versions:
+            _indexes.move_to_end(user_id)
+            return entry[1]
+
+    index = build_index(user_id)
+    with _indexes_lock:
+        _indexes[user_id] = (versions, index)
+        _indexes.move_to_end(user_id)
+        while len(_indexes) > INDEX_CACHE_SIZE:
+            _indexes.popitem(last=False)
+    return index
+
+
+def covering_budgets(index, category_id, day):
+    """Return the ids of the budgets in ``index`` that an expense in
+    ``category_id`` on ``day`` counts against."""
+    intervals = index.get(category_id)
+    return intervals.covering(day) if intervals is not None else ()
+
+
+def invalidate_budget_index(user_id):
+    invalidate(user_version_key(user_id))
+
+
+def invalidate_all_budget_indexes():
+    invalidate(CATEGORY_VERSION_KEY)
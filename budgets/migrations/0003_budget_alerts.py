@@ -0,0 +1,78 @@
+# Generated by Django 5.1.1 on 2026-10-18 07:30
+
+import budgets.models
+import django.db.models.deletion
+from django.conf import settings
+from datetime import timedelta
+from decimal import Decimal
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+
+
+def count_spending(apps, schema_editor):
+    """Start the running spend counters of existing budgets from the
+    transactions already recorded."""
+    Budget = apps.get_model('budgets', 'Budget')
+    Transaction = apps.get_model('transactions', 'Transaction')
+    spent = Transaction.objects.filter(
+        user=OuterRef('user'),
+        category__ancestor_links__ancestor=OuterRef('category'),
+        transaction_type='expense',
+        created_at__gte=OuterRef('start_date'),
+        created_at__lt=OuterRef('end_date') + timedelta(days=1)
+    ).order_by().values('user').annotate(
+        total=Sum('amount')
+    ).values('total')
+    amount_field = Budget._meta.get_field('running_spent')
+    Budget.objects.update(
+        running_spent=Coalesce(
+            Subquery(spent, output_field=amount_field),
+            Value(Decimal(0)),
+            output_field=amount_field
+        )
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('budgets', '0002_budget_updated_at'),
+        ('categories', '0002_category_closure'),
+        ('transactions', '0006_transaction_user_updated_idx'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='budget',
+            name='alert_thresholds',
+            field=models.JSONField(default=budgets.models.default_alert_thresholds),
+        ),
+        migrations.AddField(
+            model_name='budget',
+            name='running_spent',
+            field=models.DecimalField(decimal_places=2, default=0, editable=False, max_digits=12),
+        ),
+        migrations.CreateModel(
+            name='BudgetAlert',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('threshold', models.PositiveSmallIntegerField()),
+                ('spent', models.DecimalField(decimal_places=2, max_digits=12)),
+                ('amount', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('acknowledged', models.BooleanField(default=False)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('budget', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='alerts', to='budgets.budget')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='budget_alerts', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['user', 'acknowledged'], name='budget_alert_pending_idx')],
+                'constraints': [models.UniqueConstraint(fields=('budget', 'threshold'), name='budget_alert_uniq')],
+            },
+        ),
+        migrations.RunPython(
+            count_spending,
+            migrations.RunPython.noop
+        ),
+    ]
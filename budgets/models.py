@@ -1,6 +1,73 @@
+from datetime import timedelta
+from decimal import Decimal
 from django.db import models
+from django.db.models import (
+    ExpressionWrapper,
+    F,
+    OuterRef,
+    Subquery,
+    Sum,
+    Value
+)
+from django.db.models.functions import Coalesce, Now, NullIf
 from django.conf import settings
 from categories.models import Category
+from transactions.models import Transaction
+
+
+def default_alert_thresholds():
+    return [80, 100]
+
+
+def spent_in_budget():
+    """Return the expenses of a budget's owner in its category and
+    subcategories between its start and end dates, as an expression
+    correlated with the budget row. The dates are compared with
+    ``created_at`` as stored, as midnight boundaries, so its index stays
+    usable."""
+    spent = Transaction.objects.filter(
+        user=OuterRef('user'),
+        category__ancestor_links__ancestor=OuterRef('category'),
+        transaction_type='expense',
+        created_at__gte=OuterRef('start_date'),
+        created_at__lt=OuterRef('end_date') + timedelta(days=1)
+    ).order_by().values('user').annotate(
+        total=Sum('amount')
+    ).values('total')
+    amount_field = Budget._meta.get_field('amount')
+    return Coalesce(
+        Subquery(spent, output_field=amount_field),
+        Value(Decimal(0)),
+        output_field=amount_field
+    )
+
+
+class BudgetQuerySet(models.QuerySet):
+
+    def with_spending(self):
+        """Annotate every budget with ``spent``, ``remaining`` and
+        ``percent_used``; one correlated subquery per row instead of a
+        query per budget."""
+        amount_field = Budget._meta.get_field('amount')
+        return self.annotate(
+            spent=spent_in_budget()
+        ).annotate(
+            remaining=F('amount') - F('spent'),
+            percent_used=ExpressionWrapper(
+                F('spent') * 100 / NullIf(F('amount'), 0),
+                output_field=amount_field
+            )
+        )
+
+    def resync_spending(self):
+        """Recompute the running spend counter of every budget from the
+        transactions, bumping ``updated_at`` for sync; returns the number
+        of budgets updated."""
+        return self.update(
+            running_spent=spent_in_budget(),
+            updated_at=Now()
+        )
+
 
 class Budget(models.Model):
     """Model representing a budget for a category."""
@@ -18,6 +85,21 @@ class Budget(models.Model):
     )
     start_date = models.DateField()
     end_date = models.DateField()
+    # Percentages of the amount at which the user is alerted
+    alert_thresholds = models.JSONField(
+        default=default_alert_thresholds
+    )
+    # Expenses counted against the budget so far, moved by each
+    # transaction write instead of summed when needed
+    running_spent = models.DecimalField(
+        max_digits=12,
+        decimal_places=2,
+        default=0,
+        editable=False
+    )
+    updated_at = models.DateTimeField(auto_now=True)
+
+    objects = BudgetQuerySet.as_manager()
 
     class Meta:
         unique_together = (
@@ -26,6 +108,55 @@ class Budget(models.Model):
             'start_date',
             'end_date'
         )
+        indexes = [
+            models.Index(
+                fields=['user', 'updated_at'],
+                name='budget_user_updated_idx'
+            ),
+        ]
 
     def __str__(self):
         return f"{self.category} Budget for {self.user} from {self.start_date} to {self.end_date}"
+
+
+class BudgetAlert(models.Model):
+    """A budget threshold crossed by the user's spending, kept until
+    the user's clients have fetched and acknowledged it."""
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='budget_alerts'
+    )
+    budget = models.ForeignKey(
+        Budget,
+        on_delete=models.CASCADE,
+        related_name='alerts'
+    )
+    threshold = models.PositiveSmallIntegerField()
+    spent = models.DecimalField(
+        max_digits=12,
+        decimal_places=2
+    )
+    amount = models.DecimalField(
+        max_digits=10,
+        decimal_places=2
+    )
+    acknowledged = models.BooleanField(default=False)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['budget', 'threshold'],
+                name='budget_alert_uniq'
+            ),
+        ]
+        indexes = [
+            models.Index(
+                fields=['user', 'acknowledged'],
+                name='budget_alert_pending_idx'
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.budget} reached {self.threshold}%"
@@ -1,5 +1,5 @@
 from rest_framework import serializers
-from .models import Budget
+from .models import Budget, BudgetAlert
 from categories.models import Category
 
 class BudgetSerializer(serializers.ModelSerializer):
@@ -9,6 +9,14 @@ class BudgetSerializer(serializers.ModelSerializer):
             category_type='expense'
         )
     )
+    alert_thresholds = serializers.ListField(
+        child=serializers.IntegerField(
+            min_value=1,
+            max_value=1000
+        ),
+        max_length=10,
+        required=False
+    )
 
     class Meta:
         model = Budget
@@ -18,9 +26,15 @@ class BudgetSerializer(serializers.ModelSerializer):
             'category',
             'amount',
             'start_date',
-            'end_date'
+            'end_date',
+            'alert_thresholds',
+            'running_spent'
         ]
-        read_only_fields = ['user']
+        read_only_fields = ['user', 'running_spent']
+
+    def validate_alert_thresholds(self, value):
+        """Keep each threshold once, lowest first."""
+        return sorted(set(value))
 
     def validate(self, data):
         """Custom validation to ensure budget amount and date consistency."""
@@ -40,3 +54,53 @@ class BudgetSerializer(serializers.ModelSerializer):
         """Set the user and create a new budget."""
         user = self.context['request'].user
         return Budget.objects.create(user=user, **validated_data)
+
+
+class BudgetStatusSerializer(serializers.ModelSerializer):
+    """A budget with what has been spent against it, from a queryset
+    annotated by ``with_spending``."""
+    spent = serializers.DecimalField(
+        max_digits=14,
+        decimal_places=2,
+        read_only=True
+    )
+    remaining = serializers.DecimalField(
+        max_digits=14,
+        decimal_places=2,
+        read_only=True
+    )
+    percent_used = serializers.DecimalField(
+        max_digits=14,
+        decimal_places=2,
+        read_only=True
+    )
+
+    class Meta:
+        model = Budget
+        fields = [
+            'id',
+            'category',
+            'amount',
+            'start_date',
+            'end_date',
+            'spent',
+            'remaining',
+            'percent_used'
+        ]
+
+
+class BudgetAlertSerializer(serializers.ModelSerializer):
+    """Serializer for budget threshold alerts."""
+
+    class Meta:
+        model = BudgetAlert
+        fields = [
+            'id',
+            'budget',
+            'threshold',
+            'spent',
+            'amount',
+            'acknowledged',
+            'created_at'
+        ]
+        read_only_fields = fields
@@ -0,0 +1,110 @@
+from django.db.models import Q
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+from categories.models import Category, CategoryClosure
+from transactions.models import Transaction
+from transactions.signals import transactions_bulk_created
+from users.utils import is_user_deletion
+from .alerts import (
+    SPENDING_FIELDS,
+    resync_budgets,
+    transaction_updated,
+    transactions_created,
+    transactions_deleted
+)
+from .intervals import invalidate_all_budget_indexes, invalidate_budget_index
+from .models import Budget
+
+
+@receiver(post_save, sender=Budget)
+@receiver(post_delete, sender=Budget)
+def invalidate_index_on_budget_change(sender, instance, **kwargs):
+    invalidate_budget_index(instance.user_id)
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def invalidate_indexes_on_category_change(sender, **kwargs):
+    """Budgets are indexed under their subcategories too, which a new,
+    moved or deleted category changes for every user."""
+    invalidate_all_budget_indexes()
+
+
+@receiver(post_save, sender=Transaction)
+def update_spending_on_save(sender, instance, created, raw=False, **kwargs):
+    """Count a saved expense against the budgets it falls in."""
+    if raw:
+        return
+    if created:
+        transactions_created([instance])
+        return
+
+    old_values = getattr(instance, '_loaded_values', {})
+    if not all(field in old_values for field in SPENDING_FIELDS):
+        # The previous values are unknown; recount the owner's budgets
+        resync_budgets(Budget.objects.filter(user_id=instance.user_id))
+        return
+    if all(
+        old_values[field] == getattr(instance, field)
+        for field in SPENDING_FIELDS
+    ):
+        return
+    transaction_updated(instance, old_values)
+
+
+@receiver(post_delete, sender=Transaction)
+def update_spending_on_delete(sender, instance, origin=None, **kwargs):
+    """Take a deleted expense off its budgets; budgets of a deleted
+    user go away with the user."""
+    if is_user_deletion(origin):
+        return
+    transactions_deleted([instance])
+
+
+@receiver(transactions_bulk_created, sender=Transaction)
+def update_spending_on_bulk_create(sender, transactions, **kwargs):
+    transactions_created(transactions)
+
+
+@receiver(post_save, sender=Budget)
+def count_spending_on_budget_save(sender, instance, raw=False, **kwargs):
+    """Count the existing expenses of a new or edited budget, whose
+    category, dates or thresholds may have changed."""
+    if raw:
+        return
+    resync_budgets(Budget.objects.filter(pk=instance.pk))
+
+
+@receiver(pre_save, sender=Category)
+def remember_ancestors_on_category_save(sender, instance, raw=False, **kwargs):
+    """Note the ancestors of a category being moved, before the closure
+    table drops the subtree's links to them."""
+    if raw or instance.pk is None:
+        return
+    ancestry = dict(
+        CategoryClosure.objects.filter(
+            descendant_id=instance.pk,
+            depth__gte=1
+        ).values_list('depth', 'ancestor_id')
+    )
+    if ancestry.get(1) != instance.parent_category_id:
+        instance._moved_from_ancestors = set(ancestry.values())
+
+
+@receiver(post_save, sender=Category)
+def recount_spending_on_category_save(sender, instance, created, raw=False, **kwargs):
+    """A category moved in the tree takes its subtree's expenses from
+    the budgets of its old ancestors to those of its new ones, so only
+    those budgets are recounted."""
+    old_ancestors = instance.__dict__.pop('_moved_from_ancestors', None)
+    if raw or created or old_ancestors is None:
+        return
+    new_ancestors = CategoryClosure.objects.filter(
+        descendant_id=instance.parent_category_id
+    ).values('ancestor_id')
+    resync_budgets(
+        Budget.objects.filter(
+            Q(category_id__in=old_ancestors)
+            | Q(category_id__in=new_ancestors)
+        )
+    )
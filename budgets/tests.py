@@ -1,3 +1,401 @@
-from django.test import TestCase
+from datetime import date, datetime
+from decimal import Decimal
+from unittest import mock
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import SimpleTestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import RefreshToken
+from categories.models import Category
+from transactions.models import Transaction
+from .intervals import IntervalIndex
+from .models import Budget, BudgetAlert
 
-# Create your tests here.
+User = get_user_model()
+
+
+class BudgetStatusTests(APITestCase):
+    """Tests for the budget status endpoint."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email='testuser@example.com',
+            username='testuser',
+            password='testpassword'
+        )
+        access_token = str(RefreshToken.for_user(self.user).access_token)
+        self.client.credentials(HTTP_AUTHORIZATION='Bearer ' + access_token)
+        self.groceries = Category.objects.create(
+            name='Groceries',
+            category_type='expense'
+        )
+        self.snacks = Category.objects.create(
+            name='Snacks',
+            category_type='expense',
+            parent_category=self.groceries
+        )
+        self.rent = Category.objects.create(
+            name='Rent',
+            category_type='expense'
+        )
+
+    def create_transaction(self, amount, category, day, user=None):
+        return Transaction.objects.create(
+            user=user or self.user,
+            amount=amount,
+            transaction_type='expense',
+            category=category,
+            created_at=timezone.make_aware(datetime(2024, 5, day, 12))
+        )
+
+    def create_budget(self, category, amount, start_day, end_day):
+        return Budget.objects.create(
+            user=self.user,
+            category=category,
+            amount=amount,
+            start_date=date(2024, 5, start_day),
+            end_date=date(2024, 5, end_day)
+        )
+
+    def test_budget_status(self):
+        """Test spent, remaining and percent used per budget."""
+        first_half = self.create_budget(self.groceries, 200, 1, 15)
+        second_half = self.create_budget(self.groceries, 100, 16, 31)
+        self.create_budget(self.rent, 800, 1, 31)
+        self.create_transaction(50, self.groceries, 1)
+        self.create_transaction(30, self.snacks, 15)
+        self.create_transaction(120, self.groceries, 20)
+        other = User.objects.create_user(
+            email='other@example.com',
+            username='other',
+            password='testpassword'
+        )
+        self.create_transaction(999, self.groceries, 5, user=other)
+
+        response = self.client.get(reverse('budget-status'))
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        by_id = {item['id']: item for item in response.data}
+        self.assertEqual(
+            Decimal(by_id[first_half.id]['spent']),
+            Decimal('80.00')
+        )
+        self.assertEqual(
+            Decimal(by_id[first_half.id]['remaining']),
+            Decimal('120.00')
+        )
+        self.assertEqual(
+            Decimal(by_id[first_half.id]['percent_used']),
+            Decimal('40.00')
+        )
+        self.assertEqual(
+            Decimal(by_id[second_half.id]['remaining']),
+            Decimal('-20.00')
+        )
+        self.assertEqual(
+            Decimal(by_id[second_half.id]['percent_used']),
+            Decimal('120.00')
+        )
+        rent = [item for item in response.data if item['category'] == self.rent.id]
+        self.assertEqual(Decimal(rent[0]['spent']), Decimal('0.00'))
+
+    def test_budget_status_counts_whole_days(self):
+        """Test that the start and end dates include their whole day."""
+        budget = self.create_budget(self.groceries, 100, 10, 20)
+        for amount, moment in [
+            (1, datetime(2024, 5, 9, 23, 59, 59)),
+            (2, datetime(2024, 5, 10, 0, 0)),
+            (4, datetime(2024, 5, 20, 23, 59, 59)),
+            (8, datetime(2024, 5, 21, 0, 0)),
+        ]:
+            Transaction.objects.create(
+                user=self.user,
+                amount=amount,
+                transaction_type='expense',
+                category=self.groceries,
+                created_at=timezone.make_aware(moment)
+            )
+
+        spent = Budget.objects.with_spending().get(pk=budget.pk).spent
+
+        self.assertEqual(spent, Decimal('6.00'))
+
+    def test_budget_status_is_one_query(self):
+        """Test that the query count does not grow with the budgets."""
+        for day in range(1, 21):
+            self.create_budget(self.groceries, 100, day, day + 10)
+            self.create_transaction(day, self.snacks, day)
+
+        # Authentication and the annotated budgets
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse('budget-status'))
+
+        self.assertEqual(len(response.data), 20)
+
+
+class BudgetAlertTests(APITestCase):
+    """Tests for budget spend counters and threshold alerts."""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(
+            email='testuser@example.com',
+            username='testuser',
+            password='testpassword'
+        )
+        access_token = str(RefreshToken.for_user(self.user).access_token)
+        self.client.credentials(HTTP_AUTHORIZATION='Bearer ' + access_token)
+        self.groceries = Category.objects.create(
+            name='Groceries',
+            category_type='expense'
+        )
+        self.snacks = Category.objects.create(
+            name='Snacks',
+            category_type='expense',
+            parent_category=self.groceries
+        )
+        self.budget = Budget.objects.create(
+            user=self.user,
+            category=self.groceries,
+            amount=100,
+            start_date=date(2024, 5, 1),
+            end_date=date(2024, 5, 31),
+            alert_thresholds=[50, 100]
+        )
+
+    def create_transaction(self, amount, category, day=10):
+        return Transaction.objects.create(
+            user=self.user,
+            amount=amount,
+            transaction_type='expense',
+            category=category,
+            created_at=timezone.make_aware(datetime(2024, 5, day, 12))
+        )
+
+    def running_spent(self):
+        self.budget.refresh_from_db()
+        return self.budget.running_spent
+
+    def alerted_thresholds(self):
+        return list(
+            BudgetAlert.objects.filter(
+                budget=self.budget
+            ).order_by('threshold').values_list('threshold', flat=True)
+        )
+
+    def test_counter_follows_transaction_writes(self):
+        """Test that creates, updates and deletes move the counter."""
+        snack = self.create_transaction(20, self.snacks)
+        self.create_transaction(10, self.groceries)
+        # Outside the budget's dates
+        self.create_transaction(500, self.groceries, day=1).delete()
+        self.assertEqual(self.running_spent(), Decimal('30.00'))
+
+        snack.amount = 25
+        snack.save()
+        self.assertEqual(self.running_spent(), Decimal('35.00'))
+
+        snack.delete()
+        self.assertEqual(self.running_spent(), Decimal('10.00'))
+        self.assertEqual(
+            self.running_spent(),
+            Budget.objects.with_spending().get(pk=self.budget.pk).spent
+        )
+
+    def test_crossed_thresholds_are_alerted_once(self):
+        """Test that each threshold is alerted when first crossed."""
+        self.create_transaction(40, self.groceries)
+        self.assertEqual(self.alerted_thresholds(), [])
+
+        self.create_transaction(15, self.snacks)
+        self.assertEqual(self.alerted_thresholds(), [50])
+
+        self.create_transaction(60, self.groceries)
+        self.create_transaction(5, self.groceries)
+        self.assertEqual(self.alerted_thresholds(), [50, 100])
+        alert = BudgetAlert.objects.get(budget=self.budget, threshold=100)
+        self.assertEqual(alert.spent, Decimal('115.00'))
+
+    def test_expense_write_is_constant_queries(self):
+        """Test that checking thresholds does not re-sum history."""
+        for day in range(1, 21):
+            self.create_transaction(1, self.groceries, day=day)
+
+        with CaptureQueriesContext(connection) as queries:
+            self.create_transaction(1, self.snacks)
+
+        budget_queries = [
+            query['sql'] for query in queries.captured_queries
+            if '"budgets_budget"' in query['sql']
+        ]
+        # Counter update and threshold check; the budgets covering the
+        # expense come from the cached interval index
+        self.assertEqual(len(budget_queries), 2)
+        self.assertFalse(any('SUM(' in sql for sql in budget_queries))
+        self.assertEqual(self.running_spent(), Decimal('21.00'))
+
+    def test_cache_outage_does_not_fail_writes(self):
+        """Test that expenses and budgets are saved and counted while the
+        cache is unreachable."""
+        with mock.patch.object(
+            cache,
+            'get_many',
+            side_effect=ConnectionError
+        ), mock.patch.object(
+            cache,
+            'incr',
+            side_effect=ConnectionError
+        ), self.assertLogs('drf_api.versions', level='ERROR'):
+            with self.captureOnCommitCallbacks(execute=True):
+                self.create_transaction(30, self.snacks)
+                self.budget.amount = 200
+                self.budget.save()
+                self.create_transaction(10, self.groceries)
+
+        self.assertEqual(self.running_spent(), Decimal('40.00'))
+
+    def test_index_follows_budget_and_category_changes(self):
+        """Test that new budgets and subcategories are counted at once."""
+        self.create_transaction(10, self.groceries)
+        june = Budget.objects.create(
+            user=self.user,
+            category=self.groceries,
+            amount=100,
+            start_date=date(2024, 6, 1),
+            end_date=date(2024, 6, 30)
+        )
+        fruit = Category.objects.create(
+            name='Fruit',
+            category_type='expense',
+            parent_category=self.snacks
+        )
+
+        Transaction.objects.create(
+            user=self.user,
+            amount=7,
+            transaction_type='expense',
+            category=fruit,
+            created_at=timezone.make_aware(datetime(2024, 6, 3, 12))
+        )
+
+        june.refresh_from_db()
+        self.assertEqual(june.running_spent, Decimal('7.00'))
+        self.assertEqual(self.running_spent(), Decimal('10.00'))
+
+    def test_moved_category_is_recounted(self):
+        """Test that moving a category recounts the budgets above its
+        old and new places, and that other edits recount nothing."""
+        treats = Category.objects.create(name='Treats', category_type='expense')
+        treats_budget = Budget.objects.create(
+            user=self.user,
+            category=treats,
+            amount=100,
+            start_date=date(2024, 5, 1),
+            end_date=date(2024, 5, 31)
+        )
+        self.create_transaction(20, self.snacks)
+
+        with CaptureQueriesContext(connection) as queries:
+            self.snacks.name = 'Sweets'
+            self.snacks.save()
+        self.assertFalse(
+            any('"budgets_budget"' in q['sql'] for q in queries.captured_queries)
+        )
+
+        self.snacks.parent_category = treats
+        self.snacks.save()
+
+        treats_budget.refresh_from_db()
+        self.assertEqual(self.running_spent(), Decimal('0.00'))
+        self.assertEqual(treats_budget.running_spent, Decimal('20.00'))
+
+    def test_edited_budget_is_recounted(self):
+        """Test that new budget dates and thresholds take effect."""
+        self.create_transaction(30, self.groceries, day=10)
+        self.create_transaction(30, self.groceries, day=20)
+
+        response = self.client.put(
+            reverse('budget-detail', args=[self.budget.pk]),
+            {
+                'category': self.groceries.id,
+                'amount': '100.00',
+                'start_date': '2024-05-15',
+                'end_date': '2024-05-31',
+                'alert_thresholds': [25, 25, 20],
+            },
+            format='json'
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['alert_thresholds'], [20, 25])
+        self.assertEqual(self.running_spent(), Decimal('30.00'))
+        # 50% was reached before the edit and stays in the outbox
+        self.assertEqual(self.alerted_thresholds(), [20, 25, 50])
+
+    def test_alert_outbox(self):
+        """Test fetching and acknowledging alerts."""
+        self.create_transaction(120, self.groceries)
+
+        response = self.client.get(
+            reverse('budget-alert-list'),
+            {'pending': 'true'}
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [alert['threshold'] for alert in response.data['results']],
+            [100, 50]
+        )
+
+        first = response.data['results'][0]['id']
+        response = self.client.post(
+            reverse('budget-alert-acknowledge', args=[first])
+        )
+        self.assertEqual(response.data['acknowledged'], 1)
+        response = self.client.get(
+            reverse('budget-alert-list'),
+            {'pending': 'true'}
+        )
+        self.assertEqual(len(response.data['results']), 1)
+
+        response = self.client.post(reverse('budget-alert-acknowledge-all'))
+        self.assertEqual(response.data['acknowledged'], 1)
+        response = self.client.get(reverse('budget-alert-list'))
+        self.assertEqual(len(response.data['results']), 2)
+
+
+class IntervalIndexTests(SimpleTestCase):
+    """Tests for the interval index behind budget lookups."""
+
+    def test_covering(self):
+        """Test lookups at, between and outside interval endpoints."""
+        index = IntervalIndex([
+            ('may', date(2024, 5, 1), date(2024, 5, 31)),
+            ('june', date(2024, 6, 1), date(2024, 6, 30)),
+            ('summer', date(2024, 5, 15), date(2024, 8, 31)),
+            ('day', date(2024, 5, 15), date(2024, 5, 15)),
+        ])
+
+        self.assertEqual(index.covering(date(2024, 4, 30)), ())
+        self.assertEqual(index.covering(date(2024, 5, 1)), ('may',))
+        self.assertEqual(
+            sorted(index.covering(date(2024, 5, 15))),
+            ['day', 'may', 'summer']
+        )
+        self.assertEqual(
+            sorted(index.covering(date(2024, 5, 31))),
+            ['may', 'summer']
+        )
+        self.assertEqual(
+            sorted(index.covering(date(2024, 6, 1))),
+            ['june', 'summer']
+        )
+        self.assertEqual(index.covering(date(2024, 8, 31)), ('summer',))
+        self.assertEqual(index.covering(date(2024, 9, 1)), ())
+
+    def test_empty(self):
+        self.assertEqual(IntervalIndex([]).covering(date(2024, 5, 1)), ())
@@ -1,5 +1,11 @@
 from django.urls import path
-from .views import BudgetListCreateView, BudgetDetailView
+from .views import (
+    BudgetAlertAcknowledgeView,
+    BudgetAlertListView,
+    BudgetDetailView,
+    BudgetListCreateView,
+    BudgetStatusView
+)
 
 urlpatterns = [
     path(
@@ -7,6 +13,26 @@ urlpatterns = [
         BudgetListCreateView.as_view(),
         name='budget-list-create'
     ),
+    path(
+        'status/',
+        BudgetStatusView.as_view(),
+        name='budget-status'
+    ),
+    path(
+        'alerts/',
+        BudgetAlertListView.as_view(),
+        name='budget-alert-list'
+    ),
+    path(
+        'alerts/acknowledge/',
+        BudgetAlertAcknowledgeView.as_view(),
+        name='budget-alert-acknowledge-all'
+    ),
+    path(
+        'alerts/<int:pk>/acknowledge/',
+        BudgetAlertAcknowledgeView.as_view(),
+        name='budget-alert-acknowledge'
+    ),
     path(
         '<int:pk>/',
         BudgetDetailView.as_view(),
@@ -1,12 +1,20 @@
-from rest_framework import generics
+from rest_framework import generics, status, views
 from rest_framework.permissions import IsAuthenticated
-from .models import Budget
-from .serializers import BudgetSerializer
+from rest_framework.response import Response
+from idempotency.mixins import IdempotencyMixin
+from drf_api.pagination import IdCursorPagination
+from .models import Budget, BudgetAlert
+from .serializers import (
+    BudgetAlertSerializer,
+    BudgetSerializer,
+    BudgetStatusSerializer
+)
 
-class BudgetListCreateView(generics.ListCreateAPIView):
+class BudgetListCreateView(IdempotencyMixin, generics.ListCreateAPIView):
     """View to list and create budgets."""
     serializer_class = BudgetSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = IdCursorPagination
 
     def get_queryset(self):
         return Budget.objects.filter(user=self.request.user)
@@ -14,7 +22,7 @@ class BudgetListCreateView(generics.ListCreateAPIView):
     def perform_create(self, serializer):
         serializer.save(user=self.request.user)
 
-class BudgetDetailView(generics.RetrieveUpdateDestroyAPIView):
+class BudgetDetailView(IdempotencyMixin, generics.RetrieveUpdateDestroyAPIView):
     """View to retrieve, update, or delete a budget."""
     queryset = Budget.objects.all()
     serializer_class = BudgetSerializer
@@ -22,3 +30,44 @@ class BudgetDetailView(generics.RetrieveUpdateDestroyAPIView):
 
     def get_queryset(self):
         return Budget.objects.filter(user=self.request.user)
+
+class BudgetStatusView(generics.ListAPIView):
+    """Every budget of the user with its spent, remaining and percent
+    used amounts, in a single query however many budgets there are."""
+    serializer_class = BudgetStatusSerializer
+    permission_classes = [IsAuthenticated]
+    pagination_class = None
+
+    def get_queryset(self):
+        return Budget.objects.filter(
+            user=self.request.user
+        ).with_spending().order_by('start_date', 'id')
+
+class BudgetAlertListView(generics.ListAPIView):
+    """The user's budget alert outbox, newest first; ``?pending=true``
+    leaves out alerts that have been acknowledged."""
+    serializer_class = BudgetAlertSerializer
+    permission_classes = [IsAuthenticated]
+    pagination_class = IdCursorPagination
+
+    def get_queryset(self):
+        alerts = BudgetAlert.objects.filter(user=self.request.user)
+        if self.request.query_params.get('pending') == 'true':
+            alerts = alerts.filter(acknowledged=False)
+        return alerts
+
+class BudgetAlertAcknowledgeView(views.APIView):
+    """Mark alerts as seen, so that they leave the pending outbox."""
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request, pk=None):
+        alerts = BudgetAlert.objects.filter(user=request.user)
+        if pk is not None:
+            alerts = alerts.filter(pk=pk)
+        acknowledged = alerts.filter(acknowledged=False).update(
+            acknowledged=True
+        )
+        return Response(
+            {'acknowledged': acknowledged},
+            status=status.HTTP_200_OK
+        )
@@ -0,0 +1,98 @@
+from django.db import transaction as db_transaction
+from .models import Category, CategoryClosure
+
+
+def closure_links(parents):
+    """Yield ``(ancestor, descendant, depth)`` for every category in
+    ``parents``, a ``{category_id: parent_id}`` mapping."""
+    for category_id in parents:
+        ancestor, depth = category_id, 0
+        seen = set()
+        while ancestor is not None and ancestor not in seen:
+            seen.add(ancestor)
+            yield ancestor, category_id, depth
+            ancestor, depth = parents.get(ancestor), depth + 1
+
+
+def rebuild_closure():
+    """Recompute the whole closure table from ``parent_category``."""
+    parents = dict(Category.objects.values_list('id', 'parent_category_id'))
+    with db_transaction.atomic():
+        CategoryClosure.objects.all().delete()
+        CategoryClosure.objects.bulk_create(
+            CategoryClosure(
+                ancestor_id=ancestor,
+                descendant_id=descendant,
+                depth=depth
+            )
+            for ancestor, descendant, depth in closure_links(parents)
+        )
+
+
+def is_descendant(category_id, ancestor_id):
+    """Return whether ``category_id`` is ``ancestor_id`` or below it."""
+    return CategoryClosure.objects.filter(
+        ancestor_id=ancestor_id,
+        descendant_id=category_id
+    ).exists()
+
+
+def link_ancestors(subtree, parent_id):
+    """Link every ``(descendant, depth below the subtree root)`` pair of
+    ``subtree`` to ``parent_id`` and all of its ancestors."""
+    if parent_id is None:
+        return
+    ancestry = CategoryClosure.objects.filter(
+        descendant_id=parent_id
+    ).values_list('ancestor_id', 'depth')
+    CategoryClosure.objects.bulk_create(
+        CategoryClosure(
+            ancestor_id=ancestor,
+            descendant_id=descendant,
+            depth=ancestor_depth + depth + 1
+        )
+        for ancestor, ancestor_depth in ancestry
+        for descendant, depth in subtree
+    )
+
+
+def category_created(category):
+    """Add the links of a new category: itself and its parent's ancestry."""
+    with db_transaction.atomic():
+        CategoryClosure.objects.create(
+            ancestor=category,
+            descendant=category,
+            depth=0
+        )
+        link_ancestors([(category.pk, 0)], category.parent_category_id)
+
+
+def category_saved(category):
+    """Move a category's subtree if its parent changed.
+
+    The subtree's links to its old ancestors are dropped and replaced
+    with links to the new parent's ancestry; links inside the subtree
+    stay as they are."""
+    current_parent = CategoryClosure.objects.filter(
+        descendant=category,
+        depth=1
+    ).values_list('ancestor_id', flat=True).first()
+    if current_parent == category.parent_category_id:
+        return
+
+    with db_transaction.atomic():
+        subtree = list(
+            CategoryClosure.objects.filter(
+                ancestor=category
+            ).values_list('descendant_id', 'depth')
+        )
+        subtree_ids = [descendant for descendant, _ in subtree]
+        if category.parent_category_id in subtree_ids:
+            raise ValueError('A category cannot be moved below itself.')
+
+        CategoryClosure.objects.filter(
+            descendant_id__in=subtree_ids
+        ).exclude(
+            ancestor_id__in=subtree_ids
+        ).delete()
+        link_ancestors(subtree, category.parent_category_id)
@@ -0,0 +1,47 @@
+# Generated by Django 5.1.1 on 2026-10-18 07:04
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+from categories.closure import closure_links
+
+
+def build_closure(apps, schema_editor):
+    """Link the existing categories to themselves and their ancestors."""
+    Category = apps.get_model('categories', 'Category')
+    CategoryClosure = apps.get_model('categories', 'CategoryClosure')
+    parents = dict(Category.objects.values_list('id', 'parent_category_id'))
+    CategoryClosure.objects.bulk_create(
+        CategoryClosure(
+            ancestor_id=ancestor,
+            descendant_id=descendant,
+            depth=depth
+        )
+        for ancestor, descendant, depth in closure_links(parents)
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('categories', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CategoryClosure',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('depth', models.PositiveSmallIntegerField()),
+                ('ancestor', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='descendant_links', to='categories.category')),
+                ('descendant', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='ancestor_links', to='categories.category')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('ancestor', 'descendant'), name='category_closure_uniq')],
+            },
+        ),
+        migrations.RunPython(
+            build_closure,
+            migrations.RunPython.noop
+        ),
+    ]
@@ -23,3 +23,33 @@ class Category(models.Model):
 
     def __str__(self):
         return f"{self.name} ({self.category_type})"
+
+
+class CategoryClosure(models.Model):
+    """One row per (ancestor, descendant) pair of the category tree,
+    including each category paired with itself at depth 0, so a whole
+    subtree or ancestry is a single join."""
+    ancestor = models.ForeignKey(
+        Category,
+        on_delete=models.CASCADE,
+        related_name='descendant_links',
+        # Covered by the unique constraint below, which leads with it
+        db_index=False
+    )
+    descendant = models.ForeignKey(
+        Category,
+        on_delete=models.CASCADE,
+        related_name='ancestor_links'
+    )
+    depth = models.PositiveSmallIntegerField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['ancestor', 'descendant'],
+                name='category_closure_uniq'
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.ancestor_id} -> {self.descendant_id} ({self.depth})"
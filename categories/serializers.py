@@ -1,4 +1,5 @@
 from rest_framework import serializers
+from .closure import is_descendant
 from .models import Category
 from transactions.models import Transaction  # Import Transaction model
 
@@ -9,6 +10,18 @@ class CategorySerializer(serializers.ModelSerializer):
         model = Category
         fields = ['id', 'name', 'category_type', 'parent_category']
 
+    def validate_parent_category(self, value):
+        """Ensure a category is not moved below itself."""
+        if (
+            value is not None
+            and self.instance is not None
+            and is_descendant(value.pk, self.instance.pk)
+        ):
+            raise serializers.ValidationError(
+                "A category cannot be placed below itself or its subcategories."
+            )
+        return value
+
 class TransactionSerializer(serializers.ModelSerializer):
     """Serializer for creating and updating Transaction instances."""
     category = serializers.PrimaryKeyRelatedField(
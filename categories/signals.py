@@ -0,0 +1,15 @@
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+from .closure import category_created, category_saved
+from .models import Category
+
+
+@receiver(post_save, sender=Category)
+def maintain_closure(sender, instance, created, raw=False, **kwargs):
+    """Keep the closure table in step with ``parent_category``."""
+    if raw:
+        return
+    if created:
+        category_created(instance)
+    else:
+        category_saved(instance)
@@ -0,0 +1,88 @@
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import RefreshToken
+from .closure import rebuild_closure
+from .models import Category, CategoryClosure
+
+User = get_user_model()
+
+
+class CategoryClosureTests(APITestCase):
+    """Tests for the category closure table."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email='testuser@example.com',
+            username='testuser',
+            password='testpassword'
+        )
+        access_token = str(RefreshToken.for_user(self.user).access_token)
+        self.client.credentials(HTTP_AUTHORIZATION='Bearer ' + access_token)
+        self.housing = Category.objects.create(
+            name='Housing',
+            category_type='expense'
+        )
+        self.utilities = Category.objects.create(
+            name='Utilities',
+            category_type='expense',
+            parent_category=self.housing
+        )
+        self.electricity = Category.objects.create(
+            name='Electricity',
+            category_type='expense',
+            parent_category=self.utilities
+        )
+        self.food = Category.objects.create(
+            name='Food',
+            category_type='expense'
+        )
+
+    def links(self):
+        return set(
+            CategoryClosure.objects.values_list(
+                'ancestor__name',
+                'descendant__name',
+                'depth'
+            )
+        )
+
+    def test_closure_tracks_created_categories(self):
+        """Test that new categories are linked to all their ancestors."""
+        self.assertEqual(self.links(), {
+            ('Housing', 'Housing', 0),
+            ('Utilities', 'Utilities', 0),
+            ('Electricity', 'Electricity', 0),
+            ('Food', 'Food', 0),
+            ('Housing', 'Utilities', 1),
+            ('Utilities', 'Electricity', 1),
+            ('Housing', 'Electricity', 2),
+        })
+
+    def test_moving_a_category_moves_its_subtree(self):
+        """Test that reparenting relinks the whole subtree."""
+        response = self.client.patch(
+            reverse('category-detail', args=[self.utilities.id]),
+            {'parent_category': self.food.id},
+            format='json'
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        links = self.links()
+        self.assertIn(('Food', 'Electricity', 2), links)
+        self.assertNotIn(('Housing', 'Electricity', 2), links)
+        self.assertNotIn(('Housing', 'Utilities', 1), links)
+        expected = links.copy()
+        rebuild_closure()
+        self.assertEqual(self.links(), expected)
+
+    def test_category_cannot_move_below_itself(self):
+        """Test that a move creating a cycle is rejected."""
+        response = self.client.patch(
+            reverse('category-detail', args=[self.housing.id]),
+            {'parent_category': self.electricity.id},
+            format='json'
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
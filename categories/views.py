@@ -1,5 +1,6 @@
 from rest_framework import generics
 from rest_framework.permissions import IsAuthenticated
+from drf_api.pagination import IdCursorPagination
 from .models import Category
 from .serializers import CategorySerializer
 
@@ -8,6 +9,7 @@ class CategoryListCreateView(generics.ListCreateAPIView):
     queryset = Category.objects.all()
     serializer_class = CategorySerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = IdCursorPagination
 
 class CategoryDetailView(generics.RetrieveUpdateDestroyAPIView):
     """View to retrieve, update, or delete a category."""
@@ -1,3 +1,7 @@
 from django.contrib import admin
+from .models import DashboardSnapshot
 
-# Register your models here.
+class DashboardSnapshotAdmin(admin.ModelAdmin):
+    list_display = ('user', 'month', 'total_income', 'total_expenses', 'total_budget', 'updated_at')
+
+admin.site.register(DashboardSnapshot, DashboardSnapshotAdmin)
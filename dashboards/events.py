@@ -0,0 +1,196 @@
+import json
+import logging
+import threading
+import time
+from collections import defaultdict
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+
+class Subscription:
+    """One live connection of a user.
+
+    Dashboard deltas carry the new value of every field that changed,
+    so deltas that arrive while the connection is busy are merged into
+    one instead of queued; a connection holds at most one pending
+    dashboard however slow its client is."""
+    __slots__ = ('loop', 'pending', 'refresh', 'ready')
+
+    def __init__(self, loop, ready):
+        self.loop = loop
+        self.pending = {}
+        self.refresh = False
+        self.ready = ready
+
+    def push(self, delta):
+        """Merge ``delta`` into the pending changes; ``None`` asks for
+        the whole dashboard to be sent again. Runs on ``loop``."""
+        if delta is None:
+            self.refresh = True
+            self.pending.clear()
+        elif not self.refresh:
+            self.pending.update(delta)
+        self.ready.set()
+
+    def take(self):
+        """Return and clear the pending changes as ``(refresh, delta)``."""
+        refresh, delta = self.refresh, self.pending
+        self.refresh, self.pending = False, {}
+        self.ready.clear()
+        return refresh, delta
+
+
+class InMemoryBroker:
+    """Fans dashboard events out to the connections of this process.
+
+    ``publish`` may be called from any thread; events are handed to
+    each subscription on the event loop that owns it."""
+
+    def __init__(self, **options):
+        self._subscriptions = defaultdict(set)
+        self._lock = threading.Lock()
+
+    def subscribe(self, user_id, loop, ready):
+        subscription = Subscription(loop, ready)
+        with self._lock:
+            self._subscriptions[user_id].add(subscription)
+        return subscription
+
+    def unsubscribe(self, user_id, subscription):
+        with self._lock:
+            subscriptions = self._subscriptions.get(user_id)
+            if subscriptions is None:
+                return
+            subscriptions.discard(subscription)
+            if not subscriptions:
+                del self._subscriptions[user_id]
+
+    def subscriber_count(self, user_id=None):
+        with self._lock:
+            if user_id is not None:
+                return len(self._subscriptions.get(user_id, ()))
+            return sum(map(len, self._subscriptions.values()))
+
+    def publish(self, user_id, delta):
+        self.deliver(user_id, delta)
+
+    def refresh_all(self):
+        """Ask every connection of this process for a full refresh."""
+        with self._lock:
+            user_ids = list(self._subscriptions)
+        for user_id in user_ids:
+            self.deliver(user_id, None)
+
+    def deliver(self, user_id, delta):
+        """Hand an event to this process' connections of a user."""
+        with self._lock:
+            subscriptions = list(self._subscriptions.get(user_id, ()))
+        for subscription in subscriptions:
+            try:
+                subscription.loop.call_soon_threadsafe(subscription.push, delta)
+            except RuntimeError:
+                # The loop closed under a connection that is going away
+                pass
+
+
+class RedisBroker(InMemoryBroker):
+    """Shares dashboard events between processes over Redis pub/sub.
+
+    Events are published to one channel per user, and one listener
+    thread per process hands them to the local connections. The
+    listener subscribes again when its connection drops, waiting longer
+    after each failed attempt, and has the local connections refresh
+    for the events missed meanwhile."""
+    channel_prefix = 'dashboard-events:'
+    # Seconds before the first and the slowest reconnection attempts
+    reconnect_delay = 1
+    max_reconnect_delay = 30
+
+    def __init__(self, url, **options):
+        super().__init__(**options)
+        import redis
+        self._client = redis.Redis.from_url(url)
+        self._listener = None
+
+    def subscribe(self, user_id, loop, ready):
+        with self._lock:
+            if self._listener is None:
+                self._listener = threading.Thread(
+                    target=self.listen,
+                    name='dashboard-events',
+                    daemon=True
+                )
+                self._listener.start()
+        return super().subscribe(user_id, loop, ready)
+
+    def publish(self, user_id, delta):
+        self._client.publish(
+            f'{self.channel_prefix}{user_id}',
+            json.dumps(delta)
+        )
+
+    def listen(self):
+        delay = self.reconnect_delay
+        reconnecting = False
+        while True:
+            pubsub = self._client.pubsub(ignore_subscribe_messages=True)
+            try:
+                pubsub.psubscribe(f'{self.channel_prefix}*')
+                if reconnecting:
+                    self.refresh_all()
+                delay = self.reconnect_delay
+                for message in pubsub.listen():
+                    self.handle_message(message)
+            except Exception:
+                logger.exception(
+                    'Dashboard event listener lost its Redis connection; '
+                    'reconnecting in %s s',
+                    delay
+                )
+            finally:
+                pubsub.close()
+            reconnecting = True
+            time.sleep(delay)
+            delay = min(delay * 2, self.max_reconnect_delay)
+
+    def handle_message(self, message):
+        try:
+            channel = message['channel'].decode()
+            user_id = int(channel[len(self.channel_prefix):])
+            delta = json.loads(message['data'])
+        except (KeyError, ValueError):
+            logger.warning('Ignoring malformed dashboard event %r', message)
+            return
+        self.deliver(user_id, delta)
+
+
+_broker = None
+_broker_lock = threading.Lock()
+
+
+def get_broker():
+    """Return the process-wide broker configured by
+    ``DASHBOARD_EVENTS``."""
+    global _broker
+    with _broker_lock:
+        if _broker is None:
+            config = settings.DASHBOARD_EVENTS
+            _broker = import_string(config['BACKEND'])(
+                **config.get('OPTIONS', {})
+            )
+        return _broker
+
+
+def publish(user_id, delta):
+    """Push a dashboard delta, or ``None`` for a full refresh, to a
+    user's live connections. Runs after the write has committed, so a
+    broker error is logged rather than raised."""
+    try:
+        get_broker().publish(user_id, delta)
+    except Exception:
+        logger.exception(
+            'Could not publish dashboard event for user %s',
+            user_id
+        )
@@ -0,0 +1,79 @@
+import statistics
+import time
+from asgiref.sync import async_to_sync
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from dashboards.snapshots import acompute_dashboard, compute_dashboard
+
+
+class Command(BaseCommand):
+    help = 'Time the sync and async dashboard computations of a user'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--user',
+            required=True,
+            help='Email of the user whose dashboard is computed'
+        )
+        parser.add_argument(
+            '--iterations',
+            type=int,
+            default=200,
+            help='Computations timed per path'
+        )
+        parser.add_argument(
+            '--latency',
+            type=float,
+            default=0,
+            help='Milliseconds added to every query, to stand in for '
+                 'a database across the network'
+        )
+
+    def handle(self, *args, **options):
+        User = get_user_model()
+        try:
+            user_id = User.objects.get(email=options['user']).pk
+        except User.DoesNotExist:
+            raise CommandError(f'User "{options["user"]}" does not exist')
+        iterations = options['iterations']
+        if iterations < 2:
+            raise CommandError('At least 2 iterations are needed')
+        latency = options['latency'] / 1000
+
+        def delayed(execute, sql, params, many, context):
+            time.sleep(latency)
+            return execute(sql, params, many, context)
+
+        def run_sync():
+            timings = []
+            for _ in range(iterations):
+                started = time.perf_counter()
+                compute_dashboard(user_id)
+                timings.append(time.perf_counter() - started)
+            return timings
+
+        async def run_async():
+            timings = []
+            for _ in range(iterations):
+                started = time.perf_counter()
+                await acompute_dashboard(user_id)
+                timings.append(time.perf_counter() - started)
+            return timings
+
+        with connection.execute_wrapper(delayed):
+            # Warm up connections and caches before timing
+            compute_dashboard(user_id)
+            results = [
+                ('sync', run_sync()),
+                ('async', async_to_sync(run_async)()),
+            ]
+
+        for name, timings in results:
+            percentiles = statistics.quantiles(timings, n=100)
+            self.stdout.write(
+                f'{name:>5}: mean {statistics.fmean(timings) * 1000:.2f} ms, '
+                f'p50 {percentiles[49] * 1000:.2f} ms, '
+                f'p95 {percentiles[94] * 1000:.2f} ms, '
+                f'p99 {percentiles[98] * 1000:.2f} ms'
+            )
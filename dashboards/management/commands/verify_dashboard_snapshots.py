@@ -0,0 +1,55 @@
+from django.core.management.base import BaseCommand
+from dashboards.models import DashboardSnapshot
+from dashboards.snapshots import (
+    SNAPSHOT_FIELDS,
+    as_json,
+    build_snapshot,
+    compute_dashboard
+)
+
+
+class Command(BaseCommand):
+    help = 'Compare dashboard snapshots with a full recompute'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--fix',
+            action='store_true',
+            help='Rebuild the snapshots that do not match'
+        )
+
+    def handle(self, *args, **options):
+        checked = 0
+        mismatched = []
+        for snapshot in DashboardSnapshot.objects.iterator(chunk_size=500):
+            checked += 1
+            expected = as_json(
+                compute_dashboard(snapshot.user_id, snapshot.month)
+            )
+            stored = as_json({
+                field: getattr(snapshot, field) for field in SNAPSHOT_FIELDS
+            })
+            differing = [
+                field for field in SNAPSHOT_FIELDS
+                if stored[field] != expected[field]
+            ]
+            if differing:
+                mismatched.append(snapshot.user_id)
+                self.stdout.write(
+                    self.style.WARNING(
+                        f'Snapshot of user {snapshot.user_id} differs in '
+                        f'{", ".join(differing)}'
+                    )
+                )
+
+        if options['fix']:
+            for user_id in mismatched:
+                build_snapshot(user_id)
+
+        style = self.style.WARNING if mismatched else self.style.SUCCESS
+        self.stdout.write(
+            style(
+                f'Checked {checked} snapshots; {len(mismatched)} differed'
+                + (' and were rebuilt' if options['fix'] and mismatched else '')
+            )
+        )
@@ -0,0 +1,31 @@
+# Generated by Django 5.1.1 on 2026-10-18 07:15
+
+import django.db.models.deletion
+import rest_framework.utils.encoders
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('users', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DashboardSnapshot',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='+', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('month', models.DateField()),
+                ('total_income', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('total_expenses', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('total_budget', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('goals', models.JSONField(default=list, encoder=rest_framework.utils.encoders.JSONEncoder)),
+                ('recent_transactions', models.JSONField(default=list, encoder=rest_framework.utils.encoders.JSONEncoder)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
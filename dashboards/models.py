@@ -1,3 +1,43 @@
+from django.conf import settings
 from django.db import models
+from rest_framework.utils.encoders import JSONEncoder
 
-# Create your models here.
+
+class DashboardSnapshot(models.Model):
+    """Materialized dashboard of a user for the current month, kept up
+    to date by deltas as transactions, budgets and goals change."""
+    user = models.OneToOneField(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='+'
+    )
+    month = models.DateField()
+    total_income = models.DecimalField(
+        max_digits=14,
+        decimal_places=2,
+        default=0
+    )
+    total_expenses = models.DecimalField(
+        max_digits=14,
+        decimal_places=2,
+        default=0
+    )
+    total_budget = models.DecimalField(
+        max_digits=14,
+        decimal_places=2,
+        default=0
+    )
+    # Encoded like the JSON renderer so a snapshot renders like a recompute
+    goals = models.JSONField(
+        default=list,
+        encoder=JSONEncoder
+    )
+    recent_transactions = models.JSONField(
+        default=list,
+        encoder=JSONEncoder
+    )
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Dashboard of {self.user_id} for {self.month:%Y-%m}"
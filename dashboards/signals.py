@@ -0,0 +1,94 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from budgets.models import Budget
+from categories.models import Category
+from goals.models import Goal
+from transactions.models import Transaction
+from transactions.signals import transactions_bulk_created
+from users.utils import is_user_deletion
+from .snapshots import (
+    budget_changed,
+    discard_snapshots,
+    goal_changed,
+    transactions_changed
+)
+
+# Values of a transaction that the dashboard shows or totals
+DASHBOARD_FIELDS = (
+    'id',
+    'user_id',
+    'amount',
+    'transaction_type',
+    'category_id',
+    'created_at'
+)
+
+
+@receiver(post_save, sender=Transaction)
+def update_dashboard_on_transaction_save(sender, instance, created, **kwargs):
+    """Apply a saved transaction to its owner's dashboard snapshot."""
+    if created:
+        transactions_changed(added=[instance])
+        return
+
+    old_values = getattr(instance, '_loaded_values', {})
+    if not all(field in old_values for field in DASHBOARD_FIELDS):
+        # The previous values are unknown; rebuild on the next read
+        discard_snapshots([instance.user_id])
+        return
+    if all(
+        old_values[field] == getattr(instance, field)
+        for field in DASHBOARD_FIELDS
+    ):
+        return
+    old = Transaction(
+        **{field: old_values[field] for field in DASHBOARD_FIELDS}
+    )
+    transactions_changed(removed=[old], added=[instance])
+
+
+@receiver(post_delete, sender=Transaction)
+def update_dashboard_on_transaction_delete(sender, instance, origin=None, **kwargs):
+    """Take a deleted transaction out of its owner's dashboard snapshot."""
+    if is_user_deletion(origin):
+        return
+    transactions_changed(removed=[instance])
+
+
+@receiver(transactions_bulk_created, sender=Transaction)
+def update_dashboard_on_bulk_create(sender, transactions, **kwargs):
+    """Apply bulk inserted transactions to their owners' snapshots."""
+    transactions_changed(added=transactions)
+
+
+@receiver(post_save, sender=Goal)
+def update_dashboard_on_goal_save(sender, instance, **kwargs):
+    goal_changed(instance)
+
+
+@receiver(post_delete, sender=Goal)
+def update_dashboard_on_goal_delete(sender, instance, origin=None, **kwargs):
+    if is_user_deletion(origin):
+        return
+    goal_changed(instance, deleted=True)
+
+
+@receiver(post_save, sender=Budget)
+def update_dashboard_on_budget_save(sender, instance, created, **kwargs):
+    budget_changed(instance, created=created)
+
+
+@receiver(post_delete, sender=Budget)
+def update_dashboard_on_budget_delete(sender, instance, origin=None, **kwargs):
+    if is_user_deletion(origin):
+        return
+    budget_changed(instance, deleted=True)
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def discard_dashboards_on_category_change(sender, created=False, **kwargs):
+    """Recent transactions show category names, which any user's
+    snapshot may hold; new categories cannot be shown yet."""
+    if not created:
+        discard_snapshots()
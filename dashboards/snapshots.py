@@ -0,0 +1,371 @@
+import asyncio
+import json
+from datetime import datetime, time
+from decimal import Decimal
+from functools import partial
+from django.db import transaction as db_transaction
+from django.db.models import Q, Sum
+from django.utils import timezone
+from rest_framework.utils.encoders import JSONEncoder
+from budgets.models import Budget
+from categories.models import Category
+from goals.models import Goal
+from transactions.models import Transaction
+from .events import publish
+from .models import DashboardSnapshot
+
+# Number of latest transactions shown on the dashboard
+RECENT_TRANSACTIONS = 5
+
+# Fields of a snapshot that a full recompute produces
+SNAPSHOT_FIELDS = (
+    'month',
+    'total_income',
+    'total_expenses',
+    'total_budget',
+    'goals',
+    'recent_transactions'
+)
+
+
+def current_month():
+    """Return the first day of the current local month."""
+    return timezone.localdate().replace(day=1)
+
+
+def month_start(month):
+    """Return the aware datetime at which ``month`` begins."""
+    return timezone.make_aware(datetime.combine(month, time.min))
+
+
+def as_json(data):
+    """Encode ``data`` like the JSON renderer does, so stored and freshly
+    computed values compare equal."""
+    return json.loads(json.dumps(data, cls=JSONEncoder))
+
+
+def goal_entry(goal):
+    return as_json({
+        'id': goal.pk,
+        'title': goal.title,
+        'goal_type': goal.goal_type,
+        'target_amount': goal.target_amount,
+        'current_amount': goal.current_amount,
+        'progress': goal.get_progress(),
+        'completed': goal.is_completed(),
+    })
+
+
+def recent_entry(transaction_id, amount, category, transaction_type, created_at):
+    return as_json({
+        'id': transaction_id,
+        'amount': Decimal(str(amount)),
+        'category': category,
+        'transaction_type': transaction_type,
+        'date': timezone.localtime(created_at).strftime('%Y-%m-%d'),
+        # Sort key for merging new transactions in; not rendered
+        'timestamp': created_at.timestamp(),
+    })
+
+
+def recency(entry):
+    return (entry['timestamp'], entry['id'])
+
+
+def month_transactions(user_id, month):
+    return Transaction.objects.filter(
+        user_id=user_id,
+        created_at__gte=month_start(month)
+    )
+
+
+def month_totals():
+    """Return the aggregates of a month's income and expenses."""
+    return {
+        'total_income': Sum(
+            'amount',
+            filter=Q(transaction_type='income'),
+            default=Decimal(0)
+        ),
+        'total_expenses': Sum(
+            'amount',
+            filter=Q(transaction_type='expense'),
+            default=Decimal(0)
+        ),
+    }
+
+
+def budget_total():
+    return {'total_budget': Sum('amount', default=Decimal(0))}
+
+
+def user_goals(user_id):
+    return Goal.objects.filter(user_id=user_id).only(
+        'title',
+        'goal_type',
+        'target_amount',
+        'current_amount'
+    ).order_by('id')
+
+
+def recent_rows(user_id):
+    """Return the latest transactions of a user as rows for
+    ``recent_entry``, with the category name joined in."""
+    return Transaction.objects.filter(
+        user_id=user_id
+    ).order_by('-created_at', '-id').values_list(
+        'id',
+        'amount',
+        'category__name',
+        'transaction_type',
+        'created_at'
+    )[:RECENT_TRANSACTIONS]
+
+
+def goals_of(user_id):
+    """Return the dashboard entries of all of a user's goals."""
+    return [goal_entry(goal) for goal in user_goals(user_id)]
+
+
+def recent_transactions_of(user_id):
+    """Return the dashboard entries of a user's latest transactions."""
+    return [recent_entry(*row) for row in recent_rows(user_id)]
+
+
+async def agoals_of(user_id):
+    return [goal_entry(goal) async for goal in user_goals(user_id)]
+
+
+async def arecent_transactions_of(user_id):
+    return [recent_entry(*row) async for row in recent_rows(user_id)]
+
+
+def dashboard_data(month, totals, total_budget, goals, recent):
+    return {
+        'month': month,
+        'total_income': totals['total_income'],
+        'total_expenses': totals['total_expenses'],
+        'total_budget': total_budget['total_budget'],
+        'goals': goals,
+        'recent_transactions': recent,
+    }
+
+
+def compute_dashboard(user_id, month=None):
+    """Compute a user's dashboard from scratch in four queries."""
+    month = month or current_month()
+    return dashboard_data(
+        month,
+        month_transactions(user_id, month).aggregate(**month_totals()),
+        Budget.objects.filter(user_id=user_id).aggregate(**budget_total()),
+        goals_of(user_id),
+        recent_transactions_of(user_id)
+    )
+
+
+async def acompute_dashboard(user_id, month=None):
+    """Compute a user's dashboard from scratch with the four queries
+    awaited together rather than one after another."""
+    month = month or current_month()
+    return dashboard_data(month, *await asyncio.gather(
+        month_transactions(user_id, month).aaggregate(**month_totals()),
+        Budget.objects.filter(user_id=user_id).aaggregate(**budget_total()),
+        agoals_of(user_id),
+        arecent_transactions_of(user_id)
+    ))
+
+
+def build_snapshot(user_id):
+    """Recompute and store a user's snapshot."""
+    snapshot, _ = DashboardSnapshot.objects.update_or_create(
+        user_id=user_id,
+        defaults=compute_dashboard(user_id)
+    )
+    return snapshot
+
+
+async def abuild_snapshot(user_id):
+    snapshot, _ = await DashboardSnapshot.objects.aupdate_or_create(
+        user_id=user_id,
+        defaults=await acompute_dashboard(user_id)
+    )
+    return snapshot
+
+
+def render_snapshot(snapshot):
+    """Return the dashboard response data of a snapshot."""
+    total_budget = snapshot.total_budget
+    total_spent = snapshot.total_expenses
+    return {
+        'total_income': snapshot.total_income,
+        'total_expenses': snapshot.total_expenses,
+        'total_budget': total_budget,
+        'total_spent': total_spent,
+        'budget_utilization': (total_spent / total_budget * 100) if total_budget > 0 else 0,
+        'goals': snapshot.goals,
+        'recent_transactions': [
+            {key: value for key, value in entry.items() if key != 'timestamp'}
+            for entry in snapshot.recent_transactions
+        ],
+    }
+
+
+def get_dashboard(user):
+    """Return a user's dashboard from its snapshot, building the
+    snapshot first if it is missing or from a past month."""
+    snapshot = DashboardSnapshot.objects.filter(user=user).first()
+    if snapshot is None or snapshot.month != current_month():
+        snapshot = build_snapshot(user.pk)
+    return render_snapshot(snapshot)
+
+
+async def aget_dashboard(user):
+    """Async counterpart of ``get_dashboard``."""
+    snapshot = await DashboardSnapshot.objects.filter(user=user).afirst()
+    if snapshot is None or snapshot.month != current_month():
+        snapshot = await abuild_snapshot(user.pk)
+    return render_snapshot(snapshot)
+
+
+def locked_snapshot(user_id):
+    """Return a user's snapshot of the current month locked for update,
+    or ``None`` if there is none to maintain; a missing or outdated
+    snapshot is rebuilt on the next read instead."""
+    return DashboardSnapshot.objects.select_for_update().filter(
+        user_id=user_id,
+        month=current_month()
+    ).first()
+
+
+def publish_changes(user_id, before, after):
+    """Send the dashboard fields that differ between two renders to
+    the user's live connections once the transaction commits."""
+    delta = {
+        key: value for key, value in after.items()
+        if before.get(key) != value
+    }
+    if delta:
+        db_transaction.on_commit(partial(publish, user_id, as_json(delta)))
+
+
+def discard_snapshots(user_ids=None):
+    """Drop snapshots that cannot be updated by a delta, for all users
+    or only ``user_ids``; they are rebuilt on the next read, and live
+    connections are told to fetch the whole dashboard again."""
+    snapshots = DashboardSnapshot.objects.all()
+    if user_ids is not None:
+        snapshots = snapshots.filter(user_id__in=user_ids)
+    owners = list(snapshots.values_list('user_id', flat=True))
+    snapshots.delete()
+    for user_id in owners:
+        db_transaction.on_commit(partial(publish, user_id, None))
+
+
+def merge_recent(recent, removed, added):
+    """Return the recent transaction entries after ``removed`` and
+    ``added`` transactions, or ``None`` if they must be fetched again
+    because a listed transaction changed or went away."""
+    listed = {entry['id'] for entry in recent}
+    if any(transaction.pk in listed for transaction in removed):
+        return None
+
+    candidates = [(recency(entry), entry) for entry in recent] + [
+        ((transaction.created_at.timestamp(), transaction.pk), transaction)
+        for transaction in added
+    ]
+    candidates.sort(key=lambda candidate: candidate[0], reverse=True)
+    latest = [item for _, item in candidates[:RECENT_TRANSACTIONS]]
+
+    new = [item for item in latest if isinstance(item, Transaction)]
+    names = dict(
+        Category.objects.filter(
+            pk__in={transaction.category_id for transaction in new}
+        ).values_list('id', 'name')
+    ) if new else {}
+    return [
+        recent_entry(
+            item.pk,
+            item.amount,
+            names.get(item.category_id),
+            item.transaction_type,
+            item.created_at
+        ) if isinstance(item, Transaction) else item
+        for item in latest
+    ]
+
+
+def transactions_changed(removed=(), added=()):
+    """Apply transactions going away (``removed``, with the values they
+    had) and coming in (``added``) to their owners' snapshots.
+
+    Monthly totals move by the amounts involved and new transactions
+    are merged into the recent list; that list is only fetched again
+    when one of its entries changed."""
+    user_ids = {transaction.user_id for transaction in (*removed, *added)}
+    with db_transaction.atomic(savepoint=False):
+        for user_id in user_ids:
+            snapshot = locked_snapshot(user_id)
+            if snapshot is None:
+                continue
+            before = render_snapshot(snapshot)
+            start = month_start(snapshot.month)
+            own_removed = [t for t in removed if t.user_id == user_id]
+            own_added = [t for t in added if t.user_id == user_id]
+
+            for sign, transactions in ((-1, own_removed), (1, own_added)):
+                for transaction in transactions:
+                    if transaction.created_at < start:
+                        continue
+                    amount = sign * Decimal(str(transaction.amount))
+                    if transaction.transaction_type == 'income':
+                        snapshot.total_income += amount
+                    else:
+                        snapshot.total_expenses += amount
+
+            recent = merge_recent(
+                snapshot.recent_transactions,
+                own_removed,
+                own_added
+            )
+            snapshot.recent_transactions = (
+                recent_transactions_of(user_id) if recent is None else recent
+            )
+            snapshot.save()
+            publish_changes(user_id, before, render_snapshot(snapshot))
+
+
+def goal_changed(goal, deleted=False):
+    """Replace, add or drop a goal's entry in its owner's snapshot."""
+    with db_transaction.atomic(savepoint=False):
+        snapshot = locked_snapshot(goal.user_id)
+        if snapshot is None:
+            return
+        before = render_snapshot(snapshot)
+        goals = [entry for entry in snapshot.goals if entry['id'] != goal.pk]
+        if not deleted:
+            goals.append(goal_entry(goal))
+        snapshot.goals = sorted(goals, key=lambda entry: entry['id'])
+        snapshot.save(update_fields=['goals', 'updated_at'])
+        publish_changes(goal.user_id, before, render_snapshot(snapshot))
+
+
+def budget_changed(budget, created=False, deleted=False):
+    """Move the budget total of a budget's owner by the budget amount.
+    An edited budget's previous amount is not known, so the total is
+    summed again instead."""
+    with db_transaction.atomic(savepoint=False):
+        snapshot = locked_snapshot(budget.user_id)
+        if snapshot is None:
+            return
+        before = render_snapshot(snapshot)
+        if created or deleted:
+            amount = Decimal(str(budget.amount))
+            snapshot.total_budget += -amount if deleted else amount
+        else:
+            snapshot.total_budget = Budget.objects.filter(
+                user_id=budget.user_id
+            ).aggregate(
+                total_budget=Sum('amount', default=Decimal(0))
+            )['total_budget']
+        snapshot.save(update_fields=['total_budget', 'updated_at'])
+        publish_changes(budget.user_id, before, render_snapshot(snapshot))
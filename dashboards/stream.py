@@ -0,0 +1,45 @@
+import asyncio
+import json
+from django.conf import settings
+from rest_framework.utils.encoders import JSONEncoder
+from .events import get_broker
+from .snapshots import aget_dashboard
+
+
+def server_sent_event(event, data):
+    """Format one server-sent event with a JSON payload."""
+    return f'event: {event}\ndata: {json.dumps(data, cls=JSONEncoder)}\n\n'
+
+
+async def dashboard_events(user):
+    """Yield the user's whole dashboard and then the fields that change
+    as server-sent events, until the client goes away."""
+    broker = get_broker()
+    subscription = broker.subscribe(
+        user.pk,
+        asyncio.get_running_loop(),
+        asyncio.Event()
+    )
+    try:
+        # Subscribed before the first read, so no change is missed;
+        # deltas hold new values, so replaying one the read already
+        # includes is harmless
+        dashboard = await aget_dashboard(user)
+        yield server_sent_event('dashboard', dashboard)
+        while True:
+            try:
+                await asyncio.wait_for(
+                    subscription.ready.wait(),
+                    settings.DASHBOARD_EVENTS_KEEPALIVE
+                )
+            except asyncio.TimeoutError:
+                yield ': keepalive\n\n'
+                continue
+            refresh, delta = subscription.take()
+            if refresh:
+                dashboard = await aget_dashboard(user)
+                yield server_sent_event('dashboard', dashboard)
+            elif delta:
+                yield server_sent_event('delta', delta)
+    finally:
+        broker.unsubscribe(user.pk, subscription)
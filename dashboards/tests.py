@@ -1,3 +1,485 @@
-from django.test import TestCase
+import asyncio
+import json
+from datetime import date, timedelta
+from decimal import Decimal
+from io import StringIO
+from unittest import mock
+from asgiref.sync import sync_to_async
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import SimpleTestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import RefreshToken
+from budgets.models import Budget
+from categories.models import Category
+from goals.models import Goal
+from transactions.models import Transaction
+from .events import RedisBroker, get_broker
+from .models import DashboardSnapshot
+from .snapshots import (
+    SNAPSHOT_FIELDS,
+    acompute_dashboard,
+    as_json,
+    compute_dashboard,
+    get_dashboard
+)
+from .stream import dashboard_events
 
-# Create your tests here.
+User = get_user_model()
+
+
+class DashboardTests(APITestCase):
+    """Tests for the dashboard endpoint."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email='testuser@example.com',
+            username='testuser',
+            password='testpassword'
+        )
+        access_token = str(RefreshToken.for_user(self.user).access_token)
+        self.headers = {'Authorization': 'Bearer ' + access_token}
+        self.client.credentials(HTTP_AUTHORIZATION='Bearer ' + access_token)
+        self.expense_category = Category.objects.create(
+            name='Groceries',
+            category_type='expense'
+        )
+        self.income_category = Category.objects.create(
+            name='Salary',
+            category_type='income'
+        )
+        self.month_start = timezone.localtime().replace(
+            day=1,
+            hour=12,
+            minute=0,
+            second=0,
+            microsecond=0
+        )
+        Budget.objects.create(
+            user=self.user,
+            category=self.expense_category,
+            amount=400,
+            start_date=date(2024, 1, 1),
+            end_date=date(2030, 12, 31)
+        )
+
+    def create_transaction(self, amount, category, created_at):
+        return Transaction.objects.create(
+            user=self.user,
+            amount=amount,
+            transaction_type=category.category_type,
+            category=category,
+            created_at=created_at
+        )
+
+    def test_dashboard_totals(self):
+        """Test the monthly totals, budget use, goals and recent items."""
+        self.create_transaction(100, self.expense_category, self.month_start)
+        self.create_transaction(1000, self.income_category, self.month_start)
+        self.create_transaction(
+            55,
+            self.expense_category,
+            self.month_start - timedelta(days=2)
+        )
+        Goal.objects.create(
+            user=self.user,
+            title='Holiday',
+            target_amount=1000,
+            current_amount=250
+        )
+
+        response = self.client.get(reverse('dashboard'))
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['total_income'], Decimal('1000'))
+        self.assertEqual(response.data['total_expenses'], Decimal('100'))
+        self.assertEqual(response.data['total_spent'], Decimal('100'))
+        self.assertEqual(response.data['total_budget'], Decimal('400'))
+        self.assertEqual(response.data['budget_utilization'], Decimal('25'))
+        self.assertEqual(response.data['goals'][0]['progress'], Decimal('25'))
+        self.assertEqual(
+            [item['amount'] for item in response.data['recent_transactions']],
+            [Decimal('1000.00'), Decimal('100.00'), Decimal('55.00')]
+        )
+        self.assertEqual(
+            response.data['recent_transactions'][0]['category'],
+            'Salary'
+        )
+
+    def test_dashboard_query_count_is_constant(self):
+        """Test that the number of queries does not grow with the data."""
+        for day in range(10):
+            self.create_transaction(
+                day + 1,
+                self.expense_category,
+                self.month_start - timedelta(days=day)
+            )
+        for number in range(5):
+            Goal.objects.create(
+                user=self.user,
+                title=f'Goal {number}',
+                target_amount=100,
+                current_amount=number
+            )
+
+        # The first read builds the snapshot
+        self.client.get(reverse('dashboard'))
+
+        # Authentication and the snapshot
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse('dashboard'))
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data['goals']), 5)
+        self.assertEqual(len(response.data['recent_transactions']), 5)
+
+    def assertSnapshotIsFresh(self):
+        snapshot = DashboardSnapshot.objects.get(user=self.user)
+        self.assertEqual(
+            as_json({field: getattr(snapshot, field) for field in SNAPSHOT_FIELDS}),
+            as_json(compute_dashboard(self.user.pk))
+        )
+
+    def test_snapshot_follows_transaction_changes(self):
+        """Test that transaction writes keep the snapshot up to date."""
+        for day in range(6):
+            self.create_transaction(
+                10,
+                self.expense_category,
+                self.month_start - timedelta(days=day)
+            )
+        self.client.get(reverse('dashboard'))
+
+        added = self.create_transaction(
+            500,
+            self.income_category,
+            self.month_start + timedelta(minutes=1)
+        )
+        self.assertSnapshotIsFresh()
+
+        added.amount = 250
+        added.save()
+        self.assertSnapshotIsFresh()
+
+        added.delete()
+        self.assertSnapshotIsFresh()
+
+        Transaction.objects.filter(user=self.user).first().delete()
+        self.assertSnapshotIsFresh()
+
+    def test_snapshot_follows_bulk_create(self):
+        """Test that bulk created transactions reach the snapshot."""
+        self.client.get(reverse('dashboard'))
+        data = [
+            {
+                'amount': '12.50',
+                'transaction_type': 'expense',
+                'category': self.expense_category.id,
+                'description': f'Row {number}',
+            }
+            for number in range(3)
+        ]
+
+        response = self.client.post(
+            reverse('transactions-bulk'),
+            data,
+            format='json'
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertSnapshotIsFresh()
+
+    def test_snapshot_follows_goals_and_budgets(self):
+        """Test that goal and budget writes keep the snapshot up to date."""
+        self.client.get(reverse('dashboard'))
+
+        goal = Goal.objects.create(
+            user=self.user,
+            title='Car',
+            target_amount=5000,
+            current_amount=100
+        )
+        self.assertSnapshotIsFresh()
+        goal.current_amount = 5000
+        goal.save()
+        self.assertSnapshotIsFresh()
+        goal.delete()
+        self.assertSnapshotIsFresh()
+
+        budget = Budget.objects.create(
+            user=self.user,
+            category=self.income_category,
+            amount=150,
+            start_date=date(2024, 1, 1),
+            end_date=date(2030, 12, 31)
+        )
+        self.assertSnapshotIsFresh()
+        budget.amount = 90
+        budget.save()
+        self.assertSnapshotIsFresh()
+        budget.delete()
+        self.assertSnapshotIsFresh()
+
+    def test_snapshot_is_rebuilt_when_discarded(self):
+        """Test that a renamed category is shown after a rebuild."""
+        self.create_transaction(20, self.expense_category, self.month_start)
+        self.client.get(reverse('dashboard'))
+
+        self.expense_category.name = 'Food'
+        self.expense_category.save()
+        self.assertFalse(
+            DashboardSnapshot.objects.filter(user=self.user).exists()
+        )
+
+        response = self.client.get(reverse('dashboard'))
+
+        self.assertEqual(
+            response.data['recent_transactions'][0]['category'],
+            'Food'
+        )
+
+    async def test_async_dashboard_matches_sync(self):
+        """Test that the async view serves the same dashboard."""
+        await sync_to_async(self.create_transaction)(
+            80,
+            self.expense_category,
+            self.month_start
+        )
+        await Goal.objects.acreate(
+            user=self.user,
+            title='Holiday',
+            target_amount=1000,
+            current_amount=250
+        )
+
+        response = await self.async_client.get(
+            reverse('dashboard-async'),
+            headers=self.headers
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        expected = await sync_to_async(
+            lambda: self.client.get(reverse('dashboard')).json()
+        )()
+        self.assertEqual(response.json(), expected)
+
+    async def test_async_compute_matches_sync(self):
+        """Test that both computations produce the same snapshot."""
+        await sync_to_async(self.create_transaction)(
+            15,
+            self.income_category,
+            self.month_start
+        )
+
+        self.assertEqual(
+            as_json(await acompute_dashboard(self.user.pk)),
+            as_json(await sync_to_async(compute_dashboard)(self.user.pk))
+        )
+
+    def test_benchmark_command_reports_both_paths(self):
+        """Test that the benchmark times the sync and async paths."""
+        out = StringIO()
+
+        call_command(
+            'benchmark_dashboard',
+            user=self.user.email,
+            iterations=3,
+            stdout=out
+        )
+
+        self.assertIn(' sync: mean', out.getvalue())
+        self.assertIn('async: mean', out.getvalue())
+
+    def test_verify_command_detects_and_fixes_drift(self):
+        """Test that the verify command reports and rebuilds stale rows."""
+        self.create_transaction(30, self.expense_category, self.month_start)
+        self.client.get(reverse('dashboard'))
+        DashboardSnapshot.objects.filter(user=self.user).update(
+            total_expenses=Decimal('999')
+        )
+
+        out = StringIO()
+        call_command('verify_dashboard_snapshots', stdout=out)
+        self.assertIn('differs in total_expenses', out.getvalue())
+        self.assertIn('1 differed', out.getvalue())
+
+        call_command('verify_dashboard_snapshots', '--fix', stdout=StringIO())
+        self.assertSnapshotIsFresh()
+
+
+class DashboardEventsTests(APITestCase):
+    """Tests for the live dashboard stream."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email='testuser@example.com',
+            username='testuser',
+            password='testpassword'
+        )
+        access_token = str(RefreshToken.for_user(self.user).access_token)
+        self.headers = {'Authorization': 'Bearer ' + access_token}
+        self.category = Category.objects.create(
+            name='Groceries',
+            category_type='expense'
+        )
+
+    async def next_event(self, stream):
+        chunk = await asyncio.wait_for(anext(stream), timeout=5)
+        lines = chunk.decode().splitlines()
+        return lines[0].removeprefix('event: '), json.loads(
+            lines[1].removeprefix('data: ')
+        )
+
+    def commit(self, action):
+        with self.captureOnCommitCallbacks(execute=True):
+            return action()
+
+    async def test_stream_requires_authentication(self):
+        """Test that anonymous clients are turned away."""
+        response = await self.async_client.get(reverse('dashboard-events'))
+
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    async def test_stream_sends_dashboard_then_deltas(self):
+        """Test that changes reach an open stream as deltas."""
+        response = await self.async_client.get(
+            reverse('dashboard-events'),
+            headers=self.headers
+        )
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        stream = aiter(response.streaming_content)
+
+        event, data = await self.next_event(stream)
+        self.assertEqual(event, 'dashboard')
+        self.assertEqual(data['total_expenses'], 0)
+
+        await sync_to_async(self.commit)(
+            lambda: Transaction.objects.create(
+                user=self.user,
+                amount=40,
+                transaction_type='expense',
+                category=self.category
+            )
+        )
+        event, data = await self.next_event(stream)
+        self.assertEqual(event, 'delta')
+        self.assertEqual(data['total_expenses'], 40)
+        self.assertEqual(len(data['recent_transactions']), 1)
+        self.assertNotIn('goals', data)
+
+        await sync_to_async(self.commit)(
+            lambda: Goal.objects.create(
+                user=self.user,
+                title='Holiday',
+                target_amount=1000,
+                current_amount=100
+            )
+        )
+        event, data = await self.next_event(stream)
+        self.assertEqual(list(data), ['goals'])
+        await stream.aclose()
+
+    async def test_closed_stream_unsubscribes(self):
+        """Test that a connection going away leaves the broker."""
+        events = dashboard_events(self.user)
+        await anext(events)
+        self.assertEqual(get_broker().subscriber_count(self.user.pk), 1)
+
+        await events.aclose()
+
+        self.assertEqual(get_broker().subscriber_count(self.user.pk), 0)
+
+    async def test_stream_resends_dashboard_after_discard(self):
+        """Test that a discarded snapshot is sent again in full."""
+        response = await self.async_client.get(
+            reverse('dashboard-events'),
+            headers=self.headers
+        )
+        stream = aiter(response.streaming_content)
+        await self.next_event(stream)
+
+        self.category.name = 'Food'
+        await sync_to_async(self.commit)(self.category.save)
+
+        event, data = await self.next_event(stream)
+        self.assertEqual(event, 'dashboard')
+        self.assertIn('budget_utilization', data)
+        await stream.aclose()
+
+    def test_slow_connections_merge_deltas(self):
+        """Test that pending deltas are merged rather than queued."""
+        subscription = get_broker().subscribe(
+            self.user.pk,
+            None,
+            asyncio.Event()
+        )
+        try:
+            subscription.push({'total_income': '1.00'})
+            subscription.push({'total_income': '2.00', 'goals': []})
+
+            self.assertEqual(
+                subscription.take(),
+                (False, {'total_income': '2.00', 'goals': []})
+            )
+            self.assertFalse(subscription.ready.is_set())
+        finally:
+            get_broker().unsubscribe(self.user.pk, subscription)
+
+    def test_failed_publish_does_not_fail_the_write(self):
+        """Test that a broker error after commit is logged, not raised."""
+        get_dashboard(self.user)
+        with mock.patch.object(
+            get_broker(),
+            'publish',
+            side_effect=ConnectionError
+        ), self.assertLogs('dashboards.events', level='ERROR'):
+            self.commit(
+                lambda: Transaction.objects.create(
+                    user=self.user,
+                    amount=40,
+                    transaction_type='expense',
+                    category=self.category
+                )
+            )
+
+        self.assertEqual(Transaction.objects.filter(user=self.user).count(), 1)
+
+
+class RedisBrokerTests(SimpleTestCase):
+    """Tests for the Redis listener of the dashboard events."""
+
+    class Stop(BaseException):
+        pass
+
+    def test_listener_reconnects_after_dropped_connection(self):
+        """Test that the listener subscribes again after an error and
+        has the local connections refresh for missed events."""
+        dropped = mock.Mock()
+        dropped.listen.side_effect = ConnectionError
+        restored = mock.Mock()
+        restored.listen.return_value = iter([
+            {'channel': b'dashboard-events:7', 'data': b'{"goals": []}'},
+            {'channel': b'unexpected', 'data': b''},
+        ])
+        client = mock.Mock()
+        client.pubsub.side_effect = [dropped, restored]
+        with mock.patch('redis.Redis.from_url', return_value=client):
+            broker = RedisBroker('redis://localhost')
+        broker.deliver = mock.Mock()
+        broker.refresh_all = mock.Mock()
+
+        with mock.patch(
+            'dashboards.events.time.sleep',
+            side_effect=[None, self.Stop]
+        ), self.assertLogs('dashboards.events') as logs:
+            with self.assertRaises(self.Stop):
+                broker.listen()
+
+        self.assertIn('lost its Redis connection', logs.output[0])
+        self.assertIn('malformed', logs.output[1])
+        broker.refresh_all.assert_called_once_with()
+        broker.deliver.assert_called_once_with(7, {'goals': []})
+        dropped.close.assert_called_once_with()
@@ -1,5 +1,5 @@
 from django.urls import path
-from .views import DashboardView
+from .views import AsyncDashboardView, DashboardEventsView, DashboardView
 
 urlpatterns = [
     path(
@@ -7,4 +7,14 @@ urlpatterns = [
         DashboardView.as_view(),
         name='dashboard'
     ),
-]
\ No newline at end of file
+    path(
+        'async/',
+        AsyncDashboardView.as_view(),
+        name='dashboard-async'
+    ),
+    path(
+        'events/',
+        DashboardEventsView.as_view(),
+        name='dashboard-events'
+    ),
+]
@@ -1,59 +1,68 @@
+from asgiref.sync import sync_to_async
+from django.http import JsonResponse, StreamingHttpResponse
+from django.views import View
+from rest_framework.exceptions import AuthenticationFailed
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
-from django.db.models import Sum
-from datetime import date
-from transactions.models import Transaction
-from budgets.models import Budget
-from goals.models import Goal
+from rest_framework.utils.encoders import JSONEncoder
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from .snapshots import aget_dashboard, get_dashboard
+from .stream import dashboard_events
 
 class DashboardView(APIView):
+    """Overview of the current month, budgets, goals and the latest
+    transactions, read from the user's materialized snapshot."""
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
-        user = request.user
-
-        # Total income and expenses for the current month
-        today = date.today()
-        month_start = today.replace(day=1)
-        income = Transaction.objects.filter(user=user, transaction_type='income', date__gte=month_start).aggregate(total_income=Sum('amount'))['total_income'] or 0
-        expenses = Transaction.objects.filter(user=user, transaction_type='expense', date__gte=month_start).aggregate(total_expenses=Sum('amount'))['total_expenses'] or 0
-
-        # Budget utilization (sum of all budgets vs. total spent)
-        budgets = Budget.objects.filter(user=user)
-        total_budget = budgets.aggregate(total_budget=Sum('amount'))['total_budget'] or 0
-        total_spent = Transaction.objects.filter(user=user, transaction_type='expense', date__gte=month_start).aggregate(total_spent=Sum('amount'))['total_spent'] or 0
-
-        # Goal progress (for all active goals)
-        goals = Goal.objects.filter(user=user)
-        goal_data = [{
-            'title': goal.title,
-            'goal_type': goal.goal_type,
-            'target_amount': goal.target_amount,
-            'current_amount': goal.current_amount,
-            'progress': goal.get_progress(),
-            'completed': goal.is_completed(),
-        } for goal in goals]
-
-        # Recent transactions (limit to 5 latest transactions)
-        recent_transactions = Transaction.objects.filter(user=user).order_by('-date')[:5]
-        transaction_data = [{
-            'id': transaction.id,
-            'amount': transaction.amount,
-            'category': transaction.category.name if transaction.category else None,
-            'transaction_type': transaction.transaction_type,
-            'date': transaction.date.strftime('%Y-%m-%d')  # Formatting date
-        } for transaction in recent_transactions]
-
-        # Consolidating all the data into the dashboard response
-        dashboard_data = {
-            'total_income': income,
-            'total_expenses': expenses,
-            'total_budget': total_budget,
-            'total_spent': total_spent,
-            'budget_utilization': (total_spent / total_budget * 100) if total_budget > 0 else 0,
-            'goals': goal_data,
-            'recent_transactions': transaction_data,
-        }
-
-        return Response(dashboard_data)
\ No newline at end of file
+        return Response(get_dashboard(request.user))
+
+
+class AsyncJWTView(View):
+    """Base for plain async views that authenticate like the API.
+
+    DRF views are sync only, so the JWT is checked here and handlers
+    receive the user as ``request.user``."""
+
+    async def dispatch(self, request, *args, **kwargs):
+        try:
+            authenticated = await sync_to_async(
+                JWTAuthentication().authenticate
+            )(request)
+        except AuthenticationFailed as exc:
+            return JsonResponse({'detail': str(exc.detail)}, status=401)
+        if authenticated is None:
+            return JsonResponse(
+                {'detail': 'Authentication credentials were not provided.'},
+                status=401
+            )
+        request.user = authenticated[0]
+        return await super().dispatch(request, *args, **kwargs)
+
+
+class AsyncDashboardView(AsyncJWTView):
+    """The dashboard served by the async ORM, for the ASGI application;
+    a snapshot rebuild awaits its queries together."""
+
+    async def get(self, request):
+        return JsonResponse(
+            await aget_dashboard(request.user),
+            encoder=JSONEncoder
+        )
+
+
+class DashboardEventsView(AsyncJWTView):
+    """Live dashboard as server-sent events: the whole dashboard first,
+    then only the fields that change. Connections are held by the event
+    loop, so this needs the ASGI application."""
+
+    async def get(self, request):
+        response = StreamingHttpResponse(
+            dashboard_events(request.user),
+            content_type='text/event-stream'
+        )
+        response['Cache-Control'] = 'no-cache'
+        # Stops nginx from buffering the stream
+        response['X-Accel-Buffering'] = 'no'
+        return response
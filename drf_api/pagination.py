@@ -0,0 +1,17 @@
+from rest_framework.pagination import CursorPagination
+
+
+class CreatedAtCursorPagination(CursorPagination):
+    """Keyset pagination over ``(created_at, id)``, newest first.
+
+    Cursors are opaque and encode a position rather than an offset, so
+    fetching a page costs the same no matter how deep it is."""
+    ordering = ('-created_at', '-id')
+    page_size_query_param = 'page_size'
+    max_page_size = 500
+
+
+class IdCursorPagination(CreatedAtCursorPagination):
+    """Keyset pagination for models without a ``created_at`` column;
+    ids increase with insertion so the order is still newest first."""
+    ordering = ('-id',)
@@ -49,6 +49,8 @@ INSTALLED_APPS = [
     'reports',
     'goals',
     'dashboards',
+    'idempotency',
+    'sync',
 ]
 
 SITE_ID = 1
@@ -111,6 +113,61 @@ else:
     }
 
 
+# Cache
+# https://docs.djangoproject.com/en/5.1/topics/cache/
+# Report cache and budget index versions must be shared by every worker,
+# so outside tests the cache is never per-process memory; without Redis
+# it lives in the database (create it with ``manage.py createcachetable``)
+if 'test' in sys.argv:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+elif not env('REDIS_URL', default=''):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+            'LOCATION': 'cache_table',
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': env('REDIS_URL'),
+        }
+    }
+
+# Pub/sub backend that carries live dashboard updates to the
+# processes holding the connections
+if 'test' in sys.argv or not env('REDIS_URL', default=''):
+    DASHBOARD_EVENTS = {
+        'BACKEND': 'dashboards.events.InMemoryBroker',
+    }
+else:
+    DASHBOARD_EVENTS = {
+        'BACKEND': 'dashboards.events.RedisBroker',
+        'OPTIONS': {
+            'url': env('REDIS_URL'),
+        },
+    }
+
+# Idle live dashboard connections get a comment this often so that
+# proxies do not time them out
+DASHBOARD_EVENTS_KEEPALIVE = 15
+
+# Cached report results expire after this long even without writes
+REPORT_CACHE_TIMEOUT = timedelta(hours=1)
+
+# Background report jobs still running after this long are handed to
+# another worker
+REPORT_JOB_TIMEOUT = timedelta(minutes=10)
+# Run background report jobs in the requesting process instead of a
+# worker; meant for tests and local development
+REPORT_JOBS_EAGER = env.bool('REPORT_JOBS_EAGER', default=False)
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
 
@@ -159,8 +216,24 @@ REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
         'rest_framework_simplejwt.authentication.JWTAuthentication',
     ],
+    'DEFAULT_PAGINATION_CLASS': 'drf_api.pagination.CreatedAtCursorPagination',
+    'PAGE_SIZE': env.int('PAGE_SIZE', default=50),
 }
 
+# Stored responses of Idempotency-Key requests are replayed for this long
+IDEMPOTENCY_KEY_TTL = timedelta(hours=24)
+# A key still pending after this long is taken from a request that died
+# and can be claimed again by a retry
+IDEMPOTENCY_PENDING_TIMEOUT = timedelta(minutes=1)
+
+# Deletions are reported to syncing clients for this long; older sync
+# tokens get a full resync
+SYNC_TOMBSTONE_RETENTION = timedelta(days=90)
+# Each sync window overlaps the previous one by this much
+SYNC_TOKEN_OVERLAP = timedelta(seconds=5)
+# Changed rows returned per page of a sync
+SYNC_PAGE_SIZE = env.int('SYNC_PAGE_SIZE', default=1000)
+
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(minutes=45),
     'REFRESH_TOKEN_LIFETIME': timedelta(days=1),
@@ -0,0 +1,63 @@
+import csv
+import json
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import StreamingHttpResponse
+from rest_framework.renderers import BaseRenderer
+
+
+class CSVStreamRenderer(BaseRenderer):
+    """Lets ``?format=csv`` through content negotiation for views that
+    stream their own response."""
+    media_type = 'text/csv'
+    format = 'csv'
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        # Only error responses are rendered here; data is streamed
+        return json.dumps(data, cls=DjangoJSONEncoder).encode(self.charset)
+
+
+class NDJSONStreamRenderer(CSVStreamRenderer):
+    """Lets ``?format=ndjson`` through content negotiation for views
+    that stream their own response."""
+    media_type = 'application/x-ndjson'
+    format = 'ndjson'
+
+
+class Echo:
+    """File-like object that hands back what is written to it, so that
+    ``csv.writer`` can produce one line at a time."""
+
+    def write(self, value):
+        return value
+
+
+def iter_csv(header, rows):
+    """Yield ``header`` and then every row as a CSV line."""
+    writer = csv.writer(Echo())
+    yield writer.writerow(header)
+    for row in rows:
+        yield writer.writerow(row)
+
+
+def iter_ndjson(fields, rows):
+    """Yield every row as one JSON object per line."""
+    for row in rows:
+        yield json.dumps(dict(zip(fields, row)), cls=DjangoJSONEncoder) + '\n'
+
+
+def streaming_response(export_format, fields, rows, filename):
+    """Build a streaming CSV or NDJSON response over ``rows``, which
+    should be a lazy iterator of tuples ordered like ``fields``."""
+    if export_format == 'csv':
+        content = iter_csv(fields, rows)
+        content_type = CSVStreamRenderer.media_type
+    else:
+        content = iter_ndjson(fields, rows)
+        content_type = NDJSONStreamRenderer.media_type
+
+    response = StreamingHttpResponse(content, content_type=content_type)
+    response['Content-Disposition'] = (
+        f'attachment; filename="{filename}.{export_format}"'
+    )
+    return response
@@ -34,4 +34,8 @@ urlpatterns = [
         'dashboards/',
         include('dashboards.urls')
     ),
+    path(
+        'sync/',
+        include('sync.urls')
+    ),
 ]
@@ -0,0 +1,49 @@
+import logging
+import time
+from django.core.cache import cache
+from django.db import transaction as db_transaction
+
+logger = logging.getLogger(__name__)
+
+
+def current_versions(keys):
+    """Return the data versions stored under ``keys`` in one cache round
+    trip, initializing missing ones.
+
+    Missing versions start from the clock rather than zero so that an
+    evicted counter never comes back to a value older results were
+    stored under."""
+    versions = cache.get_many(keys)
+    missing = {key: time.time_ns() for key in keys if key not in versions}
+    if missing:
+        cache.set_many(missing, timeout=None)
+        versions.update(missing)
+    return [versions[key] for key in keys]
+
+
+def bump_version(key):
+    """Move a data version forward, invalidating everything stored or
+    built under the old one. Cache errors are logged rather than raised,
+    so the write that caused the bump never depends on the cache."""
+    try:
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, time.time_ns(), timeout=None)
+    except Exception:
+        logger.exception('Could not bump cache version %s', key)
+
+
+def bump_on_commit(key):
+    """Bump ``key`` once the current database transaction commits, so a
+    result computed before the change cannot be stored under the new
+    version."""
+    db_transaction.on_commit(lambda: bump_version(key), robust=True)
+
+
+def invalidate(key):
+    """Bump ``key`` now, so the rest of the current transaction sees the
+    change, and again on commit, so other processes do not keep a result
+    they rebuilt before the change was visible to them."""
+    bump_version(key)
+    bump_on_commit(key)
@@ -1,3 +1,4 @@
+from decimal import Decimal
 from django.db import models
 from django.utils import timezone
 from users.models import User
@@ -32,12 +33,21 @@ class Goal(models.Model):
     updated_at = models.DateTimeField(
         auto_now=True)
 
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=['user', 'updated_at'],
+                name='goal_user_updated_idx'
+            ),
+        ]
+
     def __str__(self):
         return f"{self.title} - {self.get_goal_type_display()} Goal"
 
     def get_progress(self):
         if self.target_amount > 0:
-            return (self.current_amount / self.target_amount) * 100
+            # current_amount is still the float default on a new instance
+            return (Decimal(self.current_amount) / self.target_amount) * 100
         return 0
 
     def is_completed(self):
@@ -1,10 +1,11 @@
 
 from rest_framework import viewsets
 from rest_framework.permissions import IsAuthenticated
+from idempotency.mixins import IdempotencyMixin
 from .models import Goal
 from .serializers import GoalSerializer
 
-class GoalViewSet(viewsets.ModelViewSet):
+class GoalViewSet(IdempotencyMixin, viewsets.ModelViewSet):
     serializer_class = GoalSerializer
     permission_classes = [IsAuthenticated]
 
@@ -0,0 +1,8 @@
+from django.contrib import admin
+from .models import IdempotencyKey
+
+class IdempotencyKeyAdmin(admin.ModelAdmin):
+    list_display = ('user', 'key', 'method', 'path', 'status_code', 'created_at')
+    search_fields = ('user__username', 'key', 'path')
+
+admin.site.register(IdempotencyKey, IdempotencyKeyAdmin)
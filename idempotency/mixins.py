@@ -0,0 +1,158 @@
+import hashlib
+import json
+from django.db import IntegrityError, transaction as db_transaction
+from rest_framework import status
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
+from rest_framework.utils.encoders import JSONEncoder
+from .models import IdempotencyKey
+
+IDEMPOTENCY_HEADER = 'Idempotency-Key'
+IDEMPOTENT_METHODS = ('POST', 'PUT', 'PATCH', 'DELETE')
+
+
+def hash_request_data(data):
+    """Return a digest of a request's parsed body, independent of the
+    order its keys were sent in."""
+    encoded = json.dumps(data, sort_keys=True, cls=JSONEncoder)
+    return hashlib.sha256(encoded.encode()).hexdigest()
+
+
+class IdempotentReplay(Exception):
+    """Raised to short-circuit a view with a previously stored response."""
+
+    def __init__(self, response):
+        super().__init__()
+        self.response = response
+
+
+class IdempotencyMixin:
+    """Replay the stored response of a write request retried with the
+    same ``Idempotency-Key`` header instead of running the view again.
+
+    After authentication a pending row is inserted under the unique
+    ``(user, key)`` constraint, so of concurrent requests with one key
+    only the first runs the view; the others are answered with 409
+    until its response is stored, or until the pending row is older
+    than ``IDEMPOTENCY_PENDING_TIMEOUT`` and its request is taken to
+    have died. Server errors release the key so the request can be
+    retried. A key reused for another method, path or body is a 422."""
+
+    def get_idempotency_key(self, request):
+        if request.method not in IDEMPOTENT_METHODS:
+            return None
+        key = request.headers.get(IDEMPOTENCY_HEADER)
+        if not key or not request.user.is_authenticated:
+            return None
+        if len(key) > IdempotencyKey._meta.get_field('key').max_length:
+            raise ValidationError({
+                'detail': f'{IDEMPOTENCY_HEADER} is too long.'
+            })
+        return key
+
+    def claim_idempotency_key(self, request, key, request_hash):
+        """Insert the pending row of ``key``; returns ``(row, True)``
+        once it is claimed, or the row already holding the key and
+        ``False``."""
+        try:
+            with db_transaction.atomic():
+                claimed = IdempotencyKey.objects.create(
+                    user=request.user,
+                    key=key,
+                    method=request.method,
+                    path=request.path[:255],
+                    request_hash=request_hash
+                )
+        except IntegrityError:
+            return IdempotencyKey.objects.filter(
+                user=request.user,
+                key=key
+            ).first(), False
+        return claimed, True
+
+    def release_idempotency_key(self):
+        """Drop the pending row of a request that did not complete."""
+        claimed = getattr(self, 'idempotency_claim', None)
+        if claimed is not None:
+            self.idempotency_claim = None
+            IdempotencyKey.objects.filter(
+                pk=claimed.pk,
+                status_code__isnull=True
+            ).delete()
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        key = self.get_idempotency_key(request)
+        if key is None:
+            return
+
+        request_hash = hash_request_data(request.data)
+        stored, claimed = self.claim_idempotency_key(
+            request,
+            key,
+            request_hash
+        )
+        if stored is not None and not claimed and (
+            stored.is_expired() or stored.is_abandoned()
+        ):
+            # Deleted by primary key, so a row claimed again meanwhile
+            # by a concurrent retry stays
+            stored.delete()
+            stored, claimed = self.claim_idempotency_key(
+                request,
+                key,
+                request_hash
+            )
+        if claimed:
+            self.idempotency_claim = stored
+            return
+
+        if stored is not None and (
+            stored.method != request.method
+            or stored.path != request.path[:255]
+            or stored.request_hash != request_hash
+        ):
+            raise IdempotentReplay(Response(
+                {
+                    'detail': f'{IDEMPOTENCY_HEADER} was already used '
+                              'for a different request.'
+                },
+                status=status.HTTP_422_UNPROCESSABLE_ENTITY
+            ))
+        if stored is None or stored.is_pending:
+            # None: the holder vanished between the insert and the lookup
+            raise IdempotentReplay(Response(
+                {
+                    'detail': f'A request with this {IDEMPOTENCY_HEADER} '
+                              'is still in progress.'
+                },
+                status=status.HTTP_409_CONFLICT
+            ))
+
+        response = Response(stored.response, status=stored.status_code)
+        response['Idempotent-Replayed'] = 'true'
+        raise IdempotentReplay(response)
+
+    def handle_exception(self, exc):
+        if isinstance(exc, IdempotentReplay):
+            return exc.response
+        try:
+            return super().handle_exception(exc)
+        except Exception:
+            # Unhandled errors skip finalize_response
+            self.release_idempotency_key()
+            raise
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        claimed = getattr(self, 'idempotency_claim', None)
+        if claimed is not None and response.status_code < 500:
+            self.idempotency_claim = None
+            # Only the row this request claimed, which a retry may have
+            # replaced if the request outlived its pending lease
+            IdempotencyKey.objects.filter(pk=claimed.pk).update(
+                status_code=response.status_code,
+                response=response.data
+            )
+        elif claimed is not None:
+            self.release_idempotency_key()
+        return super().finalize_response(request, response, *args, **kwargs)
@@ -0,0 +1,63 @@
+from django.conf import settings
+from django.db import models
+from django.utils import timezone
+from rest_framework.utils.encoders import JSONEncoder
+
+
+class IdempotencyKey(models.Model):
+    """Stored response of a write request made with an Idempotency-Key
+    header, replayed when the client retries with the same key. The row
+    is inserted as pending before the view runs and holds the response
+    once it has one."""
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='+',
+        # Covered by the unique (user, key) constraint below
+        db_index=False
+    )
+    key = models.CharField(max_length=255)
+    method = models.CharField(max_length=10)
+    path = models.CharField(max_length=255)
+    # Digest of the request body, so a key reused with another payload
+    # is refused rather than answered with this response
+    request_hash = models.CharField(max_length=64, blank=True, default='')
+    # Empty while the first request with the key is still running
+    status_code = models.PositiveSmallIntegerField(null=True)
+    # Encoded like the JSON renderer so that a replay is identical
+    response = models.JSONField(
+        null=True,
+        encoder=JSONEncoder
+    )
+    created_at = models.DateTimeField(
+        default=timezone.now,
+        db_index=True
+    )
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'key'],
+                name='idempotency_user_key_uniq'
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.method} {self.path} ({self.key}) for {self.user_id}"
+
+    @property
+    def is_pending(self):
+        return self.status_code is None
+
+    def is_expired(self, now=None):
+        """Return whether the stored response is older than the TTL."""
+        now = now or timezone.now()
+        return self.created_at < now - settings.IDEMPOTENCY_KEY_TTL
+
+    def is_abandoned(self, now=None):
+        """Return whether the row is still pending after the request
+        holding it should have finished, e.g. because its worker died."""
+        now = now or timezone.now()
+        return self.is_pending and (
+            self.created_at < now - settings.IDEMPOTENCY_PENDING_TIMEOUT
+        )
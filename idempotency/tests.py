@@ -0,0 +1,150 @@
+from datetime import timedelta
+from unittest import mock
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import RefreshToken
+from goals.models import Goal
+from .mixins import hash_request_data
+from .models import IdempotencyKey
+
+User = get_user_model()
+
+
+class IdempotencyKeyTests(APITestCase):
+    """Tests for Idempotency-Key handling on write endpoints."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email='testuser@example.com',
+            username='testuser',
+            password='testpassword'
+        )
+        access_token = str(RefreshToken.for_user(self.user).access_token)
+        self.client.credentials(HTTP_AUTHORIZATION='Bearer ' + access_token)
+        self.goal_data = {
+            'title': 'Holiday',
+            'goal_type': 'saving',
+            'target_amount': '1000.00',
+        }
+
+    def post_goal(self, key=None):
+        headers = {'HTTP_IDEMPOTENCY_KEY': key} if key else {}
+        return self.client.post(
+            reverse('goal-list'),
+            self.goal_data,
+            format='json',
+            **headers
+        )
+
+    def test_retry_replays_stored_response(self):
+        """Test that a retried POST is answered without creating twice."""
+        first = self.post_goal('abc-123')
+        second = self.post_goal('abc-123')
+
+        self.assertEqual(first.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(second.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(second.json(), first.json())
+        self.assertEqual(second['Idempotent-Replayed'], 'true')
+        self.assertEqual(Goal.objects.count(), 1)
+
+    def test_requests_without_key_are_not_deduplicated(self):
+        """Test that requests without the header behave as before."""
+        self.post_goal()
+        self.post_goal()
+
+        self.assertEqual(Goal.objects.count(), 2)
+        self.assertEqual(IdempotencyKey.objects.count(), 0)
+
+    def test_key_reused_for_different_request_is_rejected(self):
+        """Test that a key cannot be replayed against another endpoint."""
+        goal = self.post_goal('abc-123')
+
+        response = self.client.delete(
+            reverse('goal-detail', args=[goal.data['id']]),
+            HTTP_IDEMPOTENCY_KEY='abc-123'
+        )
+
+        self.assertEqual(
+            response.status_code,
+            status.HTTP_422_UNPROCESSABLE_ENTITY
+        )
+        self.assertEqual(Goal.objects.count(), 1)
+
+    def test_expired_key_runs_the_view_again(self):
+        """Test that responses older than the TTL are not replayed."""
+        self.post_goal('abc-123')
+        IdempotencyKey.objects.update(
+            created_at=timezone.now() - timedelta(days=2)
+        )
+
+        self.post_goal('abc-123')
+
+        self.assertEqual(Goal.objects.count(), 2)
+        self.assertEqual(IdempotencyKey.objects.count(), 1)
+
+    def test_concurrent_request_with_key_is_a_conflict(self):
+        """Test that a key held by a running request is answered with
+        409 instead of running the view a second time."""
+        IdempotencyKey.objects.create(
+            user=self.user,
+            key='abc-123',
+            method='POST',
+            path=reverse('goal-list'),
+            request_hash=hash_request_data(self.goal_data)
+        )
+
+        response = self.post_goal('abc-123')
+
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+        self.assertEqual(Goal.objects.count(), 0)
+
+    def test_abandoned_pending_key_can_be_claimed_again(self):
+        """Test that a key left pending by a request that died is taken
+        over by a retry once the pending lease has run out."""
+        IdempotencyKey.objects.create(
+            user=self.user,
+            key='abc-123',
+            method='POST',
+            path=reverse('goal-list'),
+            created_at=timezone.now() - timedelta(minutes=5)
+        )
+
+        response = self.post_goal('abc-123')
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(Goal.objects.count(), 1)
+        self.assertEqual(
+            IdempotencyKey.objects.get(key='abc-123').status_code,
+            status.HTTP_201_CREATED
+        )
+
+    def test_key_reused_with_different_body_is_rejected(self):
+        """Test that a retry must send the same payload to be replayed."""
+        self.post_goal('abc-123')
+        self.goal_data['target_amount'] = '2000.00'
+
+        response = self.post_goal('abc-123')
+
+        self.assertEqual(
+            response.status_code,
+            status.HTTP_422_UNPROCESSABLE_ENTITY
+        )
+        self.assertEqual(Goal.objects.count(), 1)
+
+    def test_failed_request_releases_key(self):
+        """Test that a key is free again after the view failed."""
+        with mock.patch(
+            'goals.views.GoalSerializer.save',
+            side_effect=RuntimeError
+        ):
+            with self.assertRaises(RuntimeError):
+                self.post_goal('abc-123')
+        self.assertEqual(IdempotencyKey.objects.count(), 0)
+
+        response = self.post_goal('abc-123')
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(Goal.objects.count(), 1)
@@ -1,3 +1,13 @@
 from django.contrib import admin
+from .models import MonthlyRollup, ReportJob
 
-# Register your models here.
+class MonthlyRollupAdmin(admin.ModelAdmin):
+    list_display = ('user', 'month', 'category', 'transaction_type', 'total', 'count')
+    list_filter = ('transaction_type',)
+
+class ReportJobAdmin(admin.ModelAdmin):
+    list_display = ('id', 'user', 'status', 'attempts', 'created_at', 'finished_at')
+    list_filter = ('status',)
+
+admin.site.register(MonthlyRollup, MonthlyRollupAdmin)
+admin.site.register(ReportJob, ReportJobAdmin)
@@ -0,0 +1,89 @@
+from .cache import cached_report
+from .comparison import compare_totals
+from .rollups import category_totals
+from .series import stream_time_series, time_series
+
+
+def build_report(user, params):
+    """Compute, or fetch from the cache, the report described by the
+    validated ``ReportFilterSerializer`` data ``params``."""
+    def compute():
+        if params.get('compare_to'):
+            # Current and previous totals per category in one pass
+            return compare_totals(
+                user,
+                params['start_date'],
+                params['end_date'],
+                params['compare_to'],
+                params.get('category'),
+                params['report_type']
+            )
+
+        if params.get('group_by'):
+            # Dense series of totals per period, optionally per category
+            return time_series(
+                user,
+                params['start_date'],
+                params['end_date'],
+                params['group_by'],
+                params.get('category'),
+                params['report_type'],
+                params['by_category']
+            )
+
+        # Aggregate totals by category from the monthly rollups, reading
+        # raw transactions only for partial months at the range edges
+        return category_totals(
+            user,
+            params['start_date'],
+            params['end_date'],
+            params.get('category'),
+            params['report_type'],
+            params['hierarchy']
+        )
+
+    # Served from the cache until the user's data changes
+    return cached_report(user, params, compute)
+
+
+def report_columns(params):
+    """Return the columns of a report row, in CSV order."""
+    if params.get('compare_to'):
+        return [
+            'category__name',
+            'current_total',
+            'previous_total',
+            'delta',
+            'delta_percent'
+        ]
+    if params.get('group_by'):
+        if params['by_category']:
+            return ['period', 'category__name', 'total_amount']
+        return ['period', 'total_amount']
+    if params['hierarchy']:
+        return ['category', 'category__name', 'parent_category', 'total_amount']
+    return ['category__name', 'total_amount']
+
+
+def report_rows(user, params):
+    """Return the report's columns and a lazy iterator of row tuples.
+
+    Time series, which grow with the length of the range, are streamed
+    from the database without being built in memory; the per-category
+    reports are small and come from the cache like ``build_report``."""
+    columns = report_columns(params)
+    if params.get('group_by'):
+        rows = stream_time_series(
+            user,
+            params['start_date'],
+            params['end_date'],
+            params['group_by'],
+            params.get('category'),
+            params['report_type'],
+            params['by_category']
+        )
+    else:
+        rows = build_report(user, params)
+        if params.get('compare_to'):
+            rows = rows['categories']
+    return columns, (tuple(row[column] for column in columns) for row in rows)
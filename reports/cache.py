@@ -0,0 +1,62 @@
+import hashlib
+import json
+from django.conf import settings
+from django.core.cache import cache
+from drf_api.versions import bump_on_commit, current_versions
+
+CATEGORY_VERSION_KEY = 'reports:version:categories'
+
+
+def user_version_key(user_id):
+    return f'reports:version:user:{user_id}'
+
+
+def canonical_params(params):
+    """Serialize validated report parameters the same way however the
+    request spelled them: sorted keys, model instances as primary keys,
+    dates as ISO strings."""
+    return json.dumps(
+        {
+            name: getattr(value, 'pk', value)
+            for name, value in params.items()
+        },
+        sort_keys=True,
+        default=str
+    )
+
+
+def get_versions(user_id):
+    """Return the data versions of ``user_id``'s transactions and of the
+    shared categories."""
+    return current_versions([user_version_key(user_id), CATEGORY_VERSION_KEY])
+
+
+def invalidate_user_reports(user_id):
+    bump_on_commit(user_version_key(user_id))
+
+
+def invalidate_category_reports():
+    bump_on_commit(CATEGORY_VERSION_KEY)
+
+
+def cached_report(user, params, compute):
+    """Return the report for ``params``, computing and caching it with
+    ``compute`` on a miss.
+
+    The key combines the user, the canonical parameters and the current
+    data versions, so writes invalidate by bumping a version instead of
+    deleting keys. The versions are read before computing, which means a
+    result racing a write is stored under the version it saw."""
+    user_version, category_version = get_versions(user.pk)
+    digest = hashlib.sha256(canonical_params(params).encode()).hexdigest()
+    key = f'reports:{user.pk}:{user_version}:{category_version}:{digest}'
+
+    report = cache.get(key)
+    if report is None:
+        report = compute()
+        cache.set(
+            key,
+            report,
+            settings.REPORT_CACHE_TIMEOUT.total_seconds()
+        )
+    return report
@@ -0,0 +1,89 @@
+from datetime import timedelta
+from decimal import Decimal
+from django.db.models import Q, Sum
+from transactions.models import Transaction
+from .rollups import CENT, start_of_day
+
+COMPARE_TO_CHOICES = ('previous_period', 'previous_year')
+
+
+def year_earlier(day):
+    """Return the same calendar day a year earlier; 29 February maps to
+    the 28th."""
+    try:
+        return day.replace(year=day.year - 1)
+    except ValueError:
+        return day.replace(year=day.year - 1, day=28)
+
+
+def previous_range(start_date, end_date, compare_to):
+    """Return the inclusive range to compare ``[start_date, end_date]``
+    with: the equally long period right before it, or the same dates a
+    year earlier."""
+    if compare_to == 'previous_year':
+        return year_earlier(start_date), year_earlier(end_date)
+    length = end_date - start_date + timedelta(days=1)
+    return start_date - length, end_date - length
+
+
+def in_range(start_date, end_date):
+    return Q(
+        created_at__gte=start_of_day(start_date),
+        created_at__lt=start_of_day(end_date + timedelta(days=1))
+    )
+
+
+def compare_totals(
+    user,
+    start_date,
+    end_date,
+    compare_to,
+    category=None,
+    report_type='all'
+):
+    """Return current and previous totals per category with the change
+    between them.
+
+    Both periods are aggregated in one pass over their combined rows,
+    each total being a ``Sum`` filtered to its own period."""
+    previous_start, previous_end = previous_range(
+        start_date,
+        end_date,
+        compare_to
+    )
+    current = in_range(start_date, end_date)
+    previous = in_range(previous_start, previous_end)
+
+    transactions = Transaction.objects.filter(current | previous, user=user)
+    if category:
+        transactions = transactions.filter(
+            category__ancestor_links__ancestor=category
+        )
+    if report_type != 'all':
+        transactions = transactions.filter(transaction_type=report_type)
+
+    rows = transactions.values('category__name').annotate(
+        current_total=Sum('amount', filter=current, default=Decimal('0.00')),
+        previous_total=Sum('amount', filter=previous, default=Decimal('0.00'))
+    ).order_by('-current_total', 'category__name')
+
+    categories = []
+    for row in rows:
+        current_total = row['current_total'].quantize(CENT)
+        previous_total = row['previous_total'].quantize(CENT)
+        delta = current_total - previous_total
+        categories.append({
+            'category__name': row['category__name'],
+            'current_total': current_total,
+            'previous_total': previous_total,
+            'delta': delta,
+            'delta_percent': (
+                (delta / previous_total * 100).quantize(CENT)
+                if previous_total else None
+            ),
+        })
+    return {
+        'current': {'start_date': start_date, 'end_date': end_date},
+        'previous': {'start_date': previous_start, 'end_date': previous_end},
+        'categories': categories,
+    }
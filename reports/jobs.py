@@ -0,0 +1,111 @@
+import logging
+from django.conf import settings
+from django.db import transaction as db_transaction
+from django.db.models import Q
+from django.utils import timezone
+from .builder import build_report
+from .models import ReportJob
+from .serializers import ReportFilterSerializer
+
+logger = logging.getLogger(__name__)
+
+# A job is given up after this many workers started it without finishing
+REPORT_JOB_MAX_ATTEMPTS = 3
+
+
+def enqueue_report_job(user, params):
+    """Queue a report for ``user`` described by the serialized
+    ``ReportFilterSerializer`` data ``params``.
+
+    Workers pick the job up from the database. With
+    ``REPORT_JOBS_EAGER`` it instead runs in this process once the
+    current transaction commits, which is meant for tests and local
+    development."""
+    job = ReportJob.objects.create(user=user, params=params)
+    if settings.REPORT_JOBS_EAGER:
+        db_transaction.on_commit(lambda: run_next_job(job_id=job.pk))
+    return job
+
+
+def claim_job(now=None, job_id=None):
+    """Mark the oldest runnable job as running and return it, or
+    ``None`` when there is nothing to do.
+
+    Runnable jobs are queued ones and running ones whose worker has not
+    finished within ``REPORT_JOB_TIMEOUT``. Rows locked by another
+    worker are skipped, so any number of workers can poll the queue."""
+    now = now or timezone.now()
+    runnable = ReportJob.objects.filter(
+        Q(status=ReportJob.QUEUED)
+        | Q(
+            status=ReportJob.RUNNING,
+            started_at__lt=now - settings.REPORT_JOB_TIMEOUT
+        )
+    )
+    if job_id is not None:
+        runnable = runnable.filter(pk=job_id)
+
+    with db_transaction.atomic():
+        job = runnable.select_for_update(
+            skip_locked=True
+        ).order_by('created_at').first()
+        if job is None:
+            return None
+
+        if job.attempts >= REPORT_JOB_MAX_ATTEMPTS:
+            job.status = ReportJob.FAILED
+            job.error = 'The report did not finish after several attempts.'
+            job.finished_at = now
+        else:
+            job.status = ReportJob.RUNNING
+            job.started_at = now
+            job.attempts += 1
+        job.save(update_fields=[
+            'status',
+            'error',
+            'started_at',
+            'finished_at',
+            'attempts'
+        ])
+    return job
+
+
+def run_job(job):
+    """Compute a claimed job's report and store the result or error."""
+    serializer = ReportFilterSerializer(data=job.params)
+    if serializer.is_valid():
+        try:
+            job.result = build_report(job.user, serializer.validated_data)
+            job.status = ReportJob.DONE
+        except Exception as exc:
+            logger.exception('Report job %s failed', job.pk)
+            job.status = ReportJob.FAILED
+            job.error = str(exc)
+    else:
+        # E.g. the category was deleted while the job was queued
+        job.status = ReportJob.FAILED
+        job.error = str(serializer.errors)
+
+    job.finished_at = timezone.now()
+    job.save(update_fields=['status', 'result', 'error', 'finished_at'])
+    return job
+
+
+def run_next_job(job_id=None):
+    """Claim and run one job. Returns it, or ``None`` if none was
+    runnable."""
+    job = claim_job(job_id=job_id)
+    if job is not None and job.status == ReportJob.RUNNING:
+        run_job(job)
+    return job
+
+
+def run_pending_jobs(limit=None):
+    """Run jobs until the queue is empty or ``limit`` jobs were handled.
+    Returns the number of jobs handled."""
+    handled = 0
+    while limit is None or handled < limit:
+        if run_next_job() is None:
+            break
+        handled += 1
+    return handled
@@ -0,0 +1,28 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from reports.rollups import rebuild_rollups
+
+
+class Command(BaseCommand):
+    help = 'Recompute the monthly report rollups from the raw transactions'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--user',
+            help='Only rebuild the rollups of the user with this email'
+        )
+
+    def handle(self, *args, **options):
+        user_ids = None
+        if options['user']:
+            User = get_user_model()
+            try:
+                user = User.objects.get(email=options['user'])
+            except User.DoesNotExist:
+                raise CommandError(f'User "{options["user"]}" does not exist')
+            user_ids = [user.pk]
+
+        created = rebuild_rollups(user_ids)
+        self.stdout.write(
+            self.style.SUCCESS(f'Rebuilt {created} monthly rollups')
+        )
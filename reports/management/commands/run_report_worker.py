@@ -0,0 +1,36 @@
+import time
+from django.core.management.base import BaseCommand
+from reports.jobs import run_pending_jobs
+
+
+class Command(BaseCommand):
+    help = 'Compute queued background report jobs'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Drain the queue and exit instead of polling forever'
+        )
+        parser.add_argument(
+            '--poll-interval',
+            type=float,
+            default=2.0,
+            help='Seconds to wait when the queue is empty'
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            started = time.perf_counter()
+            handled = run_pending_jobs()
+            if handled:
+                elapsed = time.perf_counter() - started
+                self.stdout.write(
+                    self.style.SUCCESS(
+                        f'Ran {handled} report job(s) in {elapsed:.2f}s'
+                    )
+                )
+            if options['once']:
+                break
+            if not handled:
+                time.sleep(options['poll_interval'])
@@ -0,0 +1,64 @@
+# Generated by Django 5.1.1 on 2026-10-18 06:58
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, DateField, Sum
+from django.db.models.functions import TruncMonth
+
+
+def build_rollups(apps, schema_editor):
+    """Roll up the transactions that already exist."""
+    Transaction = apps.get_model('transactions', 'Transaction')
+    MonthlyRollup = apps.get_model('reports', 'MonthlyRollup')
+    totals = Transaction.objects.annotate(
+        month=TruncMonth('created_at', output_field=DateField())
+    ).values(
+        'user_id',
+        'category_id',
+        'transaction_type',
+        'month'
+    ).annotate(
+        total=Sum('amount'),
+        count=Count('id')
+    ).order_by()
+    batch = []
+    for row in totals.iterator(chunk_size=1000):
+        batch.append(MonthlyRollup(**row))
+        if len(batch) >= 1000:
+            MonthlyRollup.objects.bulk_create(batch)
+            batch = []
+    MonthlyRollup.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('categories', '0001_initial'),
+        ('transactions', '0006_transaction_user_updated_idx'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MonthlyRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('transaction_type', models.CharField(choices=[('income', 'Income'), ('expense', 'Expense')], max_length=10)),
+                ('month', models.DateField()),
+                ('total', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('count', models.PositiveIntegerField(default=0)),
+                ('category', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='categories.category')),
+                ('user', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('user', 'month', 'category', 'transaction_type'), name='rollup_user_month_cat_type_uniq')],
+            },
+        ),
+        migrations.RunPython(
+            build_rollups,
+            migrations.RunPython.noop
+        ),
+    ]
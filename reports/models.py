@@ -1,3 +1,111 @@
+from django.conf import settings
 from django.db import models
+from django.utils import timezone
+from rest_framework.utils.encoders import JSONEncoder
+from categories.models import Category
 
-# Create your models here.
+
+class MonthlyRollup(models.Model):
+    """Per-user monthly totals by category and transaction type, kept
+    current as transactions are written."""
+    TRANSACTION_TYPES = (
+        ('income', 'Income'),
+        ('expense', 'Expense'),
+    )
+
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='+',
+        # Covered by the unique constraint below, which leads with user
+        db_index=False
+    )
+    category = models.ForeignKey(
+        Category,
+        on_delete=models.CASCADE,
+        related_name='+'
+    )
+    transaction_type = models.CharField(
+        max_length=10,
+        choices=TRANSACTION_TYPES
+    )
+    month = models.DateField()
+    total = models.DecimalField(
+        max_digits=14,
+        decimal_places=2,
+        default=0
+    )
+    count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'month', 'category', 'transaction_type'],
+                name='rollup_user_month_cat_type_uniq'
+            ),
+        ]
+
+    def __str__(self):
+        return (
+            f"{self.transaction_type.capitalize()} {self.category_id} "
+            f"for {self.user_id} in {self.month:%Y-%m}: {self.total}"
+        )
+
+
+
+class ReportJob(models.Model):
+    """A report computed in the background by a worker process."""
+    QUEUED = 'queued'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+    STATUSES = (
+        (QUEUED, 'Queued'),
+        (RUNNING, 'Running'),
+        (DONE, 'Done'),
+        (FAILED, 'Failed'),
+    )
+
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='report_jobs'
+    )
+    params = models.JSONField()
+    status = models.CharField(
+        max_length=10,
+        choices=STATUSES,
+        default=QUEUED
+    )
+    # Encoded like the JSON renderer so the result matches ReportView
+    result = models.JSONField(
+        null=True,
+        blank=True,
+        encoder=JSONEncoder
+    )
+    error = models.TextField(
+        blank=True,
+        default=''
+    )
+    attempts = models.PositiveSmallIntegerField(default=0)
+    created_at = models.DateTimeField(default=timezone.now)
+    started_at = models.DateTimeField(
+        null=True,
+        blank=True
+    )
+    finished_at = models.DateTimeField(
+        null=True,
+        blank=True
+    )
+
+    class Meta:
+        indexes = [
+            # Workers claim the oldest queued or stalled job
+            models.Index(
+                fields=['status', 'created_at'],
+                name='report_job_status_idx'
+            ),
+        ]
+
+    def __str__(self):
+        return f"Report job {self.pk} for {self.user_id} ({self.status})"
@@ -0,0 +1,253 @@
+from collections import defaultdict
+from datetime import datetime, time, timedelta
+from decimal import Decimal
+from django.db import IntegrityError, transaction as db_transaction
+from django.db.models import Count, DateField, F, Q, Sum
+from django.db.models.functions import TruncMonth
+from django.utils import timezone
+from transactions.models import Transaction
+from .models import MonthlyRollup
+
+# Rollup rows inserted per statement while rebuilding
+REBUILD_BATCH_SIZE = 1000
+
+# Report amounts are given in whole cents whatever the database returns
+CENT = Decimal('0.01')
+
+
+def month_of(created_at):
+    """Return the first day of the month ``created_at`` falls in."""
+    if isinstance(created_at, str):
+        created_at = Transaction._meta.get_field('created_at').to_python(
+            created_at
+        )
+    if timezone.is_aware(created_at):
+        created_at = timezone.localtime(created_at)
+    return created_at.date().replace(day=1)
+
+
+def rollup_key(user_id, category_id, transaction_type, created_at):
+    """Return the rollup row a transaction with these values counts in."""
+    return (user_id, category_id, transaction_type, month_of(created_at))
+
+
+def add_to_deltas(deltas, transactions, sign):
+    """Accumulate the effect of adding (``sign=1``) or removing
+    (``sign=-1``) ``transactions`` into ``deltas``."""
+    for transaction in transactions:
+        key = rollup_key(
+            transaction.user_id,
+            transaction.category_id,
+            transaction.transaction_type,
+            transaction.created_at
+        )
+        amount, count = deltas[key]
+        deltas[key] = (
+            amount + sign * Decimal(str(transaction.amount)),
+            count + sign
+        )
+    return deltas
+
+
+def apply_rollup_deltas(deltas):
+    """Apply ``{key: (amount, count)}`` deltas to the rollup table with
+    one F() update per key, creating rows that do not exist yet."""
+    for key, (amount, count) in deltas.items():
+        if not amount and not count:
+            continue
+        user_id, category_id, transaction_type, month = key
+        rows = MonthlyRollup.objects.filter(
+            user_id=user_id,
+            month=month,
+            category_id=category_id,
+            transaction_type=transaction_type
+        )
+        if rows.update(total=F('total') + amount, count=F('count') + count):
+            continue
+        try:
+            with db_transaction.atomic():
+                MonthlyRollup.objects.create(
+                    user_id=user_id,
+                    month=month,
+                    category_id=category_id,
+                    transaction_type=transaction_type,
+                    total=amount,
+                    count=count
+                )
+        except IntegrityError:
+            # Created concurrently; add to that row instead
+            rows.update(total=F('total') + amount, count=F('count') + count)
+
+
+def new_deltas():
+    """Return an empty ``{key: (amount, count)}`` delta mapping."""
+    return defaultdict(lambda: (Decimal('0'), 0))
+
+
+def record_created(transactions):
+    """Count newly inserted ``transactions`` in the rollups."""
+    apply_rollup_deltas(add_to_deltas(new_deltas(), transactions, 1))
+
+
+def record_deleted(transactions):
+    """Remove deleted ``transactions`` from the rollups."""
+    apply_rollup_deltas(add_to_deltas(new_deltas(), transactions, -1))
+
+
+def record_updated(transaction, old_values):
+    """Move an updated transaction from the rollup row of its previous
+    values (as loaded from the database) to the one of its new values."""
+    old = Transaction(
+        **{
+            field: old_values[field]
+            for field in (
+                'user_id',
+                'category_id',
+                'transaction_type',
+                'created_at',
+                'amount'
+            )
+        }
+    )
+    deltas = add_to_deltas(new_deltas(), [old], -1)
+    apply_rollup_deltas(add_to_deltas(deltas, [transaction], 1))
+
+
+def rebuild_rollups(user_ids=None):
+    """Recompute the rollups from the raw transactions, for every user
+    or only for ``user_ids``. Returns the number of rollup rows."""
+    transactions = Transaction.objects.all()
+    rollups = MonthlyRollup.objects.all()
+    if user_ids is not None:
+        transactions = transactions.filter(user_id__in=user_ids)
+        rollups = rollups.filter(user_id__in=user_ids)
+
+    totals = transactions.annotate(
+        month=TruncMonth('created_at', output_field=DateField())
+    ).values(
+        'user_id',
+        'category_id',
+        'transaction_type',
+        'month'
+    ).annotate(
+        total=Sum('amount'),
+        count=Count('id')
+    ).order_by()
+
+    created = 0
+    with db_transaction.atomic():
+        rollups.delete()
+        batch = []
+        for row in totals.iterator(chunk_size=REBUILD_BATCH_SIZE):
+            batch.append(MonthlyRollup(**row))
+            if len(batch) >= REBUILD_BATCH_SIZE:
+                MonthlyRollup.objects.bulk_create(batch)
+                created += len(batch)
+                batch = []
+        MonthlyRollup.objects.bulk_create(batch)
+        created += len(batch)
+    return created
+
+
+def start_of_day(day):
+    """Return the aware datetime at midnight starting ``day``."""
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+
+def split_range(start_date, end_date):
+    """Split the inclusive range ``[start_date, end_date]`` into the
+    whole months it covers and the partial months at its edges.
+
+    Returns ``(months, edges)``: ``months`` is a ``(first, stop)`` pair
+    of month starts or ``None``; ``edges`` are ``(start, stop)`` date
+    pairs with an exclusive stop."""
+    stop = end_date + timedelta(days=1)
+    if start_date.day == 1:
+        first_month = start_date
+    else:
+        first_month = (
+            start_date.replace(day=28) + timedelta(days=4)
+        ).replace(day=1)
+    stop_month = stop.replace(day=1)
+
+    if first_month >= stop_month:
+        return None, [(start_date, stop)]
+
+    edges = []
+    if start_date < first_month:
+        edges.append((start_date, first_month))
+    if stop_month < stop:
+        edges.append((stop_month, stop))
+    return (first_month, stop_month), edges
+
+
+def category_totals(
+    user,
+    start_date,
+    end_date,
+    category=None,
+    report_type='all',
+    hierarchy=False
+):
+    """Return totals per category name for an inclusive date range,
+    largest first.
+
+    Whole months are read from the rollup table; only the partial
+    months at the edges of the range touch raw transactions. A
+    ``category`` filter covers its whole subtree. With ``hierarchy``
+    every category is credited with the totals of its subcategories
+    at all levels, through one join on the category closure table."""
+    months, edges = split_range(start_date, end_date)
+    group = 'category__ancestor_links__ancestor' if hierarchy else 'category'
+    group_fields = [f'{group}__name']
+    if hierarchy:
+        group_fields += [group, f'{group}__parent_category']
+    totals = defaultdict(Decimal)
+
+    def accumulate(queryset, amount_field):
+        if category and hierarchy:
+            # Roll up within the requested subtree, not above it
+            queryset = queryset.filter(
+                **{f'{group}__ancestor_links__ancestor': category}
+            )
+        elif category:
+            queryset = queryset.filter(
+                category__ancestor_links__ancestor=category
+            )
+        if report_type != 'all':
+            queryset = queryset.filter(transaction_type=report_type)
+        for row in queryset.values(*group_fields).annotate(
+            total_amount=Sum(amount_field)
+        ).order_by():
+            totals[tuple(row[field] for field in group_fields)] += (
+                row['total_amount']
+            )
+
+    if months is not None:
+        accumulate(
+            MonthlyRollup.objects.filter(
+                user=user,
+                month__gte=months[0],
+                month__lt=months[1]
+            ),
+            'total'
+        )
+
+    if edges:
+        in_edges = Q()
+        for edge_start, edge_stop in edges:
+            in_edges |= Q(
+                created_at__gte=start_of_day(edge_start),
+                created_at__lt=start_of_day(edge_stop)
+            )
+        accumulate(Transaction.objects.filter(in_edges, user=user), 'amount')
+
+    report = []
+    for key, total in totals.items():
+        if not total:
+            continue
+        row = {'category__name': key[0], 'total_amount': total.quantize(CENT)}
+        if hierarchy:
+            row['category'], row['parent_category'] = key[1], key[2]
+        report.append(row)
+    return sorted(report, key=lambda row: row['total_amount'], reverse=True)
@@ -1,7 +1,10 @@
 from rest_framework import serializers
 from categories.models import Category
+from .comparison import COMPARE_TO_CHOICES
+from .models import ReportJob
+from .series import GROUP_BY_CHOICES
 
-class ReportFilterSerializer(serializers.Serializer):
+class ReportRangeSerializer(serializers.Serializer):
     start_date = serializers.DateField()
     end_date = serializers.DateField()
     category = serializers.PrimaryKeyRelatedField(
@@ -25,3 +28,56 @@ class ReportFilterSerializer(serializers.Serializer):
         ],
         default='all'
     )
+
+class ReportFilterSerializer(ReportRangeSerializer):
+    group_by = serializers.ChoiceField(
+        choices=GROUP_BY_CHOICES,
+        required=False
+    )
+    by_category = serializers.BooleanField(
+        default=False
+    )
+    hierarchy = serializers.BooleanField(
+        default=False
+    )
+    compare_to = serializers.ChoiceField(
+        choices=COMPARE_TO_CHOICES,
+        required=False
+    )
+
+    def validate(self, data):
+        """A time series or comparison needs a range that does not end
+        before it starts, and the report shapes cannot be combined."""
+        group_by = data.get('group_by')
+        compare_to = data.get('compare_to')
+        if (group_by or compare_to) and data['end_date'] < data['start_date']:
+            raise serializers.ValidationError(
+                "End date must not be before the start date."
+            )
+        if group_by and data['hierarchy']:
+            raise serializers.ValidationError(
+                "Hierarchical totals are not available for a time series."
+            )
+        if compare_to and (group_by or data['hierarchy']):
+            raise serializers.ValidationError(
+                "Comparisons cannot be combined with group_by or hierarchy."
+            )
+        return data
+
+
+class ReportJobSerializer(serializers.ModelSerializer):
+    """Serializer for the status and result of a background report."""
+
+    class Meta:
+        model = ReportJob
+        fields = [
+            'id',
+            'status',
+            'params',
+            'result',
+            'error',
+            'created_at',
+            'started_at',
+            'finished_at'
+        ]
+        read_only_fields = fields
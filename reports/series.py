@@ -0,0 +1,170 @@
+from collections import defaultdict
+from datetime import timedelta
+from decimal import Decimal
+from django.db.models import DateField, Sum
+from django.db.models.functions import Trunc
+from transactions.models import Transaction
+from .rollups import CENT, start_of_day
+
+GROUP_BY_CHOICES = ('day', 'week', 'month', 'year')
+
+# Aggregated rows fetched per round trip while streaming a series
+SERIES_CHUNK_SIZE = 2000
+
+
+def period_start(day, group_by):
+    """Return the first day of the ``group_by`` period ``day`` is in.
+    Weeks start on Monday, as with ``TruncWeek``."""
+    if group_by == 'week':
+        return day - timedelta(days=day.weekday())
+    if group_by == 'month':
+        return day.replace(day=1)
+    if group_by == 'year':
+        return day.replace(month=1, day=1)
+    return day
+
+
+def next_period(period, group_by):
+    """Return the start of the period following ``period``."""
+    if group_by == 'day':
+        return period + timedelta(days=1)
+    if group_by == 'week':
+        return period + timedelta(weeks=1)
+    if group_by == 'month':
+        return (period.replace(day=28) + timedelta(days=4)).replace(day=1)
+    return period.replace(year=period.year + 1)
+
+
+def periods(start_date, end_date, group_by):
+    """Yield the start of every ``group_by`` period overlapping the
+    inclusive range ``[start_date, end_date]``."""
+    period = period_start(start_date, group_by)
+    while period <= end_date:
+        yield period
+        period = next_period(period, group_by)
+
+
+def series_queries(
+    user,
+    start_date,
+    end_date,
+    group_by,
+    category=None,
+    report_type='all',
+    by_category=False
+):
+    """Return the filtered transactions and the aggregate of their
+    totals per period, and per category name if ``by_category``,
+    ordered by period. A ``category`` filter covers its subtree."""
+    transactions = Transaction.objects.filter(
+        user=user,
+        created_at__gte=start_of_day(start_date),
+        created_at__lt=start_of_day(end_date + timedelta(days=1))
+    )
+    if category:
+        transactions = transactions.filter(
+            category__ancestor_links__ancestor=category
+        )
+    if report_type != 'all':
+        transactions = transactions.filter(transaction_type=report_type)
+
+    group_fields = ['period', 'category__name'] if by_category else ['period']
+    rows = transactions.annotate(
+        period=Trunc('created_at', group_by, output_field=DateField())
+    ).values(*group_fields).annotate(
+        total_amount=Sum('amount')
+    ).order_by('period')
+    return transactions, rows
+
+
+def dense_series(rows, names, start_date, end_date, group_by):
+    """Yield one row per period and category name in ``names``, taking
+    totals from ``rows`` (ordered by period) and zero elsewhere.
+
+    Only the totals of the current period are held in memory, so
+    ``rows`` can be a lazy database iterator."""
+    rows = iter(rows)
+    pending = next(rows, None)
+    for period in periods(start_date, end_date, group_by):
+        totals = defaultdict(Decimal)
+        while pending is not None and pending['period'] <= period:
+            totals[pending.get('category__name')] += pending['total_amount']
+            pending = next(rows, None)
+        for name in names:
+            row = {'period': period}
+            if name is not None:
+                row['category__name'] = name
+            row['total_amount'] = totals.get(name, Decimal(0)).quantize(CENT)
+            yield row
+
+
+def time_series(
+    user,
+    start_date,
+    end_date,
+    group_by,
+    category=None,
+    report_type='all',
+    by_category=False
+):
+    """Return totals per ``group_by`` period over an inclusive date range,
+    optionally split by category name.
+
+    The totals come from one aggregate query grouped on the truncated
+    ``created_at``; periods without transactions are filled with zero so
+    the series is dense. A ``category`` filter covers its subtree."""
+    _, rows = series_queries(
+        user,
+        start_date,
+        end_date,
+        group_by,
+        category,
+        report_type,
+        by_category
+    )
+    rows = list(rows)
+    names = (
+        sorted({row['category__name'] for row in rows})
+        if by_category else [None]
+    )
+    return list(dense_series(rows, names, start_date, end_date, group_by))
+
+
+def stream_time_series(
+    user,
+    start_date,
+    end_date,
+    group_by,
+    category=None,
+    report_type='all',
+    by_category=False
+):
+    """Like ``time_series``, but yield the rows lazily while reading the
+    aggregate from a server-side cursor in chunks.
+
+    The category names are read first with a small ``DISTINCT`` query so
+    every period can be filled without holding the series in memory."""
+    transactions, rows = series_queries(
+        user,
+        start_date,
+        end_date,
+        group_by,
+        category,
+        report_type,
+        by_category
+    )
+    names = [None]
+    if by_category:
+        names = sorted(
+            transactions.values_list(
+                'category__name',
+                flat=True
+            ).distinct().order_by()
+        )
+    return dense_series(
+        rows.iterator(chunk_size=SERIES_CHUNK_SIZE),
+        names,
+        start_date,
+        end_date,
+        group_by
+    )
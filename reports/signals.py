@@ -0,0 +1,83 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from categories.models import Category
+from transactions.models import Transaction
+from transactions.signals import transactions_bulk_created
+from users.utils import is_user_deletion
+from .cache import invalidate_category_reports, invalidate_user_reports
+from .rollups import (
+    rebuild_rollups,
+    record_created,
+    record_deleted,
+    record_updated
+)
+
+# Fields whose change moves a transaction between rollup rows or
+# changes its contribution
+ROLLUP_FIELDS = (
+    'user_id',
+    'category_id',
+    'transaction_type',
+    'created_at',
+    'amount'
+)
+
+
+@receiver(post_save, sender=Transaction)
+def update_rollups_on_save(sender, instance, created, **kwargs):
+    """Keep the monthly rollups current for a saved transaction."""
+    if created:
+        record_created([instance])
+        return
+
+    old_values = getattr(instance, '_loaded_values', {})
+    if not all(field in old_values for field in ROLLUP_FIELDS):
+        # The previous values are unknown; rebuild the owner's rollups
+        rebuild_rollups([instance.user_id])
+        return
+    if all(
+        old_values[field] == getattr(instance, field)
+        for field in ROLLUP_FIELDS
+    ):
+        return
+    record_updated(instance, old_values)
+
+
+@receiver(post_delete, sender=Transaction)
+def update_rollups_on_delete(sender, instance, origin=None, **kwargs):
+    """Remove a deleted transaction from the monthly rollups; rollups of
+    a deleted user go away with the user."""
+    if is_user_deletion(origin):
+        return
+    record_deleted([instance])
+
+
+@receiver(transactions_bulk_created, sender=Transaction)
+def update_rollups_on_bulk_create(sender, transactions, **kwargs):
+    """Count bulk inserted transactions in the monthly rollups."""
+    record_created(transactions)
+
+
+@receiver(post_save, sender=Transaction)
+@receiver(post_delete, sender=Transaction)
+def invalidate_reports_on_write(sender, instance, **kwargs):
+    """Invalidate the cached reports of the transaction's owner, and of
+    its previous owner if it changed hands."""
+    user_ids = {instance.user_id}
+    user_ids.add(getattr(instance, '_loaded_values', {}).get('user_id'))
+    for user_id in user_ids - {None}:
+        invalidate_user_reports(user_id)
+
+
+@receiver(transactions_bulk_created, sender=Transaction)
+def invalidate_reports_on_bulk_create(sender, transactions, **kwargs):
+    """Invalidate the cached reports of every owner of the new rows."""
+    for user_id in {transaction.user_id for transaction in transactions}:
+        invalidate_user_reports(user_id)
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def invalidate_reports_on_category_change(sender, **kwargs):
+    """Reports show category names, which are shared by all users."""
+    invalidate_category_reports()
@@ -0,0 +1,73 @@
+import numpy as np
+from django.db.models import FloatField
+from django.db.models.functions import Cast
+from categories.models import Category
+from transactions.models import Transaction
+from .comparison import in_range
+
+# Rows fetched from the database cursor at a time
+STATS_CHUNK_SIZE = 10000
+
+STATS_DTYPE = np.dtype([('category', np.int64), ('amount', np.float64)])
+
+
+def spending_stats(user, start_date, end_date, category=None, report_type='all'):
+    """Return transaction size statistics per category over an inclusive
+    date range: count, average, median, 90th percentile and sample
+    standard deviation.
+
+    Only the category id and the amount, cast to a float by the
+    database, are fetched; they stream from the cursor straight into a
+    NumPy array that is grouped and reduced without a Python loop over
+    the rows."""
+    transactions = Transaction.objects.filter(
+        in_range(start_date, end_date),
+        user=user
+    )
+    if category:
+        transactions = transactions.filter(
+            category__ancestor_links__ancestor=category
+        )
+    if report_type != 'all':
+        transactions = transactions.filter(transaction_type=report_type)
+
+    rows = transactions.values_list(
+        'category_id',
+        Cast('amount', FloatField())
+    ).order_by()
+    data = np.fromiter(
+        rows.iterator(chunk_size=STATS_CHUNK_SIZE),
+        dtype=STATS_DTYPE
+    )
+    if not data.size:
+        return []
+
+    order = np.argsort(data['category'], kind='stable')
+    amounts = data['amount'][order]
+    category_ids, starts, counts = np.unique(
+        data['category'][order],
+        return_index=True,
+        return_counts=True
+    )
+    names = dict(
+        Category.objects.filter(
+            pk__in=category_ids.tolist()
+        ).values_list('id', 'name')
+    )
+
+    stats = []
+    for category_id, count, group in zip(
+        category_ids.tolist(),
+        counts.tolist(),
+        np.split(amounts, starts[1:])
+    ):
+        median, p90 = np.percentile(group, [50, 90])
+        stats.append({
+            'category__name': names.get(category_id),
+            'count': count,
+            'average': round(float(group.mean()), 2),
+            'median': round(float(median), 2),
+            'p90': round(float(p90), 2),
+            'std': round(float(group.std(ddof=1)), 2) if count > 1 else 0.0,
+        })
+    return sorted(stats, key=lambda row: row['category__name'] or '')
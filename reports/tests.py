@@ -1,3 +1,570 @@
-from django.test import TestCase
+from datetime import date, datetime
+from decimal import Decimal
+from io import StringIO
+from unittest import mock
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db.models import Sum
+from django.test import override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import RefreshToken
+from categories.models import Category
+from transactions.models import Transaction
+from .models import MonthlyRollup, ReportJob
 
-# Create your tests here.
+User = get_user_model()
+
+
+def aware(*args):
+    return timezone.make_aware(datetime(*args))
+
+
+class ReportRollupTests(APITestCase):
+    """Tests for the monthly rollups backing the report endpoint."""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(
+            email='testuser@example.com',
+            username='testuser',
+            password='testpassword'
+        )
+        access_token = str(RefreshToken.for_user(self.user).access_token)
+        self.client.credentials(HTTP_AUTHORIZATION='Bearer ' + access_token)
+        self.groceries = Category.objects.create(
+            name='Groceries',
+            category_type='expense'
+        )
+        self.rent = Category.objects.create(
+            name='Rent',
+            category_type='expense'
+        )
+        self.salary = Category.objects.create(
+            name='Salary',
+            category_type='income'
+        )
+
+    def create_transaction(self, amount, category, created_at, **kwargs):
+        return Transaction.objects.create(
+            user=self.user,
+            amount=amount,
+            transaction_type=category.category_type,
+            category=category,
+            created_at=created_at,
+            **kwargs
+        )
+
+    def rollup(self, category, month):
+        return MonthlyRollup.objects.filter(
+            user=self.user,
+            category=category,
+            month=month
+        ).values_list('total', 'count').first()
+
+    def test_rollups_follow_create_update_and_delete(self):
+        """Test that rollups change with every write to a transaction."""
+        first = self.create_transaction(10, self.groceries, aware(2024, 1, 5))
+        self.create_transaction(15, self.groceries, aware(2024, 1, 20))
+        self.assertEqual(self.rollup(self.groceries, date(2024, 1, 1)), (Decimal('25.00'), 2))
+
+        response = self.client.put(
+            reverse('transactions-detail', args=[first.id]),
+            {
+                'amount': '12.00',
+                'transaction_type': 'expense',
+                'category': self.rent.id
+            },
+            format='json'
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(self.rollup(self.groceries, date(2024, 1, 1)), (Decimal('15.00'), 1))
+        self.assertEqual(self.rollup(self.rent, date(2024, 1, 1)), (Decimal('12.00'), 1))
+
+        first.refresh_from_db()
+        first.created_at = aware(2024, 2, 3)
+        first.save()
+        self.assertEqual(self.rollup(self.rent, date(2024, 1, 1)), (Decimal('0.00'), 0))
+        self.assertEqual(self.rollup(self.rent, date(2024, 2, 1)), (Decimal('12.00'), 1))
+
+        response = self.client.delete(
+            reverse('transactions-detail', args=[first.id])
+        )
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertEqual(self.rollup(self.rent, date(2024, 2, 1)), (Decimal('0.00'), 0))
+
+    def test_rollups_follow_save_without_loaded_values(self):
+        """Test that saving an instance that was not loaded from the
+        database still leaves the rollups right."""
+        stored = self.create_transaction(7, self.groceries, aware(2024, 1, 5))
+
+        Transaction(
+            pk=stored.pk,
+            user=self.user,
+            amount=1000,
+            transaction_type='expense',
+            category=self.groceries,
+            created_at=stored.created_at
+        ).save()
+
+        self.assertEqual(
+            self.rollup(self.groceries, date(2024, 1, 1)),
+            (Decimal('1000.00'), 1)
+        )
+
+    def test_bulk_created_transactions_are_rolled_up(self):
+        """Test that rows inserted by the bulk endpoint reach the rollups."""
+        rows = [
+            {
+                'amount': '5.00',
+                'transaction_type': 'expense',
+                'category': self.rent.id,
+                'description': f'Row {number}',
+                'created_at': aware(2024, 3, number).isoformat(),
+            }
+            for number in range(1, 11)
+        ]
+        response = self.client.post(
+            reverse('transactions-bulk'),
+            rows,
+            format='json'
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(self.rollup(self.rent, date(2024, 3, 1)), (Decimal('50.00'), 10))
+
+    def test_report_matches_raw_aggregation(self):
+        """Test that a range with partial edge months adds up to the same
+        totals as aggregating the raw transactions."""
+        self.create_transaction(100, self.groceries, aware(2024, 1, 10))
+        self.create_transaction(40, self.groceries, aware(2024, 1, 20, 18))
+        self.create_transaction(60, self.groceries, aware(2024, 2, 14))
+        self.create_transaction(900, self.rent, aware(2024, 3, 1))
+        self.create_transaction(25, self.groceries, aware(2024, 4, 2, 23, 59))
+        self.create_transaction(30, self.groceries, aware(2024, 4, 3))
+        self.create_transaction(2000, self.salary, aware(2024, 2, 28))
+
+        response = self.client.post(
+            reverse('report-view'),
+            {'start_date': '2024-01-15', 'end_date': '2024-04-02'},
+            format='json'
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        expected = Transaction.objects.filter(
+            user=self.user,
+            created_at__gte=aware(2024, 1, 15),
+            created_at__lt=aware(2024, 4, 3)
+        ).values('category__name').annotate(
+            total_amount=Sum('amount')
+        ).order_by('-total_amount')
+        self.assertEqual(
+            [(row['category__name'], row['total_amount']) for row in response.data],
+            [(row['category__name'], row['total_amount']) for row in expected]
+        )
+        self.assertEqual(response.data[-1]['total_amount'], Decimal('125.00'))
+
+        response = self.client.post(
+            reverse('report-view'),
+            {
+                'start_date': '2024-01-15',
+                'end_date': '2024-04-02',
+                'report_type': 'expense',
+                'category': self.groceries.id
+            },
+            format='json'
+        )
+        self.assertEqual(
+            list(response.data),
+            [{'category__name': 'Groceries', 'total_amount': Decimal('125.00')}]
+        )
+
+    def test_rebuild_report_rollups_command(self):
+        """Test that the rebuild command restores drifted rollups."""
+        self.create_transaction(10, self.groceries, aware(2024, 1, 5))
+        self.create_transaction(20, self.rent, aware(2024, 2, 5))
+        MonthlyRollup.objects.update(total=0, count=0)
+
+        out = StringIO()
+        call_command(
+            'rebuild_report_rollups',
+            user=self.user.email,
+            stdout=out
+        )
+
+        self.assertIn('Rebuilt 2 monthly rollups', out.getvalue())
+        self.assertEqual(self.rollup(self.groceries, date(2024, 1, 1)), (Decimal('10.00'), 1))
+        self.assertEqual(self.rollup(self.rent, date(2024, 2, 1)), (Decimal('20.00'), 1))
+
+    def test_report_time_series_by_month(self):
+        """Test a dense monthly series computed in one query."""
+        self.create_transaction(100, self.groceries, aware(2024, 1, 10))
+        self.create_transaction(50, self.rent, aware(2024, 1, 31, 23))
+        self.create_transaction(30, self.groceries, aware(2024, 3, 2))
+
+        with self.assertNumQueries(2):
+            response = self.client.post(
+                reverse('report-view'),
+                {
+                    'start_date': '2024-01-01',
+                    'end_date': '2024-04-30',
+                    'group_by': 'month'
+                },
+                format='json'
+            )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [(row['period'], row['total_amount']) for row in response.data],
+            [
+                (date(2024, 1, 1), Decimal('150.00')),
+                (date(2024, 2, 1), Decimal('0.00')),
+                (date(2024, 3, 1), Decimal('30.00')),
+                (date(2024, 4, 1), Decimal('0.00')),
+            ]
+        )
+
+    def test_report_time_series_by_week_and_category(self):
+        """Test a weekly series split by category with zero-filled gaps."""
+        self.create_transaction(10, self.groceries, aware(2024, 1, 2))
+        self.create_transaction(20, self.groceries, aware(2024, 1, 4))
+        self.create_transaction(700, self.rent, aware(2024, 1, 16))
+
+        response = self.client.post(
+            reverse('report-view'),
+            {
+                'start_date': '2024-01-03',
+                'end_date': '2024-01-21',
+                'group_by': 'week',
+                'by_category': True,
+                'report_type': 'expense'
+            },
+            format='json'
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [
+                (row['period'], row['category__name'], row['total_amount'])
+                for row in response.data
+            ],
+            [
+                (date(2024, 1, 1), 'Groceries', Decimal('20.00')),
+                (date(2024, 1, 1), 'Rent', Decimal('0.00')),
+                (date(2024, 1, 8), 'Groceries', Decimal('0.00')),
+                (date(2024, 1, 8), 'Rent', Decimal('0.00')),
+                (date(2024, 1, 15), 'Groceries', Decimal('0.00')),
+                (date(2024, 1, 15), 'Rent', Decimal('700.00')),
+            ]
+        )
+
+    def test_repeated_report_is_served_from_cache(self):
+        """Test that equivalent requests share a cached result and a
+        transaction write invalidates it."""
+        self.create_transaction(100, self.groceries, aware(2024, 1, 10))
+        params = {'start_date': '2024-01-01', 'end_date': '2024-01-31'}
+        response = self.client.post(reverse('report-view'), params, format='json')
+        self.assertEqual(response.data[0]['total_amount'], Decimal('100.00'))
+
+        # Only the user lookup of authentication reaches the database
+        with self.assertNumQueries(1):
+            response = self.client.post(
+                reverse('report-view'),
+                {'report_type': 'all', **params},
+                format='json'
+            )
+        self.assertEqual(response.data[0]['total_amount'], Decimal('100.00'))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.create_transaction(50, self.groceries, aware(2024, 1, 11))
+        response = self.client.post(reverse('report-view'), params, format='json')
+        self.assertEqual(response.data[0]['total_amount'], Decimal('150.00'))
+
+    def test_category_rename_invalidates_cached_reports(self):
+        """Test that reports pick up a renamed category."""
+        self.create_transaction(100, self.groceries, aware(2024, 1, 10))
+        params = {'start_date': '2024-01-01', 'end_date': '2024-01-31'}
+        self.client.post(reverse('report-view'), params, format='json')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.groceries.name = 'Food'
+            self.groceries.save()
+        response = self.client.post(reverse('report-view'), params, format='json')
+
+        self.assertEqual(response.data[0]['category__name'], 'Food')
+
+    def test_cache_error_does_not_fail_the_write(self):
+        """Test that a failed version bump after commit is logged."""
+        with mock.patch.object(
+            cache,
+            'incr',
+            side_effect=ConnectionError
+        ), self.assertLogs('drf_api.versions', level='ERROR'):
+            with self.captureOnCommitCallbacks(execute=True):
+                self.create_transaction(100, self.groceries, aware(2024, 1, 10))
+
+        self.assertEqual(Transaction.objects.filter(user=self.user).count(), 1)
+
+    def test_report_rolls_up_category_hierarchy(self):
+        """Test filtering by a parent category and crediting parents
+        with their subcategories' totals."""
+        housing = Category.objects.create(name='Housing', category_type='expense')
+        self.rent.parent_category = housing
+        self.rent.save()
+        electricity = Category.objects.create(
+            name='Electricity',
+            category_type='expense',
+            parent_category=housing
+        )
+        self.create_transaction(900, self.rent, aware(2024, 1, 1))
+        self.create_transaction(80, electricity, aware(2024, 1, 20))
+        self.create_transaction(30, self.groceries, aware(2024, 1, 5))
+        params = {'start_date': '2024-01-01', 'end_date': '2024-01-31'}
+
+        response = self.client.post(
+            reverse('report-view'),
+            {'category': housing.id, **params},
+            format='json'
+        )
+        self.assertEqual(
+            [(row['category__name'], row['total_amount']) for row in response.data],
+            [('Rent', Decimal('900.00')), ('Electricity', Decimal('80.00'))]
+        )
+
+        response = self.client.post(
+            reverse('report-view'),
+            {'hierarchy': True, **params},
+            format='json'
+        )
+        self.assertEqual(
+            [
+                (row['category__name'], row['parent_category'], row['total_amount'])
+                for row in response.data
+            ],
+            [
+                ('Housing', None, Decimal('980.00')),
+                ('Rent', housing.id, Decimal('900.00')),
+                ('Electricity', housing.id, Decimal('80.00')),
+                ('Groceries', None, Decimal('30.00')),
+            ]
+        )
+
+    def test_report_compares_with_previous_period(self):
+        """Test current and previous totals computed in one query."""
+        self.create_transaction(100, self.groceries, aware(2024, 3, 5))
+        self.create_transaction(80, self.groceries, aware(2024, 2, 20))
+        self.create_transaction(900, self.rent, aware(2024, 2, 1))
+        self.create_transaction(50, self.salary, aware(2024, 3, 10))
+
+        # Authentication plus the aggregate
+        with self.assertNumQueries(2):
+            response = self.client.post(
+                reverse('report-view'),
+                {
+                    'start_date': '2024-03-01',
+                    'end_date': '2024-03-29',
+                    'compare_to': 'previous_period',
+                    'report_type': 'expense'
+                },
+                format='json'
+            )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            response.data['previous'],
+            {'start_date': date(2024, 2, 1), 'end_date': date(2024, 2, 29)}
+        )
+        self.assertEqual(
+            [
+                (
+                    row['category__name'],
+                    row['current_total'],
+                    row['previous_total'],
+                    row['delta'],
+                    row['delta_percent']
+                )
+                for row in response.data['categories']
+            ],
+            [
+                ('Groceries', Decimal('100.00'), Decimal('80.00'), Decimal('20.00'), Decimal('25.00')),
+                ('Rent', Decimal('0.00'), Decimal('900.00'), Decimal('-900.00'), Decimal('-100.00')),
+            ]
+        )
+
+    def test_report_compares_with_previous_year(self):
+        """Test a year-over-year comparison from a leap day."""
+        response = self.client.post(
+            reverse('report-view'),
+            {
+                'start_date': '2024-02-01',
+                'end_date': '2024-02-29',
+                'compare_to': 'previous_year'
+            },
+            format='json'
+        )
+
+        self.assertEqual(
+            response.data['previous'],
+            {'start_date': date(2023, 2, 1), 'end_date': date(2023, 2, 28)}
+        )
+        self.assertEqual(response.data['categories'], [])
+
+    def test_report_stats_per_category(self):
+        """Test median, percentile, deviation and average per category."""
+        for amount in (10, 20, 30, 40, 100):
+            self.create_transaction(amount, self.groceries, aware(2024, 1, amount % 28 + 1))
+        self.create_transaction(900, self.rent, aware(2024, 1, 1))
+        self.create_transaction(5, self.groceries, aware(2023, 12, 31))
+
+        # Authentication, the amounts and the category names
+        with self.assertNumQueries(3):
+            response = self.client.post(
+                reverse('report-stats'),
+                {'start_date': '2024-01-01', 'end_date': '2024-01-31'},
+                format='json'
+            )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data, [
+            {
+                'category__name': 'Groceries',
+                'count': 5,
+                'average': 40.0,
+                'median': 30.0,
+                'p90': 76.0,
+                'std': 35.36,
+            },
+            {
+                'category__name': 'Rent',
+                'count': 1,
+                'average': 900.0,
+                'median': 900.0,
+                'p90': 900.0,
+                'std': 0.0,
+            },
+        ])
+
+    def test_report_time_series_streams_as_csv(self):
+        """Test that a per-day, per-category series is streamed as CSV."""
+        self.create_transaction(10, self.groceries, aware(2024, 1, 1))
+        self.create_transaction(700, self.rent, aware(2024, 1, 3))
+
+        response = self.client.post(
+            reverse('report-view') + '?format=csv',
+            {
+                'start_date': '2024-01-01',
+                'end_date': '2024-01-03',
+                'group_by': 'day',
+                'by_category': True
+            },
+            format='json'
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.streaming)
+        self.assertEqual(response['Content-Type'], 'text/csv')
+        self.assertEqual(
+            b''.join(response.streaming_content).decode().splitlines(),
+            [
+                'period,category__name,total_amount',
+                '2024-01-01,Groceries,10.00',
+                '2024-01-01,Rent,0.00',
+                '2024-01-02,Groceries,0.00',
+                '2024-01-02,Rent,0.00',
+                '2024-01-03,Groceries,0.00',
+                '2024-01-03,Rent,700.00',
+            ]
+        )
+
+    def test_report_totals_stream_as_csv(self):
+        """Test that category totals can be downloaded as CSV too."""
+        self.create_transaction(10, self.groceries, aware(2024, 1, 1))
+
+        response = self.client.post(
+            reverse('report-view') + '?format=csv',
+            {'start_date': '2024-01-01', 'end_date': '2024-01-31'},
+            format='json'
+        )
+
+        self.assertEqual(
+            b''.join(response.streaming_content).decode().splitlines(),
+            ['category__name,total_amount', 'Groceries,10.00']
+        )
+
+
+class ReportJobTests(APITestCase):
+    """Tests for background report jobs."""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(
+            email='testuser@example.com',
+            username='testuser',
+            password='testpassword'
+        )
+        access_token = str(RefreshToken.for_user(self.user).access_token)
+        self.client.credentials(HTTP_AUTHORIZATION='Bearer ' + access_token)
+        self.category = Category.objects.create(
+            name='Groceries',
+            category_type='expense'
+        )
+        Transaction.objects.create(
+            user=self.user,
+            amount=100,
+            transaction_type='expense',
+            category=self.category,
+            created_at=aware(2024, 1, 10)
+        )
+        self.params = {'start_date': '2020-01-01', 'end_date': '2024-12-31'}
+
+    def test_worker_computes_queued_report(self):
+        """Test that a queued job is computed by the worker command and
+        matches the interactive report."""
+        response = self.client.post(
+            reverse('report-job-create'),
+            self.params,
+            format='json'
+        )
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(response.data['status'], ReportJob.QUEUED)
+        detail_url = reverse('report-job-detail', args=[response.data['id']])
+
+        out = StringIO()
+        call_command('run_report_worker', once=True, stdout=out)
+        self.assertIn('Ran 1 report job(s)', out.getvalue())
+
+        response = self.client.get(detail_url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['status'], ReportJob.DONE)
+        report = self.client.post(reverse('report-view'), self.params, format='json')
+        self.assertEqual(response.json()['result'], report.json())
+
+    @override_settings(REPORT_JOBS_EAGER=True)
+    def test_eager_jobs_run_in_process(self):
+        """Test the in-process stand-in used without a worker."""
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                reverse('report-job-create'),
+                self.params,
+                format='json'
+            )
+
+        job = ReportJob.objects.get(pk=response.data['id'])
+        self.assertEqual(job.status, ReportJob.DONE)
+        self.assertEqual(job.result[0]['category__name'], 'Groceries')
+
+    def test_report_jobs_are_private(self):
+        """Test that a user cannot read another user's job."""
+        other = User.objects.create_user(
+            email='other@example.com',
+            username='other',
+            password='testpassword'
+        )
+        job = ReportJob.objects.create(user=other, params=self.params)
+
+        response = self.client.get(reverse('report-job-detail', args=[job.id]))
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
@@ -1,5 +1,10 @@
 from django.urls import path
-from .views import ReportView
+from .views import (
+    ReportJobCreateView,
+    ReportJobDetailView,
+    ReportStatsView,
+    ReportView
+)
 
 urlpatterns = [
     path(
@@ -7,4 +12,19 @@ urlpatterns = [
         ReportView.as_view(),
         name='report-view'
     ),
-]
\ No newline at end of file
+    path(
+        'stats/',
+        ReportStatsView.as_view(),
+        name='report-stats'
+    ),
+    path(
+        'jobs/',
+        ReportJobCreateView.as_view(),
+        name='report-job-create'
+    ),
+    path(
+        'jobs/<int:pk>/',
+        ReportJobDetailView.as_view(),
+        name='report-job-detail'
+    ),
+]
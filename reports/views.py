@@ -1,38 +1,87 @@
-from rest_framework import views
+from rest_framework import generics, status, views
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
-from django.db.models import Sum
-from transactions.models import Transaction
-from .serializers import ReportFilterSerializer
+from rest_framework.settings import api_settings
+from drf_api.streaming import CSVStreamRenderer, streaming_response
+from .builder import build_report, report_rows
+from .cache import cached_report
+from .jobs import enqueue_report_job
+from .models import ReportJob
+from .serializers import (
+    ReportFilterSerializer,
+    ReportJobSerializer,
+    ReportRangeSerializer
+)
+from .stats import spending_stats
 
 class ReportView(views.APIView):
     permission_classes = [IsAuthenticated]
+    renderer_classes = [
+        *api_settings.DEFAULT_RENDERER_CLASSES,
+        CSVStreamRenderer
+    ]
 
     def post(self, request, *args, **kwargs):
         serializer = ReportFilterSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
 
-        # Extract validated data
-        start_date = serializer.validated_data['start_date']
-        end_date = serializer.validated_data['end_date']
-        category = serializer.validated_data.get('category')
-        report_type = serializer.validated_data['report_type']
+        if request.accepted_renderer.format == 'csv':
+            # Streamed line by line instead of rendered as one document
+            columns, rows = report_rows(
+                request.user,
+                serializer.validated_data
+            )
+            return streaming_response('csv', columns, rows, 'report')
 
-        # Query transactions based on filters
-        transactions = Transaction.objects.filter(
-            user=request.user,
-            created_at__range=[start_date, end_date]
+        report_data = build_report(request.user, serializer.validated_data)
+
+        return Response(report_data)
+
+
+class ReportStatsView(views.APIView):
+    """Transaction size statistics per category over a date range."""
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request, *args, **kwargs):
+        serializer = ReportRangeSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        params = serializer.validated_data
+
+        stats = cached_report(
+            request.user,
+            {'report': 'stats', **params},
+            lambda: spending_stats(
+                request.user,
+                params['start_date'],
+                params['end_date'],
+                params.get('category'),
+                params['report_type']
+            )
         )
 
-        if category:
-            transactions = transactions.filter(category=category)
+        return Response(stats)
 
-        if report_type != 'all':
-            transactions = transactions.filter(transaction_type=report_type)
 
-        # Aggregate totals by category
-        report_data = transactions.values(
-            'category__name'
-        ).annotate(total_amount=Sum('amount')).order_by('-total_amount')
+class ReportJobCreateView(views.APIView):
+    """Queue a report to be computed by a background worker."""
+    permission_classes = [IsAuthenticated]
 
-        return Response(report_data)
+    def post(self, request, *args, **kwargs):
+        serializer = ReportFilterSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        job = enqueue_report_job(request.user, serializer.data)
+
+        return Response(
+            ReportJobSerializer(job).data,
+            status=status.HTTP_202_ACCEPTED
+        )
+
+
+class ReportJobDetailView(generics.RetrieveAPIView):
+    """Return the status and, once done, the result of a report job."""
+    serializer_class = ReportJobSerializer
+    permission_classes = [IsAuthenticated]
+
+    def get_queryset(self):
+        return ReportJob.objects.filter(user=self.request.user)
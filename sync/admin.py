@@ -0,0 +1,8 @@
+from django.contrib import admin
+from .models import Tombstone
+
+class TombstoneAdmin(admin.ModelAdmin):
+    list_display = ('user', 'model', 'object_id', 'deleted_at')
+    list_filter = ('model',)
+
+admin.site.register(Tombstone, TombstoneAdmin)
@@ -0,0 +1,34 @@
+from django.conf import settings
+from django.db import models
+from django.utils import timezone
+
+
+class Tombstone(models.Model):
+    """Record of a deleted row, so that syncing clients can drop it."""
+    MODEL_CHOICES = (
+        ('transaction', 'Transaction'),
+        ('budget', 'Budget'),
+        ('goal', 'Goal'),
+    )
+
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='+',
+        # Covered by the (user, deleted_at) index below
+        db_index=False
+    )
+    model = models.CharField(max_length=20, choices=MODEL_CHOICES)
+    object_id = models.BigIntegerField()
+    deleted_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=['user', 'deleted_at'],
+                name='tombstone_user_deleted_idx'
+            ),
+        ]
+
+    def __str__(self):
+        return f"Deleted {self.model} {self.object_id} at {self.deleted_at}"
@@ -0,0 +1,28 @@
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
+from budgets.models import Budget
+from goals.models import Goal
+from transactions.models import Transaction
+from users.utils import is_user_deletion
+from .models import Tombstone
+
+TOMBSTONE_MODELS = {
+    Transaction: 'transaction',
+    Budget: 'budget',
+    Goal: 'goal',
+}
+
+
+@receiver(post_delete, sender=Transaction)
+@receiver(post_delete, sender=Budget)
+@receiver(post_delete, sender=Goal)
+def record_tombstone(sender, instance, origin=None, **kwargs):
+    """Leave a tombstone for a deleted transaction, budget or goal,
+    unless its owner is being deleted and there is nobody to sync."""
+    if is_user_deletion(origin):
+        return
+    Tombstone.objects.create(
+        user_id=instance.user_id,
+        model=TOMBSTONE_MODELS[sender],
+        object_id=instance.pk
+    )
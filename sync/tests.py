@@ -0,0 +1,223 @@
+from datetime import date, datetime
+from django.contrib.auth import get_user_model
+from django.test import override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import RefreshToken
+from budgets.models import Budget
+from categories.models import Category
+from goals.models import Goal
+from transactions.models import Transaction
+from .models import Tombstone
+
+User = get_user_model()
+
+
+class SyncTests(APITestCase):
+    """Tests for the delta sync endpoint."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email='testuser@example.com',
+            username='testuser',
+            password='testpassword'
+        )
+        access_token = str(RefreshToken.for_user(self.user).access_token)
+        self.client.credentials(HTTP_AUTHORIZATION='Bearer ' + access_token)
+        self.category = Category.objects.create(
+            name='Groceries',
+            category_type='expense'
+        )
+        self.transaction = Transaction.objects.create(
+            user=self.user,
+            amount=10,
+            transaction_type='expense',
+            category=self.category,
+            description='Market'
+        )
+        self.budget = Budget.objects.create(
+            user=self.user,
+            category=self.category,
+            amount=200,
+            start_date=date(2024, 1, 1),
+            end_date=date(2024, 1, 31)
+        )
+        self.goal = Goal.objects.create(
+            user=self.user,
+            title='Holiday',
+            target_amount=1000
+        )
+        self.goal_id = self.goal.pk
+
+    def sync(self, token=None):
+        params = {'since': token} if token else {}
+        response = self.client.get(reverse('sync'), params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.data
+
+    def sync_pages(self, token=None):
+        """Return every page of a sync, following the cursors."""
+        pages = [self.sync(token)]
+        while pages[-1]['next']:
+            response = self.client.get(
+                reverse('sync'),
+                {'cursor': pages[-1]['next']}
+            )
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            pages.append(response.data)
+        return pages
+
+    def test_initial_sync_returns_everything(self):
+        """Test that a sync without a token is a full reset."""
+        data = self.sync()
+
+        self.assertTrue(data['reset'])
+        self.assertEqual(len(data['transactions']['updated']), 1)
+        self.assertEqual(len(data['budgets']['updated']), 1)
+        self.assertEqual(len(data['goals']['updated']), 1)
+
+    def test_delta_sync_returns_only_changes(self):
+        """Test that updates and deletes after the token are returned."""
+        token = self.sync()['token']
+        Tombstone.objects.all().delete()
+        Transaction.objects.filter(pk=self.transaction.pk).update(
+            updated_at=self.transaction.updated_at.replace(year=2000)
+        )
+        Budget.objects.filter(pk=self.budget.pk).update(
+            updated_at=self.budget.updated_at.replace(year=2000)
+        )
+        Goal.objects.filter(pk=self.goal.pk).update(
+            updated_at=self.goal.updated_at.replace(year=2000)
+        )
+
+        unchanged = self.sync(token)
+        self.budget.amount = 300
+        self.budget.save()
+        self.goal.delete()
+        changed = self.sync(token)
+
+        self.assertFalse(unchanged['reset'])
+        self.assertEqual(unchanged['transactions']['updated'], [])
+        self.assertEqual(unchanged['budgets']['updated'], [])
+        self.assertEqual(changed['budgets']['updated'][0]['amount'], '300.00')
+        self.assertEqual(changed['transactions']['updated'], [])
+        self.assertEqual(changed['goals']['deleted'], [self.goal_id])
+
+    def test_spending_changes_are_synced(self):
+        """Test that a budget's running spend moved by an expense is
+        returned by the next delta sync."""
+        token = self.sync()['token']
+        Budget.objects.filter(pk=self.budget.pk).update(
+            updated_at=self.budget.updated_at.replace(year=2000)
+        )
+
+        Transaction.objects.create(
+            user=self.user,
+            amount=25,
+            transaction_type='expense',
+            category=self.category,
+            created_at=timezone.make_aware(datetime(2024, 1, 10, 12))
+        )
+        changed = self.sync(token)
+
+        self.assertEqual(
+            changed['budgets']['updated'][0]['running_spent'],
+            '25.00'
+        )
+
+    @override_settings(SYNC_PAGE_SIZE=2)
+    def test_reset_is_returned_in_pages(self):
+        """Test that a full resync is paged with a cursor and every row
+        is returned once."""
+        second = Transaction.objects.create(
+            user=self.user,
+            amount=20,
+            transaction_type='expense',
+            category=self.category,
+            description='Bakery'
+        )
+
+        first_page = self.sync()
+        response = self.client.get(
+            reverse('sync'),
+            {'cursor': first_page['next']}
+        )
+        second_page = response.data
+
+        self.assertTrue(first_page['reset'])
+        self.assertEqual(
+            [row['id'] for row in first_page['transactions']['updated']],
+            [self.transaction.pk, second.pk]
+        )
+        self.assertEqual(first_page['budgets']['updated'], [])
+        self.assertTrue(second_page['reset'])
+        self.assertEqual(second_page['transactions']['updated'], [])
+        self.assertEqual(len(second_page['budgets']['updated']), 1)
+        self.assertEqual(len(second_page['goals']['updated']), 1)
+        self.assertIsNone(second_page['next'])
+        self.assertIsNone(first_page['token'])
+        self.assertIsNotNone(second_page['token'])
+
+    @override_settings(SYNC_PAGE_SIZE=2)
+    def test_delta_is_returned_in_pages(self):
+        """Test that a large delta is paged by (updated_at, id) and the
+        next token only comes with the last page."""
+        token = self.sync_pages()[-1]['token']
+        Tombstone.objects.all().delete()
+        Transaction.objects.filter(pk=self.transaction.pk).update(
+            updated_at=self.transaction.updated_at.replace(year=2000)
+        )
+        Budget.objects.filter(pk=self.budget.pk).update(
+            updated_at=self.budget.updated_at.replace(year=2000)
+        )
+        Goal.objects.filter(pk=self.goal.pk).update(
+            updated_at=self.goal.updated_at.replace(year=2000)
+        )
+        new = [
+            Transaction.objects.create(
+                user=self.user,
+                amount=amount,
+                transaction_type='expense',
+                category=self.category
+            ).pk
+            for amount in (1, 2, 3)
+        ]
+        self.goal.delete()
+
+        pages = self.sync_pages(token)
+
+        self.assertEqual(len(pages), 2)
+        self.assertFalse(pages[0]['reset'])
+        self.assertIsNone(pages[0]['token'])
+        self.assertEqual(pages[0]['goals']['deleted'], [self.goal_id])
+        self.assertEqual(
+            [
+                row['id']
+                for page in pages
+                for row in page['transactions']['updated']
+            ],
+            new
+        )
+        self.assertEqual(pages[1]['budgets']['updated'], [])
+        self.assertIsNotNone(pages[1]['token'])
+
+    def test_invalid_cursor_is_rejected(self):
+        """Test that a malformed or foreign cursor is a 400."""
+        for cursor in ['not a cursor', self.sync()['token']]:
+            response = self.client.get(reverse('sync'), {'cursor': cursor})
+
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_invalid_token_is_rejected(self):
+        """Test that a malformed token is a 400."""
+        response = self.client.get(reverse('sync'), {'since': 'not a token'})
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_deleting_user_leaves_no_tombstones(self):
+        """Test that cascading user deletes do not record tombstones."""
+        self.user.delete()
+
+        self.assertEqual(Tombstone.objects.count(), 0)
@@ -0,0 +1,76 @@
+import base64
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+EPOCH = datetime(1970, 1, 1, tzinfo=dt_timezone.utc)
+
+
+class InvalidSyncToken(ValueError):
+    """Raised for a sync token that was not issued by this server."""
+
+
+def encode(*parts):
+    payload = ':'.join(str(part) for part in parts)
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+
+def decode(token, count):
+    """Return the ``count`` integers encoded in ``token``."""
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        payload = base64.urlsafe_b64decode(padded.encode()).decode()
+        parts = [int(part) for part in payload.split(':')]
+    except (ValueError, UnicodeDecodeError) as exc:
+        raise InvalidSyncToken(token) from exc
+    if len(parts) != count or any(part < 0 for part in parts[1:]):
+        raise InvalidSyncToken(token)
+    return parts
+
+
+def to_datetime(token, micros):
+    try:
+        return EPOCH + timedelta(microseconds=micros)
+    except OverflowError as exc:
+        raise InvalidSyncToken(token) from exc
+
+
+def micros_of(moment):
+    """Return ``moment`` as microseconds since the epoch, 0 for ``None``."""
+    return (moment - EPOCH) // timedelta(microseconds=1) if moment else 0
+
+
+def encode_token(moment):
+    """Encode a point in time as an opaque sync token."""
+    return encode(micros_of(moment))
+
+
+def decode_token(token):
+    """Decode a sync token back into an aware datetime."""
+    micros, = decode(token, 1)
+    return to_datetime(token, micros)
+
+
+def encode_cursor(moment, since, position, last_updated, last_id):
+    """Encode where a sync started at ``moment`` for the changes after
+    ``since`` (``None`` for a full resync) continues: after the row
+    ``(last_updated, last_id)`` of the synced model at ``position``,
+    or at its start for ``last_id`` 0."""
+    return encode(
+        micros_of(moment),
+        micros_of(since),
+        position,
+        micros_of(last_updated),
+        last_id
+    )
+
+
+def decode_cursor(cursor):
+    """Decode a sync cursor into ``(moment, since, position,
+    last_updated, last_id)``."""
+    moment, since, position, last_updated, last_id = decode(cursor, 5)
+    return (
+        to_datetime(cursor, moment),
+        to_datetime(cursor, since) if since else None,
+        position,
+        to_datetime(cursor, last_updated) if last_id else None,
+        last_id
+    )
@@ -0,0 +1,141 @@
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+from rest_framework import views
+from rest_framework.exceptions import ValidationError
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from budgets.models import Budget
+from budgets.serializers import BudgetSerializer
+from goals.models import Goal
+from goals.serializers import GoalSerializer
+from transactions.models import Transaction
+from transactions.serializers import TransactionSerializer
+from .models import Tombstone
+from .tokens import (
+    InvalidSyncToken,
+    decode_cursor,
+    decode_token,
+    encode_cursor,
+    encode_token
+)
+
+SYNCED_MODELS = (
+    ('transactions', 'transaction', Transaction, TransactionSerializer),
+    ('budgets', 'budget', Budget, BudgetSerializer),
+    ('goals', 'goal', Goal, GoalSerializer),
+)
+
+
+class SyncView(views.APIView):
+    """Return the transactions, budgets and goals changed or deleted
+    since the ``since`` token. Without a token, or with one older than
+    the tombstone retention, ``reset`` is true and everything is
+    returned.
+
+    Changed rows come in pages of ``SYNC_PAGE_SIZE``, walking the
+    models in order and each by ``(updated_at, id)``: ``next`` is the
+    ``cursor`` of the following page, and the token for the next sync
+    is only returned with the last page. Deletions come with the first
+    page."""
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, *args, **kwargs):
+        user = request.user
+        started = timezone.now()
+
+        cursor = request.query_params.get('cursor')
+        if cursor:
+            try:
+                moment, since, position, last_updated, last_id = (
+                    decode_cursor(cursor)
+                )
+                if position >= len(SYNCED_MODELS):
+                    raise InvalidSyncToken(cursor)
+            except InvalidSyncToken:
+                raise ValidationError({'cursor': ['Invalid sync cursor.']})
+            return Response(self.page(
+                request,
+                moment,
+                since,
+                position,
+                last_updated,
+                last_id
+            ))
+
+        since = None
+        token = request.query_params.get('since')
+        if token:
+            try:
+                since = decode_token(token)
+            except InvalidSyncToken:
+                raise ValidationError({'since': ['Invalid sync token.']})
+            if since < started - settings.SYNC_TOMBSTONE_RETENTION:
+                since = None
+
+        # Rows committed while this sync ran may carry an earlier
+        # timestamp; overlapping the next window keeps them
+        moment = started - settings.SYNC_TOKEN_OVERLAP
+        data = self.page(request, moment, since, 0, None, 0)
+        if since is not None:
+            tombstones = Tombstone.objects.filter(
+                user=user,
+                deleted_at__gt=since
+            ).values_list('model', 'object_id')
+            keys = {model: key for key, model, _, _ in SYNCED_MODELS}
+            for model, object_id in tombstones:
+                data[keys[model]]['deleted'].append(object_id)
+        return Response(data)
+
+    def page(self, request, moment, since, position, last_updated, last_id):
+        """Return the page of the sync started at ``moment`` that follows
+        the row ``(last_updated, last_id)`` of the synced model at
+        ``position``."""
+        data = {
+            'token': None,
+            'reset': since is None,
+            'next': None,
+        }
+        remaining = settings.SYNC_PAGE_SIZE
+        for index, (key, _, model_class, serializer_class) in enumerate(
+            SYNCED_MODELS
+        ):
+            rows = []
+            if index >= position and data['next'] is None:
+                queryset = model_class.objects.filter(user=request.user)
+                if since is not None:
+                    queryset = queryset.filter(updated_at__gt=since)
+                if index == position and last_id:
+                    queryset = queryset.filter(
+                        Q(updated_at__gt=last_updated)
+                        | Q(updated_at=last_updated, pk__gt=last_id)
+                    )
+                rows = list(
+                    queryset.order_by('updated_at', 'pk')[:remaining + 1]
+                )
+                if len(rows) > remaining:
+                    rows = rows[:remaining]
+                    if rows:
+                        last_updated = rows[-1].updated_at
+                        last_id = rows[-1].pk
+                    elif index != position:
+                        last_updated, last_id = None, 0
+                    data['next'] = encode_cursor(
+                        moment,
+                        since,
+                        index,
+                        last_updated,
+                        last_id
+                    )
+                remaining -= len(rows)
+            data[key] = {
+                'updated': serializer_class(
+                    rows,
+                    many=True,
+                    context={'request': request}
+                ).data,
+                'deleted': [],
+            }
+        if data['next'] is None:
+            data['token'] = encode_token(moment)
+        return data
@@ -0,0 +1,42 @@
+from .models import Transaction
+
+# Fingerprints looked up per IN query
+FINGERPRINT_LOOKUP_SIZE = 1000
+
+
+def partition_duplicates(transactions):
+    """Split off the unsaved, fingerprinted ``transactions`` that were
+    already imported, either in the database or earlier in the same
+    list.
+
+    Existing rows are found through the ``(user, fingerprint)`` unique
+    index with one IN query per ``FINGERPRINT_LOOKUP_SIZE`` rows.
+    Returns ``(new, duplicates)``; each duplicate has its ``pk`` set to
+    the stored row it matches, when that row already exists."""
+    user_ids = {t.user_id for t in transactions}
+    fingerprints = list({t.fingerprint for t in transactions})
+    existing = {}
+    for start in range(0, len(fingerprints), FINGERPRINT_LOOKUP_SIZE):
+        rows = Transaction.objects.filter(
+            user_id__in=user_ids,
+            fingerprint__in=fingerprints[
+                start:start + FINGERPRINT_LOOKUP_SIZE
+            ]
+        ).values_list('user_id', 'fingerprint', 'pk')
+        existing.update(
+            ((user_id, fingerprint), pk)
+            for user_id, fingerprint, pk in rows
+        )
+
+    new = []
+    duplicates = []
+    seen = set()
+    for transaction in transactions:
+        key = (transaction.user_id, transaction.fingerprint)
+        if key in existing or key in seen:
+            transaction.pk = existing.get(key)
+            duplicates.append(transaction)
+        else:
+            seen.add(key)
+            new.append(transaction)
+    return new, duplicates
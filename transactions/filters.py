@@ -0,0 +1,20 @@
+from django_filters import rest_framework as filters
+from .models import Transaction
+
+
+class TransactionFilter(filters.FilterSet):
+    """Filters for listing transactions.
+
+    Every filter is combined with the user restriction of the view, so
+    the date range lands on one of the ``(user, ..., created_at)``
+    composite indexes and amounts are checked on the rows it yields."""
+
+    class Meta:
+        model = Transaction
+        fields = {
+            'transaction_type': ['exact'],
+            'category': ['exact'],
+            'recurring': ['exact'],
+            'created_at': ['gte', 'lte'],
+            'amount': ['gte', 'lte'],
+        }
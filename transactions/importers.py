@@ -0,0 +1,259 @@
+import csv
+import re
+from collections import Counter
+from dataclasses import dataclass
+from datetime import datetime
+from decimal import Decimal, InvalidOperation
+from itertools import islice
+from django.db import transaction as db_transaction
+from django.utils import timezone
+from rest_framework import serializers
+from categories.models import Category
+from .dedup import partition_duplicates
+from .models import Transaction
+from .signals import transactions_bulk_created
+from .serializers import validate_category_type, validate_positive_amount
+
+# Rows inserted and committed together
+IMPORT_BATCH_SIZE = 1000
+
+OFX_TAG = re.compile(r'<(/?)(\w+)>([^<\r\n]*)')
+
+
+class ImportRowError(ValueError):
+    """Raised for a statement row that cannot be imported."""
+
+
+@dataclass
+class ImportStats:
+    """Running counters of a statement import."""
+    read: int = 0
+    rejected: int = 0
+    duplicates: int = 0
+    created: int = 0
+
+
+def parse_csv(lines, date_format='%Y-%m-%d'):
+    """Parse CSV rows with ``date``, ``amount`` and optional
+    ``description``, ``category``, ``type`` and ``id`` columns."""
+    for row in csv.DictReader(lines):
+        row = {
+            (key or '').strip().lower(): (value or '').strip()
+            for key, value in row.items()
+        }
+        yield {
+            'date': row.get('date', ''),
+            'date_format': date_format,
+            'amount': row.get('amount', ''),
+            'description': row.get('description', ''),
+            'category': row.get('category', ''),
+            'type': row.get('type', ''),
+            'external_id': row.get('id', ''),
+        }
+
+
+def parse_ofx(lines, date_format=None):
+    """Parse the ``<STMTTRN>`` records of an OFX statement line by line."""
+    record = None
+    for line in lines:
+        for closing, tag, value in OFX_TAG.findall(line):
+            tag = tag.upper()
+            if tag == 'STMTTRN':
+                if closing and record is not None:
+                    yield record
+                    record = None
+                elif not closing:
+                    record = {'date_format': '%Y%m%d', 'category': ''}
+            elif record is not None and not closing:
+                value = value.strip()
+                if tag == 'DTPOSTED':
+                    record['date'] = value[:8]
+                elif tag == 'TRNAMT':
+                    record['amount'] = value
+                elif tag == 'FITID':
+                    record['external_id'] = value
+                elif tag == 'NAME' or (tag == 'MEMO' and not record.get('description')):
+                    record['description'] = value
+
+
+def parse_qif(lines, date_format='%m/%d/%Y'):
+    """Parse QIF records: ``D`` date, ``T`` amount, ``P`` payee, ``M``
+    memo, ``L`` category, each record terminated by ``^``."""
+    record = {}
+    for line in lines:
+        line = line.strip()
+        if not line or line.startswith('!'):
+            continue
+        code, value = line[0], line[1:].strip()
+        if code == '^':
+            if record:
+                yield {'date_format': date_format, **record}
+            record = {}
+        elif code == 'D':
+            record['date'] = value.replace("'", '/')
+        elif code == 'T':
+            record['amount'] = value
+        elif code == 'P':
+            record['description'] = value
+        elif code == 'M' and not record.get('description'):
+            record['description'] = value
+        elif code == 'L':
+            record['category'] = value
+
+
+PARSERS = {
+    'csv': parse_csv,
+    'ofx': parse_ofx,
+    'qif': parse_qif,
+}
+
+
+def normalize(records):
+    """Turn raw statement records into transaction fields. Negative
+    amounts are expenses unless the record names its type."""
+    for record in records:
+        try:
+            raw_date = record.get('date', '')
+            try:
+                created_at = datetime.strptime(raw_date, record['date_format'])
+            except ValueError:
+                created_at = datetime.fromisoformat(raw_date)
+            if timezone.is_naive(created_at):
+                created_at = timezone.make_aware(created_at)
+
+            raw_amount = record.get('amount', '').replace(',', '')
+            amount = Decimal(raw_amount)
+        except (ValueError, InvalidOperation) as exc:
+            raise ImportRowError(f'Unreadable row {record!r}') from exc
+
+        transaction_type = record.get('type', '').lower()
+        if transaction_type not in ('income', 'expense'):
+            transaction_type = 'expense' if amount < 0 else 'income'
+
+        yield {
+            'created_at': created_at,
+            'amount': abs(amount).quantize(Decimal('0.01')),
+            'transaction_type': transaction_type,
+            'description': record.get('description') or None,
+            'category': record.get('category', '').strip().lower(),
+            'external_id': record.get('external_id', ''),
+        }
+
+
+def map_categories(rows, categories, default_categories):
+    """Resolve category names with an in-memory lookup, falling back to
+    the default category of the row's type, and apply the same rules as
+    ``TransactionSerializer.validate``."""
+    for row in rows:
+        category = (
+            categories.get(row['category'])
+            or default_categories.get(row['transaction_type'])
+        )
+        if category is None:
+            raise ImportRowError(
+                f'No category for {row["category"] or "uncategorized"} '
+                f'{row["transaction_type"]} row'
+            )
+        try:
+            validate_positive_amount(row['amount'])
+            validate_category_type(category, row['transaction_type'])
+        except serializers.ValidationError as exc:
+            raise ImportRowError(' '.join(exc.detail)) from exc
+        row['category'] = category
+        yield row
+
+
+def skip_rejected(stage, records, stats):
+    """Run ``stage`` one record at a time, counting rows it rejects
+    instead of aborting the whole import."""
+    for record in records:
+        try:
+            yield from stage([record])
+        except ImportRowError:
+            stats.rejected += 1
+
+
+def counted(records, stats):
+    """Count the records read from the statement."""
+    for record in records:
+        stats.read += 1
+        yield record
+
+
+def fingerprinted(user, row, occurrences):
+    """Build the transaction of a statement row, fingerprinted with the
+    row's statement id when it has one. Rows without an id are told
+    apart by how often an identical row came earlier in the statement,
+    tallied in ``occurrences``, so real repeats are kept and a
+    re-import still matches them."""
+    external_id = row.pop('external_id')
+    transaction = Transaction(user=user, **row)
+    fingerprint = transaction.assign_fingerprint(external_id)
+    if not external_id:
+        occurrences[fingerprint] += 1
+        if occurrences[fingerprint] > 1:
+            transaction.assign_fingerprint(
+                occurrence=occurrences[fingerprint]
+            )
+    return transaction
+
+
+def batched(iterable, size):
+    """Yield lists of at most ``size`` items."""
+    iterator = iter(iterable)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+def import_transactions(
+    lines,
+    file_format,
+    user,
+    default_categories=None,
+    batch_size=IMPORT_BATCH_SIZE,
+    date_format=None,
+    on_batch=None
+):
+    """Stream statement ``lines`` into ``user``'s transactions.
+
+    Records flow through parse, normalize and category mapping as
+    generators and are inserted with one ``bulk_create`` per batch, each
+    batch committed on its own. Rows already imported for the user,
+    earlier in the file or from an earlier import of the same
+    statement, are skipped by fingerprint. ``on_batch`` is called with the
+    running stats after every batch. Returns the final stats."""
+    parser_kwargs = {'date_format': date_format} if date_format else {}
+    categories = {
+        category.name.lower(): category
+        for category in Category.objects.all()
+    }
+    stats = ImportStats()
+
+    records = counted(PARSERS[file_format](lines, **parser_kwargs), stats)
+    rows = skip_rejected(normalize, records, stats)
+    rows = skip_rejected(
+        lambda batch: map_categories(
+            batch,
+            categories,
+            default_categories or {}
+        ),
+        rows,
+        stats
+    )
+    occurrences = Counter()
+
+    for batch in batched(rows, batch_size):
+        with db_transaction.atomic():
+            new, duplicates = partition_duplicates(
+                [fingerprinted(user, row, occurrences) for row in batch]
+            )
+            Transaction.objects.bulk_create(new)
+            transactions_bulk_created.send(
+                sender=Transaction,
+                transactions=new
+            )
+        stats.created += len(new)
+        stats.duplicates += len(duplicates)
+        if on_batch:
+            on_batch(stats)
+    return stats
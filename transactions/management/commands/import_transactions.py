@@ -0,0 +1,112 @@
+import os
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from categories.models import Category
+from users.models import User
+from transactions.importers import (
+    IMPORT_BATCH_SIZE,
+    PARSERS,
+    import_transactions
+)
+
+
+class Command(BaseCommand):
+    help = 'Import a CSV, OFX or QIF bank statement for a user'
+
+    def add_arguments(self, parser):
+        parser.add_argument('file', help='Path to the statement file')
+        parser.add_argument(
+            '--user',
+            required=True,
+            help='Email of the user the transactions belong to'
+        )
+        parser.add_argument(
+            '--format',
+            choices=sorted(PARSERS),
+            help='Statement format; defaults to the file extension'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=IMPORT_BATCH_SIZE,
+            help='Number of rows inserted and committed per batch'
+        )
+        parser.add_argument(
+            '--date-format',
+            help='strptime format of CSV and QIF dates'
+        )
+        parser.add_argument(
+            '--income-category',
+            help='Category name for income rows without a known category'
+        )
+        parser.add_argument(
+            '--expense-category',
+            help='Category name for expense rows without a known category'
+        )
+
+    def handle(self, *args, **options):
+        path = options['file']
+        file_format = (
+            options['format']
+            or os.path.splitext(path)[1].lstrip('.').lower()
+        )
+        if file_format not in PARSERS:
+            raise CommandError(
+                f'Unsupported statement format "{file_format}"'
+            )
+
+        try:
+            user = User.objects.get(email=options['user'])
+        except User.DoesNotExist:
+            raise CommandError(f'User "{options["user"]}" does not exist')
+
+        default_categories = {}
+        for transaction_type in ('income', 'expense'):
+            name = options[f'{transaction_type}_category']
+            if not name:
+                continue
+            try:
+                default_categories[transaction_type] = Category.objects.get(
+                    name=name,
+                    category_type=transaction_type
+                )
+            except Category.DoesNotExist:
+                raise CommandError(
+                    f'No {transaction_type} category named "{name}"'
+                )
+
+        started = time.perf_counter()
+
+        def report_progress(stats):
+            elapsed = time.perf_counter() - started
+            rate = stats.read / elapsed if elapsed > 0 else 0
+            self.stdout.write(
+                f'Read {stats.read} rows, imported {stats.created} '
+                f'({rate:.0f} rows/s)'
+            )
+
+        try:
+            with open(path, newline='', encoding='utf-8-sig') as statement:
+                stats = import_transactions(
+                    statement,
+                    file_format,
+                    user,
+                    default_categories=default_categories,
+                    batch_size=options['batch_size'],
+                    date_format=options['date_format'],
+                    on_batch=report_progress
+                )
+        except OSError as exc:
+            raise CommandError(f'Cannot read "{path}": {exc}')
+
+        elapsed = time.perf_counter() - started
+        rate = stats.read / elapsed if elapsed > 0 else 0
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'Imported {stats.created} of {stats.read} rows in '
+                f'{elapsed:.2f}s ({rate:.0f} rows/s); '
+                f'{stats.duplicates} duplicates and '
+                f'{stats.rejected} rejected rows skipped'
+            )
+        )
@@ -0,0 +1,59 @@
+# Generated by Django 5.1.1 on 2026-10-18 06:42
+
+from django.conf import settings
+from django.db import migrations, models
+
+from transactions.recurring import calculate_next_occurrence
+
+
+def backfill_next_occurrence(apps, schema_editor):
+    """Populate next_occurrence_at for existing recurring templates."""
+    Transaction = apps.get_model('transactions', 'Transaction')
+    templates = Transaction.objects.filter(
+        recurring=True,
+        recurrence_interval__isnull=False
+    )
+    updated = []
+    for template in templates.iterator(chunk_size=500):
+        last_occurrence = (
+            template.last_occurrence_date or template.created_at
+        )
+        next_occurrence = calculate_next_occurrence(template)
+        end_date = template.recurrence_end_date
+        if (
+            next_occurrence <= last_occurrence
+            or (end_date and next_occurrence.date() > end_date)
+        ):
+            continue
+        template.next_occurrence_at = next_occurrence
+        updated.append(template)
+    Transaction.objects.bulk_update(
+        updated,
+        ['next_occurrence_at'],
+        batch_size=500
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('categories', '0001_initial'),
+        ('transactions', '0002_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='transaction',
+            name='next_occurrence_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='transaction',
+            index=models.Index(condition=models.Q(('recurring', True)), fields=['next_occurrence_at'], name='transaction_next_due_idx'),
+        ),
+        migrations.RunPython(
+            backfill_next_occurrence,
+            migrations.RunPython.noop
+        ),
+    ]
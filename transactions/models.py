@@ -1,8 +1,55 @@
-from django.db import models
+import hashlib
+from decimal import Decimal
+from django.db import models, transaction as db_transaction
 from users.models import User
 from categories.models import Category
 from django.utils import timezone
 
+
+def normalize_description(description):
+    """Lower-case a description and collapse its whitespace."""
+    return ' '.join((description or '').lower().split())
+
+
+def compute_fingerprint(
+    user_id,
+    amount,
+    created_at,
+    transaction_type,
+    category_id,
+    description,
+    external_id=None,
+    occurrence=1
+):
+    """Return the hash identifying an imported statement line for its
+    user.
+
+    The statement's own id for the line (FITID, CSV ``id`` column) is
+    part of the hash whenever there is one; lines without one count
+    their ``occurrence`` among identical lines of the statement. Either
+    way two real transactions with the same content stay apart. Only
+    the calendar date is used so that re-importing the statement maps
+    to the same fingerprint."""
+    if isinstance(created_at, str):
+        created_at = models.DateTimeField().to_python(created_at)
+    if timezone.is_aware(created_at):
+        created_at = timezone.localtime(created_at)
+    amount = Decimal(str(amount)).quantize(Decimal('0.01'))
+    key = '|'.join([
+        str(user_id),
+        str(amount),
+        created_at.date().isoformat(),
+        transaction_type,
+        str(category_id),
+        normalize_description(description),
+    ])
+    if external_id:
+        key += f'|{external_id}'
+    elif occurrence > 1:
+        key += f'|#{occurrence}'
+    return hashlib.sha256(key.encode()).hexdigest()
+
+
 class Transaction(models.Model):
     """Model representing a financial transaction."""
     TRANSACTION_TYPES = (
@@ -13,7 +60,9 @@ class Transaction(models.Model):
     user = models.ForeignKey(
         User, 
         on_delete=models.CASCADE, 
-        related_name='transactions'
+        related_name='transactions',
+        # Covered by the composite indexes below, which all lead with user
+        db_index=False
     )
     amount = models.DecimalField(max_digits=10, decimal_places=2)
     transaction_type = models.CharField(
@@ -51,6 +100,102 @@ class Transaction(models.Model):
         null=True,
         blank=True
     )
+    next_occurrence_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        editable=False
+    )
+    fingerprint = models.CharField(
+        max_length=64,
+        null=True,
+        blank=True,
+        editable=False
+    )
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'fingerprint'],
+                name='transaction_user_fingerprint_uniq'
+            ),
+        ]
+        indexes = [
+            models.Index(
+                fields=['user', 'created_at'],
+                name='transaction_user_created_idx'
+            ),
+            models.Index(
+                fields=['user', 'transaction_type', 'created_at'],
+                name='transaction_user_type_idx'
+            ),
+            models.Index(
+                fields=['user', 'category', 'created_at'],
+                name='transaction_user_cat_idx'
+            ),
+            models.Index(
+                fields=['user', 'updated_at'],
+                name='transaction_user_updated_idx'
+            ),
+            # Only recurring templates are ever looked up by due date
+            models.Index(
+                fields=['next_occurrence_at'],
+                name='transaction_next_due_idx',
+                condition=models.Q(recurring=True)
+            ),
+        ]
+
+    def assign_fingerprint(self, external_id=None, occurrence=1):
+        """Compute and set the fingerprint of an imported transaction
+        from its field values and its statement id or occurrence."""
+        self.fingerprint = compute_fingerprint(
+            self.user_id,
+            self.amount,
+            self.created_at,
+            self.transaction_type,
+            self.category_id,
+            self.description,
+            external_id,
+            occurrence
+        )
+        return self.fingerprint
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        """Remember the loaded field values so that post_save receivers
+        can tell what an update changed."""
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_values = dict(zip(field_names, values))
+        return instance
+
+    def refresh_from_db(self, using=None, fields=None, from_queryset=None):
+        """Reload field values and the loaded-value snapshot with them."""
+        super().refresh_from_db(using, fields, from_queryset)
+        loaded_values = getattr(self, '_loaded_values', {})
+        loaded_values.update({
+            field.attname: getattr(self, field.attname)
+            for field in self._meta.concrete_fields
+            if fields is None or field.attname in fields or field.name in fields
+        })
+        self._loaded_values = loaded_values
+
+    def save(self, *args, **kwargs):
+        """Keep the persisted next due date in sync with the other
+        fields before saving.
+
+        The row and whatever post_save receivers derive from it are
+        written in one database transaction."""
+        from .recurring import schedule_next_occurrence
+
+        schedule_next_occurrence(self)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            kwargs['update_fields'] = {*update_fields, 'next_occurrence_at'}
+        with db_transaction.atomic():
+            super().save(*args, **kwargs)
+        self._loaded_values = {
+            field.attname: getattr(self, field.attname)
+            for field in self._meta.concrete_fields
+        }
 
     def __str__(self):
         """Return a string representation of the transaction."""
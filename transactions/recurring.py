@@ -1,39 +1,156 @@
 from .models import Transaction
+from .signals import transactions_bulk_created
 from datetime import timedelta, date
+from django.db import transaction as db_transaction
+from django.db.models.functions import Mod
 from django.utils import timezone
 
-def handle_recurring_transactions():
-    """Process recurring transactions and create new transactions 
-    based on the recurrence rules."""
-    today = timezone.now()  # This gets the current time as a datetime
-    recurring_transactions = Transaction.objects.filter(
+# Number of templates processed (and locked) per database round trip
+RECURRING_BATCH_SIZE = 500
+
+
+def handle_recurring_transactions(
+    now=None,
+    batch_size=RECURRING_BATCH_SIZE,
+    shard=0,
+    shard_count=1
+):
+    """Process recurring transactions and create every occurrence that
+    has fallen due up to ``now``.
+
+    Only templates whose indexed ``next_occurrence_at`` is due are
+    loaded. They are handled in chunks: all missed occurrences of a
+    chunk are expanded in memory, written with one ``bulk_create`` and
+    the templates are advanced with one ``bulk_update``, inside the
+    same atomic block. Repeating a run is therefore a no-op.
+
+    ``shard``/``shard_count`` restrict the run to the users whose id
+    falls in that shard, so several workers can split the due set.
+    Returns the number of occurrences created."""
+    today = now or timezone.now()
+    due_transactions = get_due_transactions(today)
+    if shard_count > 1:
+        due_transactions = due_transactions.annotate(
+            shard=Mod('user_id', shard_count)
+        ).filter(shard=shard)
+    template_ids = list(
+        due_transactions.order_by('pk').values_list('pk', flat=True)
+    )
+
+    created = 0
+    for start in range(0, len(template_ids), batch_size):
+        chunk = template_ids[start:start + batch_size]
+        created += process_recurring_batch(chunk, today)
+    return created
+
+
+def process_recurring_batch(template_ids, today):
+    """Expand, insert and advance one chunk of recurring templates."""
+    with db_transaction.atomic():
+        # Lock the templates so that concurrent runs cannot emit the
+        # same occurrence twice; rows already locked by another worker
+        # are skipped and the due check is repeated under the lock
+        templates = list(
+            get_due_transactions(today).select_for_update(
+                skip_locked=True
+            ).filter(pk__in=template_ids)
+        )
+
+        new_transactions = []
+        advanced = []
+        for template in templates:
+            occurrences = expand_occurrences(template, today)
+            if not occurrences:
+                continue
+            new_transactions.extend(
+                build_transaction(template, occurrence)
+                for occurrence in occurrences
+            )
+            template.last_occurrence_date = occurrences[-1]
+            schedule_next_occurrence(template)
+            advanced.append(template)
+
+        if new_transactions:
+            Transaction.objects.bulk_create(new_transactions)
+            transactions_bulk_created.send(
+                sender=Transaction,
+                transactions=new_transactions
+            )
+            Transaction.objects.bulk_update(
+                advanced,
+                ['last_occurrence_date', 'next_occurrence_at']
+            )
+    return len(new_transactions)
+
+
+def get_due_transactions(today):
+    """Return the recurring templates whose next occurrence is due."""
+    return Transaction.objects.filter(
         recurring=True,
-        recurrence_end_date__gte=today.date()  # Keep this as date for filtering
+        next_occurrence_at__lte=today
     )
 
-    for transaction in recurring_transactions:
+
+def schedule_next_occurrence(transaction):
+    """Set ``next_occurrence_at`` from the recurrence rules, or clear
+    it when the template is not recurring or has ended."""
+    next_occurrence = None
+    if transaction.recurring and transaction.recurrence_interval:
+        last_occurrence = (
+            transaction.last_occurrence_date or transaction.created_at
+        )
         next_occurrence = calculate_next_occurrence(transaction)
+        end_date = Transaction._meta.get_field(
+            'recurrence_end_date'
+        ).to_python(transaction.recurrence_end_date)
+        if (
+            next_occurrence <= last_occurrence
+            or (end_date and next_occurrence.date() > end_date)
+        ):
+            next_occurrence = None
+    transaction.next_occurrence_at = next_occurrence
+    return next_occurrence
+
+
+def expand_occurrences(transaction, today):
+    """Return every occurrence of ``transaction`` that is due by
+    ``today`` and not yet emitted, oldest first."""
+    occurrences = []
+    last_occurrence = (
+        transaction.last_occurrence_date or transaction.created_at
+    )
+    end_date = transaction.recurrence_end_date
 
-        # Compare next_occurrence (datetime) with today (datetime)
-        if next_occurrence <= today and (transaction.last_occurrence_date is None or next_occurrence > transaction.last_occurrence_date):
-            create_transaction(transaction)
-            # Update the last_occurrence_date
-            transaction.last_occurrence_date = next_occurrence
-            transaction.save()
+    while True:
+        next_occurrence = calculate_next_occurrence(
+            transaction,
+            last_occurrence
+        )
+        # Unknown intervals do not advance; stop instead of looping
+        if next_occurrence <= last_occurrence:
+            break
+        if next_occurrence > today:
+            break
+        if end_date and next_occurrence.date() > end_date:
+            break
+        occurrences.append(next_occurrence)
+        last_occurrence = next_occurrence
 
+    return occurrences
 
 
-def create_transaction(transaction):
-    """Create a new transaction based on the recurring transaction 
-    details."""
-    Transaction.objects.create(
-        user=transaction.user,
+def build_transaction(transaction, occurrence):
+    """Build (without saving) a new transaction based on the recurring
+    transaction details."""
+    return Transaction(
+        user_id=transaction.user_id,
         amount=transaction.amount,
         transaction_type=transaction.transaction_type,
-        category=transaction.category,
+        category_id=transaction.category_id,
         description=(
             f"Recurring: {transaction.description}"
         ),
+        created_at=occurrence,
         recurring=False  # The new transaction isn't recurring
     )
 
@@ -44,10 +161,14 @@ def is_leap_year(year):
         or (year % 400 == 0)
     )
 
-def calculate_next_occurrence(transaction):
+def calculate_next_occurrence(transaction, last_occurrence=None):
     """Calculate the next occurrence date based on transaction 
     recurrence."""
-    last_occurrence = transaction.last_occurrence_date or transaction.created_at
+    last_occurrence = (
+        last_occurrence
+        or transaction.last_occurrence_date
+        or transaction.created_at
+    )
 
     if transaction.recurrence_interval == 'daily':
         return last_occurrence + timedelta(days=1)
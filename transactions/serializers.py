@@ -1,7 +1,29 @@
 from rest_framework import serializers
+from django.db import transaction as db_transaction
 from .models import Transaction, TransactionComment
+from .signals import transactions_bulk_created
 from categories.models import Category
 
+# Upper bound on rows accepted by a single bulk request
+BULK_MAX_ROWS = 10000
+# Rows written per INSERT statement during a bulk create
+BULK_CREATE_BATCH_SIZE = 1000
+
+
+def validate_category_type(category, transaction_type):
+    """Ensure the selected category matches the transaction type."""
+    if category.category_type != transaction_type:
+        raise serializers.ValidationError(
+            "Selected category does not match the transaction type."
+        )
+
+
+def validate_positive_amount(value):
+    """Ensure the transaction amount is greater than zero."""
+    if value <= 0:
+        raise serializers.ValidationError("Amount must be greater than zero.")
+    return value
+
 
 class TransactionSerializer(serializers.ModelSerializer):
     """Serializer for creating and updating Transaction instances."""
@@ -32,16 +54,80 @@ class TransactionSerializer(serializers.ModelSerializer):
 
     def validate(self, data):
         # Ensure the selected category matches the transaction type
-        if data['category'].category_type != data['transaction_type']:
-            raise serializers.ValidationError(
-                "Selected category does not match the transaction type."
+        validate_category_type(data['category'], data['transaction_type'])
+        return data
+
+    def validate_amount(self, value):
+        return validate_positive_amount(value)
+
+
+class BulkTransactionListSerializer(serializers.ListSerializer):
+    """List serializer validating and inserting many transactions with a
+    constant number of queries."""
+
+    def to_internal_value(self, data):
+        # Resolve every referenced category with a single IN query; the
+        # rows then look their category up in memory
+        category_ids = set()
+        if isinstance(data, list):
+            for item in data:
+                if isinstance(item, dict):
+                    try:
+                        category_ids.add(int(item.get('category')))
+                    except (TypeError, ValueError):
+                        pass
+        self.categories = Category.objects.in_bulk(category_ids)
+        return super().to_internal_value(data)
+
+    def create(self, validated_data):
+        user = self.context['request'].user
+        transactions = [
+            Transaction(user=user, **attrs) for attrs in validated_data
+        ]
+        with db_transaction.atomic():
+            Transaction.objects.bulk_create(
+                transactions,
+                batch_size=BULK_CREATE_BATCH_SIZE
             )
+            transactions_bulk_created.send(
+                sender=Transaction,
+                transactions=transactions
+            )
+        return transactions
+
+
+class BulkTransactionSerializer(serializers.ModelSerializer):
+    """Serializer for a single row of a bulk transaction import."""
+    category = serializers.IntegerField(source='category_id')
+
+    class Meta:
+        model = Transaction
+        fields = [
+            'id',
+            'amount',
+            'transaction_type',
+            'category',
+            'description',
+            'created_at'
+        ]
+        read_only_fields = ['id']
+        extra_kwargs = {'created_at': {'required': False}}
+        list_serializer_class = BulkTransactionListSerializer
+
+    def validate(self, data):
+        category = self.parent.categories.get(data['category_id'])
+        if category is None:
+            raise serializers.ValidationError({
+                'category': [
+                    f'Invalid pk "{data["category_id"]}" - '
+                    'object does not exist.'
+                ]
+            })
+        validate_category_type(category, data['transaction_type'])
         return data
 
     def validate_amount(self, value):
-        if value <= 0:
-            raise serializers.ValidationError("Amount must be greater than zero.")
-        return value
+        return validate_positive_amount(value)
 
 
 class TransactionCommentSerializer(serializers.ModelSerializer):
@@ -0,0 +1,6 @@
+from django.dispatch import Signal
+
+# Sent with ``transactions``, the rows just inserted, by code paths that
+# write with bulk_create and therefore bypass post_save. Receivers run
+# inside the inserting database transaction.
+transactions_bulk_created = Signal()
@@ -4,6 +4,13 @@ from rest_framework.test import APITestCase
 from django.contrib.auth import get_user_model
 from rest_framework_simplejwt.tokens import RefreshToken
 from .recurring import handle_recurring_transactions
+from django.core.management import call_command
+from django.test import TestCase
+from decimal import Decimal
+from io import StringIO
+import json
+import os
+import tempfile
 from .models import Transaction
 from categories.models import Category
 from django.utils import timezone
@@ -164,4 +171,512 @@ class TransactionTests(APITestCase):
             format='json'
         )
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
-        self.assertIn("Amount must be greater than zero.", response.data['amount'])
\ No newline at end of file
+        self.assertIn("Amount must be greater than zero.", response.data['amount'])
+
+    def test_recurring_transactions_catch_up_missed_periods(self):
+        """Test that every missed occurrence is created in a single run."""
+        now = timezone.now()
+        Transaction.objects.create(
+            user=self.user,
+            amount=10.00,
+            transaction_type='expense',
+            category=self.expense_category,
+            description='Daily coffee',
+            recurring=True,
+            recurrence_interval='daily',
+            recurrence_end_date=(now + timedelta(days=30)).date(),
+            last_occurrence_date=now - timedelta(days=5, hours=1),
+        )
+        initial_count = Transaction.objects.count()
+
+        created = handle_recurring_transactions(now=now)
+
+        self.assertEqual(created, 5)
+        self.assertEqual(Transaction.objects.count(), initial_count + 5)
+        occurrences = Transaction.objects.filter(
+            description='Recurring: Daily coffee'
+        ).order_by('created_at')
+        self.assertTrue(all(o.created_at <= now for o in occurrences))
+        self.assertFalse(any(o.recurring for o in occurrences))
+
+    def test_recurring_transactions_run_is_idempotent(self):
+        """Test that repeating a run does not create duplicates."""
+        now = timezone.now()
+        Transaction.objects.create(
+            user=self.user,
+            amount=10.00,
+            transaction_type='expense',
+            category=self.expense_category,
+            description='Weekly groceries',
+            recurring=True,
+            recurrence_interval='weekly',
+            recurrence_end_date=(now + timedelta(days=30)).date(),
+            last_occurrence_date=now - timedelta(weeks=3, hours=1),
+        )
+
+        self.assertEqual(handle_recurring_transactions(now=now), 3)
+        count_after_first_run = Transaction.objects.count()
+        self.assertEqual(handle_recurring_transactions(now=now), 0)
+        self.assertEqual(Transaction.objects.count(), count_after_first_run)
+
+    def test_recurring_transactions_stop_at_end_date(self):
+        """Test that no occurrence is created after the recurrence end date."""
+        now = timezone.now()
+        Transaction.objects.create(
+            user=self.user,
+            amount=10.00,
+            transaction_type='expense',
+            category=self.expense_category,
+            description='Short subscription',
+            recurring=True,
+            recurrence_interval='daily',
+            recurrence_end_date=now.date(),
+            last_occurrence_date=now - timedelta(days=3),
+        )
+
+        created = handle_recurring_transactions(
+            now=now + timedelta(days=10)
+        )
+
+        self.assertEqual(created, 3)
+
+    def test_next_occurrence_is_persisted(self):
+        """Test that the next due date is stored and advanced."""
+        now = timezone.now()
+        template = Transaction.objects.create(
+            user=self.user,
+            amount=10.00,
+            transaction_type='expense',
+            category=self.expense_category,
+            description='Daily coffee',
+            recurring=True,
+            recurrence_interval='daily',
+            recurrence_end_date=(now + timedelta(days=30)).date(),
+            last_occurrence_date=now - timedelta(days=2, hours=1),
+        )
+        self.assertEqual(
+            template.next_occurrence_at,
+            template.last_occurrence_date + timedelta(days=1)
+        )
+
+        handle_recurring_transactions(now=now)
+
+        template.refresh_from_db()
+        self.assertGreater(template.next_occurrence_at, now)
+        # Past templates and plain transactions are never due
+        self.transaction.refresh_from_db()
+        self.assertIsNone(self.transaction.next_occurrence_at)
+
+    def test_process_recurring_transactions_command(self):
+        """Test the management command reports the generated count."""
+        now = timezone.now()
+        Transaction.objects.create(
+            user=self.user,
+            amount=10.00,
+            transaction_type='expense',
+            category=self.expense_category,
+            description='Daily coffee',
+            recurring=True,
+            recurrence_interval='daily',
+            recurrence_end_date=(now + timedelta(days=30)).date(),
+            last_occurrence_date=now - timedelta(days=2, hours=1),
+        )
+        out = StringIO()
+
+        call_command('process_recurring_transactions', stdout=out)
+
+        self.assertIn('Generated 2 recurring occurrences', out.getvalue())
+
+    def test_recurring_transactions_sharded_by_user(self):
+        """Test that the shards of a run together cover every user once."""
+        now = timezone.now()
+        other_user = User.objects.create_user(
+            email='other@example.com',
+            username='otheruser',
+            password='testpassword'
+        )
+        for user in (self.user, other_user):
+            Transaction.objects.create(
+                user=user,
+                amount=10.00,
+                transaction_type='expense',
+                category=self.expense_category,
+                description='Daily coffee',
+                recurring=True,
+                recurrence_interval='daily',
+                recurrence_end_date=(now + timedelta(days=30)).date(),
+                last_occurrence_date=now - timedelta(days=2, hours=1),
+            )
+
+        created = [
+            handle_recurring_transactions(now=now, shard=shard, shard_count=2)
+            for shard in range(2)
+        ]
+
+        self.assertEqual(sorted(created), [2, 2])
+
+    def test_list_transactions_is_cursor_paginated(self):
+        """Test walking the transaction list page by page with cursors."""
+        now = timezone.now()
+        for days in range(5):
+            Transaction.objects.create(
+                user=self.user,
+                amount=10.00,
+                transaction_type='expense',
+                category=self.expense_category,
+                created_at=now - timedelta(days=days),
+            )
+
+        seen = []
+        url = reverse('transactions-list') + '?page_size=2'
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertLessEqual(len(response.data['results']), 2)
+            seen.extend(item['id'] for item in response.data['results'])
+            url = response.data['next']
+
+        expected = list(
+            Transaction.objects.filter(user=self.user)
+            .order_by('-created_at', '-id')
+            .values_list('id', flat=True)
+        )
+        self.assertEqual(seen, expected)
+
+    def test_filter_transactions_by_date_and_amount_range(self):
+        """Test the created_at and amount range filters."""
+        now = timezone.now()
+        for days, amount in [(1, 5), (10, 50), (40, 500)]:
+            Transaction.objects.create(
+                user=self.user,
+                amount=amount,
+                transaction_type='expense',
+                category=self.expense_category,
+                created_at=now - timedelta(days=days),
+            )
+
+        response = self.client.get(reverse('transactions-list'), {
+            'created_at__gte': (now - timedelta(days=30)).isoformat(),
+            'amount__gte': 10,
+            'ordering': 'created_at',
+        })
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [item['amount'] for item in response.data['results']],
+            ['50.00', '100.00']
+        )
+
+    def test_unindexed_ordering_is_ignored(self):
+        """Test that ordering by amount falls back to the default."""
+        Transaction.objects.create(
+            user=self.user,
+            amount=5,
+            transaction_type='expense',
+            category=self.expense_category,
+            created_at=timezone.now() - timedelta(days=1),
+        )
+
+        response = self.client.get(
+            reverse('transactions-list'),
+            {'ordering': 'amount'}
+        )
+
+        self.assertEqual(
+            [item['amount'] for item in response.data['results']],
+            ['100.00', '5.00']
+        )
+
+    def test_hot_queries_use_composite_indexes(self):
+        """Test that user plus date range queries are served by an index."""
+        now = timezone.now()
+        start = now - timedelta(days=30)
+        queries = {
+            'transaction_user_created_idx': Transaction.objects.filter(
+                user=self.user,
+                created_at__range=[start, now]
+            ),
+            'transaction_user_type_idx': Transaction.objects.filter(
+                user=self.user,
+                transaction_type='expense',
+                created_at__gte=start
+            ),
+            'transaction_user_cat_idx': Transaction.objects.filter(
+                user=self.user,
+                category=self.expense_category,
+                created_at__gte=start
+            ),
+        }
+        for index_name, queryset in queries.items():
+            plan = queryset.explain()
+            self.assertIn(index_name, plan)
+            self.assertNotIn('SCAN transactions_transaction', plan)
+
+    def test_bulk_create_transactions(self):
+        """Test creating many transactions in one request."""
+        rows = [
+            {
+                'amount': f'{amount}.00',
+                'transaction_type': 'expense',
+                'category': self.expense_category.id,
+                'description': f'Row {amount}',
+                'created_at': '2024-05-10T12:00:00Z',
+            }
+            for amount in range(1, 51)
+        ]
+        initial_count = Transaction.objects.count()
+
+        # Auth, category lookup, savepoint handling, the INSERT, the
+        # monthly rollup upsert, the budget lookup and the dashboard
+        # snapshot lookup do not depend on the number of rows
+        with self.assertNumQueries(11):
+            response = self.client.post(
+                reverse('transactions-bulk'),
+                rows,
+                format='json'
+            )
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(len(response.data), 50)
+        self.assertEqual(Transaction.objects.count(), initial_count + 50)
+
+    def test_bulk_create_reports_errors_per_row(self):
+        """Test that invalid rows are reported and nothing is saved."""
+        rows = [
+            {
+                'amount': '10.00',
+                'transaction_type': 'expense',
+                'category': self.expense_category.id,
+            },
+            {
+                'amount': '10.00',
+                'transaction_type': 'expense',
+                'category': self.income_category.id,
+            },
+            {
+                'amount': '-5.00',
+                'transaction_type': 'expense',
+                'category': 999999,
+            },
+        ]
+        initial_count = Transaction.objects.count()
+
+        response = self.client.post(
+            reverse('transactions-bulk'),
+            rows,
+            format='json'
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data[0], {})
+        self.assertIn('non_field_errors', response.data[1])
+        self.assertIn('amount', response.data[2])
+        self.assertEqual(Transaction.objects.count(), initial_count)
+
+    def test_export_transactions_as_csv(self):
+        """Test streaming the transaction history as CSV."""
+        response = self.client.get(
+            reverse('transactions-export'),
+            {'format': 'csv'}
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.streaming)
+        self.assertEqual(response['Content-Type'], 'text/csv')
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        self.assertEqual(
+            lines[0],
+            'id,created_at,transaction_type,amount,category,description,recurring'
+        )
+        self.assertEqual(len(lines), 2)
+        self.assertIn('Salary', lines[1])
+
+    def test_export_transactions_as_ndjson_honours_filters(self):
+        """Test streaming NDJSON with the list filters applied."""
+        Transaction.objects.create(
+            user=self.user,
+            amount=20.00,
+            transaction_type='expense',
+            category=self.expense_category,
+        )
+
+        response = self.client.get(
+            reverse('transactions-export'),
+            {'format': 'ndjson', 'transaction_type': 'expense'}
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        self.assertEqual(len(lines), 1)
+        row = json.loads(lines[0])
+        self.assertEqual(row['category'], 'Groceries')
+        self.assertEqual(row['amount'], '20.00')
+
+
+    def test_identical_creates_are_separate_transactions(self):
+        """Test that two posts with the same content store two rows."""
+        data = self.transaction_data.copy()
+        first = self.client.post(reverse('transactions-list'), data, format='json')
+        second = self.client.post(reverse('transactions-list'), data, format='json')
+
+        self.assertEqual(first.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(second.status_code, status.HTTP_201_CREATED)
+        self.assertNotEqual(first.data['id'], second.data['id'])
+        self.assertEqual(Transaction.objects.count(), 3)
+
+    def test_bulk_create_keeps_identical_rows(self):
+        """Test that identical bulk rows are all stored."""
+        row = {
+            'amount': '7.00',
+            'transaction_type': 'expense',
+            'category': self.expense_category.id,
+            'description': 'Coffee',
+            'created_at': '2024-05-10T12:00:00Z',
+        }
+
+        response = self.client.post(
+            reverse('transactions-bulk'),
+            [row, row],
+            format='json'
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        ids = [item['id'] for item in response.data]
+        self.assertNotEqual(ids[0], ids[1])
+        self.assertEqual(Transaction.objects.count(), 3)
+
+
+class TransactionImportTests(TestCase):
+    """Tests for the import_transactions management command."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email='importer@example.com',
+            username='importer',
+            password='testpassword'
+        )
+        self.salary = Category.objects.create(
+            name='Salary',
+            category_type='income'
+        )
+        self.groceries = Category.objects.create(
+            name='Groceries',
+            category_type='expense'
+        )
+
+    def run_import(self, suffix, content, *args):
+        with tempfile.NamedTemporaryFile(
+            'w',
+            suffix=suffix,
+            delete=False
+        ) as statement:
+            statement.write(content)
+        self.addCleanup(os.remove, statement.name)
+        out = StringIO()
+        call_command(
+            'import_transactions',
+            statement.name,
+            '--user', self.user.email,
+            *args,
+            stdout=out
+        )
+        return out.getvalue()
+
+    def test_import_csv_statement(self):
+        """Test importing a CSV statement in batches."""
+        output = self.run_import('.csv', (
+            'id,date,amount,description,category\n'
+            'a1,2024-01-05,-12.50,Market,Groceries\n'
+            'a2,2024-01-06,2000.00,Payroll,Salary\n'
+            'a2,2024-01-06,2000.00,Payroll,Salary\n'
+            'a3,not-a-date,1.00,Broken,Salary\n'
+            'a4,2024-01-07,-3.00,Unknown shop,Shoes\n'
+        ), '--batch-size', '1', '--expense-category', 'Groceries')
+
+        self.assertIn('Imported 3 of 5 rows', output)
+        self.assertIn('1 duplicates and 1 rejected', output)
+        self.assertIn('rows/s', output)
+        expense = Transaction.objects.get(description='Market')
+        self.assertEqual(expense.transaction_type, 'expense')
+        self.assertEqual(expense.amount, Decimal('12.50'))
+        self.assertEqual(expense.category, self.groceries)
+        self.assertEqual(
+            Transaction.objects.filter(category=self.groceries).count(),
+            2
+        )
+
+    def test_reimport_skips_stored_transactions(self):
+        """Test that importing the same statement twice adds nothing."""
+        statement = (
+            'date,amount,description,category\n'
+            '2024-01-05,-12.50,Market,Groceries\n'
+            '2024-01-06,2000.00,Payroll,Salary\n'
+        )
+        self.run_import('.csv', statement)
+
+        output = self.run_import('.csv', statement)
+
+        self.assertIn('Imported 0 of 2 rows', output)
+        self.assertIn('2 duplicates', output)
+        self.assertEqual(Transaction.objects.filter(user=self.user).count(), 2)
+
+    def test_import_keeps_alike_rows_with_different_ids(self):
+        """Test that statement lines with the same content but their own
+        ids are separate transactions, also when imported again."""
+        statement = (
+            'id,date,amount,description,category\n'
+            'b1,2024-01-05,-3.00,Coffee,Groceries\n'
+            'b2,2024-01-05,-3.00,Coffee,Groceries\n'
+        )
+        output = self.run_import('.csv', statement)
+        self.assertIn('Imported 2 of 2 rows', output)
+
+        output = self.run_import('.csv', statement)
+
+        self.assertIn('Imported 0 of 2 rows', output)
+        self.assertEqual(Transaction.objects.filter(user=self.user).count(), 2)
+
+    def test_import_keeps_repeated_rows_without_ids(self):
+        """Test that identical statement lines without ids are separate
+        transactions, and that importing them again adds nothing."""
+        statement = (
+            '!Type:Bank\n'
+            'D01/05/2024\nT-3.00\nPCoffee shop\nLGroceries\n^\n'
+            'D01/05/2024\nT-3.00\nPCoffee shop\nLGroceries\n^\n'
+        )
+        output = self.run_import('.qif', statement, '--batch-size', '1')
+        self.assertIn('Imported 2 of 2 rows', output)
+
+        output = self.run_import('.qif', statement)
+
+        self.assertIn('Imported 0 of 2 rows', output)
+        self.assertEqual(Transaction.objects.filter(user=self.user).count(), 2)
+
+    def test_import_ofx_statement(self):
+        """Test importing the transactions of an OFX statement."""
+        self.run_import('.ofx', (
+            '<OFX><BANKMSGSRSV1><STMTTRNRS><STMTRS><BANKTRANLIST>\n'
+            '<STMTTRN>\n<TRNTYPE>DEBIT\n<DTPOSTED>20240105120000\n'
+            '<TRNAMT>-42.10\n<FITID>1001\n<NAME>Market\n</STMTTRN>\n'
+            '<STMTTRN>\n<TRNTYPE>CREDIT\n<DTPOSTED>20240106\n'
+            '<TRNAMT>100.00\n<FITID>1002\n<NAME>Refund\n</STMTTRN>\n'
+            '</BANKTRANLIST></STMTRS></STMTTRNRS></BANKMSGSRSV1></OFX>\n'
+        ), '--expense-category', 'Groceries', '--income-category', 'Salary')
+
+        self.assertEqual(Transaction.objects.filter(user=self.user).count(), 2)
+        self.assertEqual(
+            Transaction.objects.get(description='Market').amount,
+            Decimal('42.10')
+        )
+
+    def test_import_qif_statement(self):
+        """Test importing a QIF statement with categories."""
+        self.run_import('.qif', (
+            '!Type:Bank\n'
+            'D01/05/2024\nT-8.25\nPCorner shop\nLGroceries\n^\n'
+            "D01/31'2024\nT1500.00\nPEmployer\nLSalary\n^\n"
+        ))
+
+        income = Transaction.objects.get(description='Employer')
+        self.assertEqual(income.category, self.salary)
+        self.assertEqual(income.created_at.day, 31)
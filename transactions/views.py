@@ -1,16 +1,48 @@
-from rest_framework import viewsets
+from rest_framework import status, viewsets
+from rest_framework.decorators import action
+from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
+from idempotency.mixins import IdempotencyMixin
+from rest_framework.filters import OrderingFilter
 from django_filters.rest_framework import DjangoFilterBackend
+from drf_api.streaming import (
+    CSVStreamRenderer,
+    NDJSONStreamRenderer,
+    streaming_response
+)
+from .filters import TransactionFilter
 from .models import Transaction, TransactionComment
-from .serializers import TransactionSerializer, TransactionCommentSerializer
+from .serializers import (
+    BULK_MAX_ROWS,
+    BulkTransactionSerializer,
+    TransactionSerializer,
+    TransactionCommentSerializer
+)
 
-class TransactionViewSet(viewsets.ModelViewSet):
+# Columns written by the transaction export, in order
+EXPORT_FIELDS = [
+    'id',
+    'created_at',
+    'transaction_type',
+    'amount',
+    'category',
+    'description',
+    'recurring'
+]
+# Rows fetched from the database per round trip while exporting
+EXPORT_CHUNK_SIZE = 2000
+
+
+class TransactionViewSet(IdempotencyMixin, viewsets.ModelViewSet):
     """ViewSet for managing Transaction instances."""
     permission_classes = [IsAuthenticated]
     queryset = Transaction.objects.all()
     serializer_class = TransactionSerializer
-    filter_backends = [DjangoFilterBackend]
-    filterset_fields = ['transaction_type', 'category', 'recurring']
+    filter_backends = [DjangoFilterBackend, OrderingFilter]
+    filterset_class = TransactionFilter
+    # Only orderings backed by an index, so every page costs the same
+    ordering_fields = ['created_at']
+    ordering = ['-created_at', '-id']
 
     def get_queryset(self):
         """Retrieve transactions for the authenticated user."""
@@ -18,7 +50,50 @@ class TransactionViewSet(viewsets.ModelViewSet):
             user=self.request.user
         )
 
-class TransactionCommentViewSet(viewsets.ModelViewSet):
+    @action(detail=False, methods=['post'], url_path='bulk')
+    def bulk(self, request):
+        """Create many transactions at once; errors are reported per row
+        and nothing is saved unless every row is valid."""
+        serializer = BulkTransactionSerializer(
+            data=request.data,
+            many=True,
+            allow_empty=False,
+            max_length=BULK_MAX_ROWS,
+            context=self.get_serializer_context()
+        )
+        serializer.is_valid(raise_exception=True)
+        serializer.save()
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
+
+    @action(
+        detail=False,
+        methods=['get'],
+        renderer_classes=[CSVStreamRenderer, NDJSONStreamRenderer]
+    )
+    def export(self, request):
+        """Stream the user's transactions as CSV or NDJSON.
+
+        The list filters and ordering apply. Rows are read as tuples in
+        chunks, with the category name joined in the same query, so
+        memory use does not grow with the size of the history."""
+        queryset = self.filter_queryset(self.get_queryset())
+        rows = queryset.values_list(
+            'id',
+            'created_at',
+            'transaction_type',
+            'amount',
+            'category__name',
+            'description',
+            'recurring'
+        ).iterator(chunk_size=EXPORT_CHUNK_SIZE)
+        return streaming_response(
+            request.accepted_renderer.format,
+            EXPORT_FIELDS,
+            rows,
+            'transactions'
+        )
+
+class TransactionCommentViewSet(IdempotencyMixin, viewsets.ModelViewSet):
     """ViewSet for managing TransactionComment instances."""
     permission_classes = [IsAuthenticated]
     queryset = TransactionComment.objects.all()
@@ -0,0 +1,10 @@
+from django.db.models import QuerySet
+from .models import User
+
+
+def is_user_deletion(origin):
+    """Return whether a delete signal's ``origin`` is the removal of a
+    user, i.e. the row is going away together with its owner."""
+    if isinstance(origin, QuerySet):
+        return origin.model is User
+    return isinstance(origin, User)